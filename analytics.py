@@ -0,0 +1,323 @@
+import argparse
+import io
+import itertools
+import json
+import math
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from match import WIDTH, HEIGHT
+from events import SHOT, TACKLE, MISSED_TACKLE
+from replay import Replay, POSITION_SCALE
+
+CELL = 20                # Heatmap cell size in px: 40 x 30 cells on the pitch
+CHUNK_RECORDS = 4096     # Replay records decoded at a time
+CHUNK_EVENTS = 10000     # Event lines parsed at a time
+TEAMS = ("A", "B")
+
+
+def replay_chunks(replay, size=CHUNK_RECORDS):
+    """Consecutive slices of a replay's records
+
+    The records are memory-mapped, so only the slice being aggregated is
+    ever read from disk.
+    """
+    for start in range(0, len(replay), size):
+        yield replay.records[start:start + size]
+
+
+def event_chunks(path, size=CHUNK_EVENTS):
+    """Lists of up to size events (as dicts) from a JSON lines event file"""
+    with open(path) as f:
+        while True:
+            lines = list(itertools.islice(f, size))
+            if not lines:
+                return
+            yield [json.loads(line) for line in lines]
+
+
+def label(player):
+    """Key of a roster entry in the aggregates: team and role, e.g. "A CB"
+
+    Players are grouped by position rather than by roster slot, so matches
+    between different formations add up sensibly; two players of the same
+    role in one team share a heatmap and network node.
+    """
+    return f"{player['team']} {player['role']}"
+
+
+class Analytics:
+    """Running totals over any number of replays and event files.
+
+    From replays: possession share by team (the recorded possessor is what
+    Ball.possessed_by found), heatmaps of the ball and of every position on
+    a grid of cell-px cells, and the pass network - a pass from P to Q is
+    counted when Q takes the ball from P while P is still ball.last_passer.
+    From event files: tackle success by role and shot locations.
+
+    Everything is fixed-size counts, binned a chunk at a time with NumPy, so
+    memory stays flat however many matches go in. Totals from parallel
+    workers, or saved runs, are combined with merge().
+    Counts are in match ticks: a replay recorded with every=n weighs each
+    record n times. Passes completed between two recorded ticks are missed.
+    """
+
+    def __init__(self, cell=CELL):
+        self.cell = cell
+        self.shape = (math.ceil(HEIGHT / cell), math.ceil(WIDTH / cell))
+        self.replays = 0
+        self.event_files = 0
+        self.ticks = 0
+        self.possession = np.zeros(3, dtype=np.int64)  # Ticks held by A, held by B, loose
+        self.ball_heat = np.zeros(self.shape, dtype=np.int64)
+        self.player_heat = {}                          # label -> ticks per cell
+        self.shots = {team: np.zeros(self.shape, dtype=np.int64) for team in TEAMS}
+        self.passes = Counter()                        # (passer label, receiver label) -> count
+        self.tackles_won = Counter()                   # role -> tackles
+        self.tackles_missed = Counter()
+
+    def add_replay(self, path, chunk_size=CHUNK_RECORDS):
+        replay = Replay(path)
+        roster = replay.roster
+        n_players = len(roster)
+        labels = [label(p) for p in roster]
+        # Team of each roster index, plus "loose" (2) for possessor -1
+        team = np.array([TEAMS.index(p["team"]) for p in roster] + [2])
+        weight = replay.every
+        rows, cols = self.shape
+        cell = self.cell * POSITION_SCALE  # Positions are stored in 1/POSITION_SCALE px
+        slots = np.arange(n_players) * rows
+        heat = np.zeros(n_players * rows * cols, dtype=np.int64)
+        network = np.zeros(n_players * n_players, dtype=np.int64)
+        holder = -1  # Last player seen with the ball, carried across chunks
+
+        for chunk in replay_chunks(replay, chunk_size):
+            n = len(chunk)
+            self.ticks += n * weight
+
+            possessor = chunk["possessor"].astype(np.intp)
+            self.possession += np.bincount(team[possessor], minlength=3) * weight
+
+            ball = (np.minimum(chunk["ball_y"] // cell, rows - 1).astype(np.intp) * cols
+                    + np.minimum(chunk["ball_x"] // cell, cols - 1))
+            self.ball_heat += np.bincount(ball, minlength=rows * cols).reshape(self.shape) * weight
+
+            row = np.minimum(chunk["y"] // cell, rows - 1).astype(np.intp)
+            col = np.minimum(chunk["x"] // cell, cols - 1).astype(np.intp)
+            heat += np.bincount(((row + slots) * cols + col).ravel(), minlength=heat.size)
+
+            # Holder before each record: the latest non-negative possessor so far
+            held = possessor >= 0
+            latest = np.maximum.accumulate(np.where(held, np.arange(n), -1))
+            holders = np.where(latest >= 0, possessor[latest], holder)
+            previous = np.concatenate(([holder], holders[:-1]))
+            received = (held & (possessor != previous) & (previous >= 0)
+                        & (chunk["last_passer"] == previous) & (team[possessor] == team[previous]))
+            network += np.bincount(previous[received] * n_players + possessor[received],
+                                   minlength=network.size)
+            if n:
+                holder = int(holders[-1])
+
+        for i, grid in enumerate((heat * weight).reshape(n_players, rows, cols)):
+            if labels[i] in self.player_heat:
+                self.player_heat[labels[i]] += grid
+            else:
+                self.player_heat[labels[i]] = grid
+        for pair in np.flatnonzero(network):
+            passer, receiver = divmod(int(pair), n_players)
+            self.passes[labels[passer], labels[receiver]] += int(network[pair])
+        self.replays += 1
+
+    def add_events(self, path, chunk_size=CHUNK_EVENTS):
+        rows, cols = self.shape
+        for events in event_chunks(path, chunk_size):
+            for kind, counter in ((TACKLE, self.tackles_won), (MISSED_TACKLE, self.tackles_missed)):
+                counter.update(e["role"] for e in events if e["kind"] == kind)
+
+            shots = [(e["x"], e["y"], e["team"]) for e in events if e["kind"] == SHOT]
+            if not shots:
+                continue
+            x, y, shot_team = zip(*shots)
+            flat = (np.clip(np.array(y) // self.cell, 0, rows - 1).astype(np.intp) * cols
+                    + np.clip(np.array(x) // self.cell, 0, cols - 1).astype(np.intp))
+            shot_team = np.array(shot_team)
+            for team in TEAMS:
+                self.shots[team] += np.bincount(flat[shot_team == team],
+                                                minlength=rows * cols).reshape(self.shape)
+        self.event_files += 1
+
+    def add(self, path):
+        """Add a replay (.fbr), event file (.jsonl) or saved aggregate (.npz)"""
+        if path.endswith(".jsonl"):
+            self.add_events(path)
+        elif path.endswith(".npz"):
+            self.merge(Analytics.load(path))
+        else:
+            self.add_replay(path)
+
+    def merge(self, other):
+        """Add another aggregate's totals to this one"""
+        if other.cell != self.cell:
+            raise ValueError(f"cannot merge heatmaps of {other.cell}px cells into {self.cell}px cells")
+        self.replays += other.replays
+        self.event_files += other.event_files
+        self.ticks += other.ticks
+        self.possession += other.possession
+        self.ball_heat += other.ball_heat
+        for key, grid in other.player_heat.items():
+            if key in self.player_heat:
+                self.player_heat[key] += grid
+            else:
+                self.player_heat[key] = grid.copy()
+        for team in TEAMS:
+            self.shots[team] += other.shots[team]
+        self.passes.update(other.passes)
+        self.tackles_won.update(other.tackles_won)
+        self.tackles_missed.update(other.tackles_missed)
+        return self
+
+    def summary(self, top=10):
+        """Possession, passes, tackles and shots as a JSON-friendly dict"""
+        held = self.possession[:2].sum()
+        possession = {team: float(self.possession[i] / held) if held else 0.0
+                      for i, team in enumerate(TEAMS)}
+        possession["loose"] = float(self.possession[2] / self.ticks) if self.ticks else 0.0
+        tackles = {}
+        for role in sorted(self.tackles_won.keys() | self.tackles_missed.keys()):
+            won = self.tackles_won[role]
+            attempts = won + self.tackles_missed[role]
+            tackles[role] = {"won": won, "attempts": attempts, "rate": won / attempts}
+        return {
+            "replays": self.replays,
+            "event_files": self.event_files,
+            "ticks": self.ticks,
+            "possession": possession,
+            "passes": {"completed": sum(self.passes.values()),
+                       "top": [[passer, receiver, count]
+                               for (passer, receiver), count in self.passes.most_common(top)]},
+            "tackles": tackles,
+            "shots": {team: int(self.shots[team].sum()) for team in TEAMS},
+        }
+
+    def save(self, path):
+        """Write the totals to an .npz file, e.g. to merge with other runs later"""
+        meta = {
+            "cell": self.cell,
+            "replays": self.replays,
+            "event_files": self.event_files,
+            "ticks": self.ticks,
+            "player_heat": list(self.player_heat),
+            "passes": [[passer, receiver, count] for (passer, receiver), count in self.passes.items()],
+            "tackles_won": self.tackles_won,
+            "tackles_missed": self.tackles_missed,
+        }
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+                            possession=self.possession, ball_heat=self.ball_heat,
+                            player_heat=np.array(list(self.player_heat.values())).reshape(-1, *self.shape),
+                            shots=np.stack([self.shots[team] for team in TEAMS]))
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            meta = json.loads(arrays["meta"].tobytes())
+            analytics = cls(meta["cell"])
+            analytics.replays = meta["replays"]
+            analytics.event_files = meta["event_files"]
+            analytics.ticks = meta["ticks"]
+            analytics.possession = arrays["possession"]
+            analytics.ball_heat = arrays["ball_heat"]
+            analytics.player_heat = dict(zip(meta["player_heat"], arrays["player_heat"]))
+            analytics.shots = dict(zip(TEAMS, arrays["shots"]))
+        analytics.passes = Counter({(passer, receiver): count
+                                    for passer, receiver, count in meta["passes"]})
+        analytics.tackles_won = Counter(meta["tackles_won"])
+        analytics.tackles_missed = Counter(meta["tackles_missed"])
+        return analytics
+
+
+def analyse(paths, cell=CELL):
+    """Aggregate a list of files in this process"""
+    analytics = Analytics(cell)
+    for path in paths:
+        analytics.add(path)
+    return analytics
+
+
+def analyse_parallel(paths, workers=None, chunk_size=50, cell=CELL, progress=None):
+    """Aggregate files across a process pool, chunk_size files per work item
+
+    Each worker returns the totals of its chunk, which are merged as they
+    come in; the result is the same as analyse(paths).
+    """
+    analytics = Analytics(cell)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyse, paths[start:start + chunk_size], cell):
+                   len(paths[start:start + chunk_size])
+                   for start in range(0, len(paths), chunk_size)}
+        for future in as_completed(futures):
+            analytics.merge(future.result())
+            done += futures[future]
+            if progress:
+                progress(done, len(paths))
+    return analytics
+
+
+def print_summary(summary):
+    print(f"{summary['replays']} replays, {summary['event_files']} event files, "
+          f"{summary['ticks']} ticks")
+    possession = summary["possession"]
+    print(f"Possession: A {possession['A']:.1%} - {possession['B']:.1%} B "
+          f"(ball loose {possession['loose']:.1%} of the time)")
+    print(f"Completed passes: {summary['passes']['completed']}")
+    for passer, receiver, count in summary["passes"]["top"]:
+        print(f"  {passer:<6} -> {receiver:<6}{count:>8}")
+    if summary["tackles"]:
+        print("Tackles won by role:")
+        for role, stats in summary["tackles"].items():
+            print(f"  {role:<4}{stats['won']:>6}/{stats['attempts']:<6} {stats['rate']:6.1%}")
+    print(f"Shots: A {summary['shots']['A']} - {summary['shots']['B']} B")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Possession, heatmaps, pass networks, tackles and shots over recorded matches")
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="Replays (.fbr), event files (.jsonl) or saved aggregates (.npz)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count; 1 = no pool)")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Files per work item")
+    parser.add_argument("--cell", type=int, default=CELL, help="Heatmap cell size in px")
+    parser.add_argument("--save", metavar="PATH",
+                        help="Write the totals and heatmaps to this .npz (Analytics.load reads it back)")
+    parser.add_argument("--json", help="Also write the summary to this JSON file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(done, total):
+        elapsed = time.perf_counter() - start
+        print(f"\r{done}/{total} files ({elapsed:.0f}s)", end="", file=sys.stderr, flush=True)
+
+    if args.workers == 1:
+        analytics = analyse(args.paths, args.cell)
+    else:
+        analytics = analyse_parallel(args.paths, args.workers, args.chunk_size, args.cell, progress)
+        print(file=sys.stderr)
+
+    summary = analytics.summary()
+    print_summary(summary)
+    if args.save:
+        analytics.save(args.save)
+        print(f"Totals written to {args.save}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,77 @@
-import pygame
 import math
 
+def possession_range(role):
+    """Distance within which a player of this role controls the ball"""
+    if role == "GK":
+        return 20
+    elif role in ["CB", "LB", "RB"]:
+        return 16
+    return 15
+
+FIELD_SIZE = (800, 600)  # The ball bounces off the edges of this area
+
+
+def axis_segments(x, v, low, high, friction, damping, min_velocity):
+    """Closed-form path of one axis of the ball, as in Ball.update
+
+    Each axis moves independently: x += v, then v *= friction, then v is cut
+    to zero below min_velocity, then it bounces off low/high with damping.
+    Between bounces, k ticks into a segment the position is
+    x0 + v0 * (1 - friction**k) / (1 - friction). Returns one
+    (start tick, x0, v0, length) per segment: a segment either ends with a
+    bounce after length ticks, where the next one starts, or is the last
+    one and comes to rest after length ticks.
+    """
+    segments = []
+    start = 0
+    log_friction = math.log(friction)
+    while True:
+        if v == 0:
+            segments.append((start, x, 0.0, 0))
+            return segments
+
+        # Ticks the ball keeps moving before v drops below min_velocity
+        speed = abs(v)
+        moving = 1 if speed < min_velocity else int(math.log(min_velocity / speed) / log_friction) + 1
+        travel = v * (1 - friction ** moving) / (1 - friction)
+
+        # Bounce if the wall it is heading for is reached while still moving
+        wall = low if v < 0 else high
+        if (x + travel <= wall) if v < 0 else (x + travel >= wall):
+            needed = 1 - (wall - x) * (1 - friction) / v
+            hit = max(1, math.ceil(math.log(needed) / log_friction)) if needed > 0 else moving
+            hit = min(hit, moving)
+            segments.append((start, x, v, hit))
+            v = 0.0 if hit >= moving else -v * friction ** hit * damping
+            x = wall
+            start += hit
+        else:
+            segments.append((start, x, v, moving))
+            return segments
+
+
+def axis_position(segments, ticks, friction):
+    """Position ticks from now on a path from axis_segments"""
+    for start, x0, v0, length in reversed(segments):
+        if ticks >= start:
+            k = min(ticks - start, length)
+            return x0 + v0 * (1 - friction ** k) / (1 - friction)
+    return segments[0][1]
+
+
+def axis_velocity(segments, ticks, friction):
+    """Velocity ticks from now on a path from axis_segments"""
+    for start, x0, v0, length in reversed(segments):
+        if ticks >= start:
+            k = ticks - start
+            return 0.0 if k >= length and start == segments[-1][0] else v0 * friction ** k
+    return segments[0][2]
+
+
 class Ball:
+    __slots__ = ("x", "y", "radius", "color", "velocity", "last_passer",
+                 "friction", "bounce_damping", "min_velocity")
+
     def __init__(self, x, y, radius=8, color=(255, 255, 255)):
         self.x = x
         self.y = y
@@ -15,14 +85,10 @@ class Ball:
         self.bounce_damping = 0.7
         self.min_velocity = 0.1
 
-    def draw(self, screen):
-        # Draw ball with shadow effect
-        shadow_offset = 3
-        pygame.draw.circle(screen, (100, 100, 100), 
-                          (int(self.x + shadow_offset), int(self.y + shadow_offset)), 
-                          self.radius)
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(screen, (200, 200, 200), (int(self.x), int(self.y)), self.radius, 2)
+    def draw(self, screen, cache=None):
+        """Draw the ball and return the screen area it covers (see renderer.draw_ball)"""
+        from renderer import draw_ball
+        return draw_ball(screen, self, cache)
 
     def update(self):
         # Update position
@@ -54,26 +120,58 @@ class Ball:
             self.y = 600 - self.radius
             self.velocity[1] = -self.velocity[1] * self.bounce_damping
 
-    def possessed_by(self, players):
-        """Check if any player is close enough to possess the ball"""
-        closest_player = None
-        min_distance = float('inf')
+    def segments(self, axis):
+        """Closed-form path of the ball along axis 0 (x) or 1 (y), see axis_segments"""
+        position = self.x if axis == 0 else self.y
+        return axis_segments(position, self.velocity[axis], self.radius,
+                             FIELD_SIZE[axis] - self.radius,
+                             self.friction, self.bounce_damping, self.min_velocity)
+
+    def predict(self, ticks):
+        """Where the ball will be after ticks more updates, without stepping it"""
+        return (axis_position(self.segments(0), ticks, self.friction),
+                axis_position(self.segments(1), ticks, self.friction))
+
+    def advance(self, ticks):
+        """Same as ticks calls to update(), in one go"""
+        x_path = self.segments(0)
+        y_path = self.segments(1)
+        self.x = axis_position(x_path, ticks, self.friction)
+        self.y = axis_position(y_path, ticks, self.friction)
+        self.velocity[0] = axis_velocity(x_path, ticks, self.friction)
+        self.velocity[1] = axis_velocity(y_path, ticks, self.friction)
+
+    def rest_tick(self):
+        """Number of updates until the ball stops moving"""
+        ends = [self.segments(axis)[-1] for axis in (0, 1)]
+        return max(start + length for start, _, _, length in ends)
 
-        for p in players:
-            dist = math.hypot(self.x - p.x, self.y - p.y)
-            if dist < min_distance:
-                min_distance = dist
-                closest_player = p
+    def rest_position(self):
+        """Where the ball will come to a stop"""
+        return self.predict(math.inf)
+
+    def possessed_by(self, players, context=None):
+        """Check if any player is close enough to possess the ball
+
+        context is an optional ProximityContext that already knows the
+        closest player to the ball.
+        """
+        if context is not None:
+            closest_player = context.closest
+            min_distance = context.distance(closest_player) if closest_player else float('inf')
+        else:
+            closest_player = None
+            min_distance = float('inf')
+
+            for p in players:
+                dist = math.hypot(self.x - p.x, self.y - p.y)
+                if dist < min_distance:
+                    min_distance = dist
+                    closest_player = p
 
         # Possession range varies by role
-        possession_range = 15
         if closest_player:
-            if closest_player.role == "GK":
-                possession_range = 20
-            elif closest_player.role in ["CB", "LB", "RB"]:
-                possession_range = 16
-
-            if min_distance < possession_range:
+            if min_distance < possession_range(closest_player.role):
                 return closest_player
 
         return None
@@ -82,7 +180,9 @@ class Ball:
         """Reset ball to center of field"""
         self.x = 400
         self.y = 300
-        self.velocity = [0, 0]
+        # Zeroed in place: the same list lives for the whole match
+        self.velocity[0] = 0
+        self.velocity[1] = 0
         self.last_passer = None
 
     def kick(self, direction_x, direction_y, power=1.0):
@@ -0,0 +1,439 @@
+import time
+import numpy as np
+import kernels
+from ball import possession_range
+from formations import formation_433
+from match import Match, WIDTH, HEIGHT
+from player import DECISION_INTERVAL
+from sim_clock import SimClock, TICK_MS
+from vector_engine import POSITION_MIN, POSITION_MAX
+from streams import (stream_key, stream_keys, draw_array, OFFSET_X, OFFSET_Y, SUPPORT, SUPPORT_X, SUPPORT_Y,
+                     SIGHT, TACKLE, MATCH_ROW, ACTION, ACTION_KIND, SHOT_Y, SHOT_POWER,
+                     PASS_TARGET, DRIBBLE_X, DRIBBLE_Y, SCATTER_X, SCATTER_Y)
+
+# AI states, stored as small integers per (match, player)
+POSITIONING, CHASING, SUPPORTING = 0, 1, 2
+URGENCY = np.array([0.6, 1.2, 0.8])  # Indexed by state, see state_urgency
+
+# Role groups used by should_support
+DEFENDER, MIDFIELDER, ATTACKER, KEEPER = 0, 1, 2, 3
+ROLE_GROUPS = {
+    "GK": KEEPER,
+    "CB": DEFENDER, "LB": DEFENDER, "RB": DEFENDER,
+    "CM": MIDFIELDER, "LM": MIDFIELDER, "RM": MIDFIELDER,
+    "LW": ATTACKER, "RW": ATTACKER, "ST": ATTACKER,
+}
+
+BALL_RADIUS = 8
+BALL_BOUNDS = np.array([WIDTH, HEIGHT], dtype=float)
+MAX_KICK = 8.0
+
+
+class BatchMatch:
+    """Many independent matches advanced in lockstep with NumPy.
+
+    Player state has shape (matches, players), ball state has shape
+    (matches,) and every rule of Match.step - ball physics, AI decisions,
+    movement, possession, shooting, passing, dribbling, tackles and goals -
+    is applied to all matches at once. Goals and kick-off resets are handled
+    per match with masks, so matches never wait for each other. Decision
+    timers are staggered as in Match; the extra re-plans on a change of
+    possession are left out, since the whole batch decides in one
+    vectorised pass and has no per-tick spikes to flatten.
+    """
+
+    def __init__(self, n_matches, home_formation=formation_433,
+                 away_formation=formation_433, seed=None, tick_ms=TICK_MS, seeds=None):
+        self.n_matches = n_matches
+        # Match i draws from the counter-based stream of (seed, i), see streams.py,
+        # so its randomness doesn't depend on the size of the batch. With seeds
+        # (one per match) it draws from the stream a lone Match(seed=seeds[i]) has
+        if seeds is None:
+            self.keys = stream_keys(seed, n_matches)
+        else:
+            if len(seeds) != n_matches:
+                raise ValueError(f"{len(seeds)} seeds for {n_matches} matches")
+            self.keys = np.array([stream_key(s) for s in seeds], dtype=np.uint64)
+        self.clock = SimClock(tick_ms)
+        self.profiler = None  # Optional profiler.Profiler, see Match.profiler
+
+        # Per-player constants come from an ordinary Match roster
+        roster = Match(home_formation, away_formation).players
+        self.roster = roster
+        self.team = np.array([0 if p.team == "A" else 1 for p in roster])
+        self.role_group = np.array([ROLE_GROUPS[p.role] for p in roster])
+        self.home = np.array([(p.home_x, p.home_y) for p in roster], dtype=float)
+        self.max_speed = np.array([p.max_speed for p in roster])
+        self.acceleration = np.array([p.acceleration for p in roster])
+        self.friction = np.array([p.friction for p in roster])
+        self.tackle_range = np.array([p.tackle_range for p in roster], dtype=float)
+        self.tackle_success = np.array([p.tackle_success for p in roster])
+        self.support_range = np.array([p.support_range for p in roster], dtype=float)
+        self.possession_range = np.array([possession_range(p.role) for p in roster], dtype=float)
+        # Goal each side falls back to when defending (calculate_support_position)
+        self.defend_x = np.where(self.team == 0, 50.0, 750.0)
+        # +1 when the team attacks to the right, -1 to the left
+        self.direction = np.where(self.team == 0, 1.0, -1.0)
+        self.same_team = self.team[:, None] == self.team[None, :]
+
+        n_players = len(roster)
+        self.position = np.zeros((n_matches, n_players, 2))
+        self.velocity = np.zeros((n_matches, n_players, 2))
+        self.target = np.zeros((n_matches, n_players, 2))
+        self.state = np.zeros((n_matches, n_players), dtype=np.int8)
+        # Staggered like the roster's (DecisionScheduler), the same in every match
+        self.decision_timer = np.tile([p.decision_timer for p in roster], (n_matches, 1))
+
+        self.ball = np.zeros((n_matches, 2))
+        self.ball_velocity = np.zeros((n_matches, 2))
+        self.last_passer = np.full(n_matches, -1)
+
+        self.score = np.zeros((n_matches, 2), dtype=np.int32)
+
+        self.reset()
+
+    @classmethod
+    def from_snapshot(cls, snapshot, n_matches, seed=None):
+        """n_matches continuations of one MatchSnapshot, each with its own randomness"""
+        home, away = snapshot.formations()
+        batch = cls(n_matches, home, away, seed=seed, tick_ms=snapshot.tick_ms)
+        batch.position[:] = snapshot.position
+        batch.velocity[:] = snapshot.velocity
+        batch.target[:] = snapshot.target
+        batch.state[:] = snapshot.state
+        batch.decision_timer[:] = snapshot.decision_timer
+        batch.ball[:] = snapshot.ball[:2]
+        batch.ball_velocity[:] = snapshot.ball[2:]
+        batch.last_passer[:] = snapshot.last_passer
+        batch.score[:] = snapshot.score
+        batch.clock.ticks = snapshot.ticks
+        return batch
+
+    @property
+    def game_time(self):
+        """Simulated milliseconds since kick-off"""
+        return self.clock.time_ms
+
+    @property
+    def ticks(self):
+        return self.clock.ticks
+
+    def reset(self, mask=None):
+        """Kick-off reset (Ball.reset and Player.reset_position) for the masked matches"""
+        if mask is None:
+            mask = np.ones(self.n_matches, dtype=bool)
+        self.ball[mask] = (WIDTH // 2, HEIGHT // 2)
+        self.ball_velocity[mask] = 0
+        self.last_passer[mask] = -1
+        self.position[mask] = self.home
+        self.velocity[mask] = 0
+        self.target[mask] = self.home
+        self.state[mask] = POSITIONING
+
+    def run(self, n_ticks):
+        """Advance every match by n_ticks steps and return the (matches, 2) score array"""
+        for _ in range(n_ticks):
+            self.step()
+        return self.score
+
+    def step(self):
+        """Advance every match by one fixed tick"""
+        self.clock.advance()
+        dt = self.clock.tick_ms
+
+        if self.profiler is not None:
+            self._profiled_step(self.profiler, dt)
+            return
+
+        self._update_ball()
+        self._decide(dt)
+        self._move(dt)
+
+        possessor = self._find_possessor()
+        active = np.flatnonzero(possessor >= 0)
+        if active.size:
+            self._play_ball(active, possessor[active])
+            self._resolve_tackles(active, possessor[active])
+
+        self._check_goals()
+
+    def _profiled_step(self, profiler, dt):
+        """step() with every phase timed by the profiler"""
+        timed = profiler.time
+        start = time.perf_counter_ns()
+
+        timed("ball", self._update_ball)
+        timed("ai", self._decide, dt)
+        timed("movement", self._move, dt)
+
+        possessor = timed("possession", self._find_possessor)
+        active = np.flatnonzero(possessor >= 0)
+        if active.size:
+            timed("play", self._play_ball, active, possessor[active])
+            timed("tackles", self._resolve_tackles, active, possessor[active])
+
+        timed("goals", self._check_goals)
+        profiler.record("tick", start, time.perf_counter_ns())
+
+    def _match_draws(self, matches, purpose, low=0.0, high=1.0):
+        """One uniform draw this tick for each of the given matches (Match's own draws)"""
+        return low + (high - low) * draw_array(self.keys[matches], self.ticks, MATCH_ROW, purpose)
+
+    def _player_draws(self, matches, players, purpose, low=0.0, high=1.0):
+        """Uniform draws this tick for (match, player) pairs; the indices broadcast"""
+        return low + (high - low) * draw_array(self.keys[matches], self.ticks, players, purpose)
+
+    def _rolls(self, matches, chance, purpose):
+        """chance[k, i] < a draw of player i in match matches[k], drawn only where chance > 0"""
+        rolling = np.nonzero(chance > 0)
+        success = np.zeros(chance.shape, dtype=bool)
+        success[rolling] = (self._player_draws(matches[rolling[0]], rolling[1], purpose)
+                            < chance[rolling])
+        return success
+
+    def _draws_at(self, index, shape, purpose, low=0.0, high=1.0):
+        """Draws for the (match, player) pairs of index, in a zero array of shape"""
+        values = np.zeros(shape)
+        values[index] = self._player_draws(index[0], index[1], purpose, low, high)
+        return values
+
+    def _kick(self, matches, direction, power):
+        """Ball.kick for the given matches; direction is an (n, 2) unit vector"""
+        self.ball_velocity[matches] = direction * (MAX_KICK * power)[:, None]
+
+    def _update_ball(self):
+        """Ball.update for every match"""
+        if kernels.ENABLED:
+            kernels.update_balls(self.ball, self.ball_velocity, BALL_RADIUS, BALL_BOUNDS,
+                                 0.98, 0.1, 0.7)
+            return
+        ball = self.ball
+        velocity = self.ball_velocity
+        ball += velocity
+        velocity *= 0.98
+        velocity[np.abs(velocity) < 0.1] = 0
+
+        # Bounce off the edges of the pitch, losing some speed
+        low = ball <= BALL_RADIUS
+        high = ball >= BALL_BOUNDS - BALL_RADIUS
+        ball[:] = np.clip(ball, BALL_RADIUS, BALL_BOUNDS - BALL_RADIUS)
+        velocity[low | high] *= -0.7
+
+    def _decide(self, dt):
+        """Player.decide_action for every player whose decision timer ran out"""
+        due = self.decision_timer >= DECISION_INTERVAL
+        if not due.any():
+            return
+        self.decision_timer[due] = 0
+
+        n_matches, n_players = due.shape
+        # Only the deciding players' numbers are drawn
+        deciding = np.nonzero(due)
+        support_draw = self._draws_at(deciding, due.shape, SUPPORT)
+        forward_draw = self._draws_at(deciding, due.shape, SUPPORT_X, 30, 80)
+        side_draw = self._draws_at(deciding, due.shape, SUPPORT_Y, -60, 60)
+        home_draw = np.stack([self._draws_at(deciding, due.shape, OFFSET_X, -20, 20),
+                              self._draws_at(deciding, due.shape, OFFSET_Y, -20, 20)], axis=-1)
+        if kernels.ENABLED:
+            kernels.decide_players(due, self.position, self.ball, self.team, self.role_group,
+                                   self.support_range, self.direction, self.defend_x, self.home,
+                                   support_draw, forward_draw, side_draw, home_draw,
+                                   (DEFENDER, MIDFIELDER, ATTACKER),
+                                   (POSITIONING, CHASING, SUPPORTING), self.target, self.state)
+            return
+        ball = self.ball[:, None, :]
+        ball_x = self.ball[:, 0:1]
+        ball_distance = np.hypot(*(ball - self.position).transpose(2, 0, 1))
+        closest = ball_distance.argmin(axis=1)
+        closest_team = self.team[closest][:, None]
+
+        chasing = due & (np.arange(n_players) == closest[:, None])
+
+        # should_support: chance depends on role group, side and ball position
+        attacking_half = np.where(self.team == 0, ball_x > 300, ball_x < 500)
+        defending_half = np.where(self.team == 0, ball_x < 400, ball_x > 400)
+        chance = np.select(
+            [(self.role_group == ATTACKER) & attacking_half,
+             np.broadcast_to(self.role_group == MIDFIELDER, due.shape),
+             (self.role_group == DEFENDER) & defending_half],
+            [0.7, 0.5, 0.6], 0.0)
+        supporting = (due & ~chasing & (ball_distance < self.support_range)
+                      & (support_draw < chance))
+        positioning = due & ~chasing & ~supporting
+
+        # calculate_support_position: offer a pass forward, or cut off the goal
+        attack = closest_team == self.team
+        support_target = np.where(
+            attack[..., None],
+            ball + np.stack([self.direction * forward_draw, side_draw], axis=-1),
+            np.stack([np.broadcast_to((ball_x + self.defend_x) / 2, due.shape),
+                      np.broadcast_to((self.ball[:, 1:2] + 300) / 2, due.shape)], axis=-1))
+        home_target = self.home + home_draw
+
+        self.target[chasing] = np.broadcast_to(ball, self.target.shape)[chasing]
+        self.target[supporting] = support_target[supporting]
+        self.target[positioning] = home_target[positioning]
+        self.state[chasing] = CHASING
+        self.state[supporting] = SUPPORTING
+        self.state[positioning] = POSITIONING
+
+    def _move(self, dt):
+        """Player.update_movement and Player.update for every player"""
+        if kernels.ENABLED:
+            kernels.move_players(self.position, self.velocity, self.target, URGENCY[self.state],
+                                 self.max_speed, self.acceleration, self.friction,
+                                 POSITION_MIN, POSITION_MAX)
+            self.decision_timer += dt
+            return
+        delta = self.target - self.position
+        distance = np.hypot(delta[..., 0], delta[..., 1])
+
+        # Steer only players more than 5px from their target (see move_towards)
+        moving = distance > 5
+        safe_distance = np.where(moving, distance, 1.0)
+        desired_speed = np.minimum(self.max_speed * URGENCY[self.state], distance * 0.1)
+        desired = delta / safe_distance[..., None] * desired_speed[..., None]
+        steer = (desired - self.velocity) * self.acceleration[:, None]
+        self.velocity += np.where(moving[..., None], steer, 0.0)
+
+        # Apply friction, move and keep within field bounds
+        self.velocity *= self.friction[:, None]
+        self.position += self.velocity
+        np.maximum(self.position, POSITION_MIN, out=self.position)
+        np.minimum(self.position, POSITION_MAX, out=self.position)
+        self.decision_timer += dt
+
+    def _find_possessor(self):
+        """Ball.possessed_by for every match: player index, or -1 for a loose ball"""
+        if kernels.ENABLED:
+            closest = np.empty(self.n_matches, dtype=np.intp)
+            distance = np.empty(self.n_matches)
+            kernels.closest_players(self.position, self.ball, closest, distance)
+            return np.where(distance < self.possession_range[closest], closest, -1)
+        offset = self.position - self.ball[:, None, :]
+        distance = np.hypot(offset[..., 0], offset[..., 1])
+        closest = distance.argmin(axis=1)
+        rows = np.arange(self.n_matches)
+        in_range = distance[rows, closest] < self.possession_range[closest]
+        return np.where(in_range, closest, -1)
+
+    def _play_ball(self, matches, possessor):
+        """Shoot, pass or dribble for the matches where someone has the ball"""
+        acting = self._match_draws(matches, ACTION) < 0.02  # ~1.2 times per second
+        matches = matches[acting]
+        possessor = possessor[acting]
+        if not matches.size:
+            return
+
+        action = self._match_draws(matches, ACTION_KIND)
+        ball = self.ball[matches]
+        team = self.team[possessor]
+        shoot = np.where(team == 0, ball[:, 0] > 650, ball[:, 0] < 150)
+        pass_ = ~shoot & (action < 0.7)
+        dribble = ~shoot & ~pass_
+
+        if shoot.any():
+            m = matches[shoot]
+            goal = np.stack([np.where(team[shoot] == 0, 800.0, 0.0),
+                             300 + self._match_draws(m, SHOT_Y, -40, 40)], axis=-1)
+            offset = goal - ball[shoot]
+            mag = np.hypot(offset[:, 0], offset[:, 1])
+            kick = mag > 0
+            self._kick(m[kick], offset[kick] / mag[kick, None],
+                       self._match_draws(m, SHOT_POWER, 0.8, 1.0)[kick])
+            self.last_passer[m] = -1
+
+        if pass_.any():
+            self._pass(matches[pass_], possessor[pass_])
+
+        if dribble.any():
+            m = matches[dribble]
+            offset = np.stack([self.direction[possessor[dribble]]
+                               + self._match_draws(m, DRIBBLE_X, -0.5, 0.5),
+                               self._match_draws(m, DRIBBLE_Y, -0.5, 0.5)], axis=-1)
+            mag = np.hypot(offset[:, 0], offset[:, 1])
+            kick = mag > 0
+            self._kick(m[kick], offset[kick] / mag[kick, None], np.full(kick.sum(), 0.4))
+
+    def _pass(self, matches, possessor):
+        """Pick a visible, preferably forward, teammate and pass to them"""
+        n_players = len(self.roster)
+        if kernels.ENABLED:
+            chance = np.empty((matches.size, n_players))
+            ahead = np.empty((matches.size, n_players), dtype=bool)
+            kernels.pass_chances(self.position, matches, possessor, self.last_passer,
+                                 self.same_team, self.direction, 180.0, chance, ahead)
+        else:
+            players = np.arange(n_players)
+            passer = self.position[matches, possessor]
+            offset = self.position[matches] - passer[:, None, :]
+            distance = np.hypot(offset[..., 0], offset[..., 1])
+
+            # Teammates other than the passer and whoever passed to them
+            teammates = (self.same_team[possessor]
+                         & (players != possessor[:, None])
+                         & (players != self.last_passer[matches][:, None]))
+            # can_see: nobody beyond 180px, closer teammates are easier to spot
+            chance = np.where(teammates & (distance <= 180),
+                              np.maximum(0.3, 1.0 - distance / 200.0), 0.0)
+            ahead = self.direction[possessor][:, None] * offset[..., 0] > -30
+        visible = self._rolls(matches, chance, SIGHT)
+        forward = visible & ahead
+        candidates = np.where(forward.any(axis=1)[:, None], forward, visible)
+        has_target = candidates.any(axis=1)
+        if not has_target.any():
+            return
+
+        # Uniform choice among candidates in roster order, as in Match
+        matches = matches[has_target]
+        candidates = candidates[has_target]
+        pick = (self._match_draws(matches, PASS_TARGET) * candidates.sum(axis=1)).astype(int)
+        target = (candidates.cumsum(axis=1) > pick[:, None]).argmax(axis=1)
+        offset = self.position[matches, target] - self.ball[matches]
+        mag = np.hypot(offset[:, 0], offset[:, 1])
+        kick = mag > 0
+        self._kick(matches[kick], offset[kick] / mag[kick, None],
+                   np.minimum(1.0, mag[kick] / 150.0))
+        self.last_passer[matches] = possessor[has_target]
+
+    def _resolve_tackles(self, matches, possessor):
+        """Every opponent within tackle range gets a chance to win the ball"""
+        if kernels.ENABLED:
+            chance = np.empty((matches.size, len(self.roster)))
+            kernels.tackle_chances(self.position, matches, possessor, ~self.same_team,
+                                   self.tackle_range, self.tackle_success, chance)
+        else:
+            carrier = self.position[matches, possessor]
+            offset = carrier[:, None, :] - self.position[matches]
+            distance = np.hypot(offset[..., 0], offset[..., 1])
+
+            opponents = ~self.same_team[possessor]
+            in_range = opponents & (distance <= self.tackle_range)
+            success = (self.tackle_success
+                       + (self.tackle_range - distance) / self.tackle_range * 0.15)
+            chance = np.where(in_range, success, 0.0)
+        won = self._rolls(matches, chance, TACKLE).any(axis=1)
+        if not won.any():
+            return
+
+        # Loose ball in a random direction
+        matches = matches[won]
+        offset = np.stack([self._match_draws(matches, SCATTER_X, -1, 1),
+                           self._match_draws(matches, SCATTER_Y, -1, 1)], axis=-1)
+        mag = np.hypot(offset[:, 0], offset[:, 1])
+        kick = mag > 0
+        self._kick(matches[kick], offset[kick] / mag[kick, None], np.full(kick.sum(), 0.3))
+        self.last_passer[matches] = -1
+
+    def _check_goals(self):
+        """Score and restart every match where the ball is inside a goal"""
+        x = self.ball[:, 0]
+        y = self.ball[:, 1]
+        goal_mouth = (y >= 250) & (y < 350)
+        left = goal_mouth & (x >= 0) & (x < 10)      # LEFT_GOAL: Team B scores
+        right = goal_mouth & (x >= 790) & (x < 800)  # RIGHT_GOAL: Team A scores
+        scored = left | right
+        if scored.any():
+            self.score[:, 0] += right
+            self.score[:, 1] += left
+            self.reset(scored)
@@ -0,0 +1,160 @@
+import argparse
+import sys
+from benchmarks import runner
+from benchmarks.scenarios import (SCENARIOS, TICKS_PER_MATCH, STARTUP_BUDGET_MS, HEAVY_MODULES,
+                                  import_time, spatial_queries)
+
+HEADLESS_MODULES = ("match", "simulate")  # Entry points held to the start-up budget
+
+
+def check_startup(budget_ms, repeat):
+    """Import each headless entry point fresh and check it against the budget
+
+    The best of repeat runs is taken, so a busy machine doesn't fail the
+    check. Loading any of HEAVY_MODULES fails it regardless of time.
+    """
+    ok = True
+    for module in HEADLESS_MODULES:
+        runs = [import_time(module) for _ in range(repeat)]
+        elapsed = min(ms for ms, _ in runs)
+        heavy = sorted(set().union(*(loaded for _, loaded in runs)))
+        problems = []
+        if elapsed > budget_ms:
+            problems.append(f"over {budget_ms:.0f} ms")
+        if heavy:
+            problems.append(f"loads {', '.join(heavy)}")
+        print(f"import {module:<10}{elapsed:>8.1f} ms  {'; '.join(problems) or 'ok'}")
+        ok &= not problems
+    return ok
+
+
+def check_kernels(n_ticks, n_matches, repeat):
+    """Time the vector and batch engines with the Numba kernels and without
+
+    Fails if the kernels don't make an engine faster. Kept out of the
+    unit tests, where a loaded machine or a first compile would make a
+    timing assertion fail at random.
+    """
+    import kernels
+    if not kernels.AVAILABLE:
+        print("Numba is not installed: nothing to check")
+        return True
+    ok = True
+    for engine in ("vector", "batch"):
+        with_kernels, without = kernels.benchmark(engine, n_ticks, n_matches, repeat)
+        unit = "match-ticks/s" if engine == "batch" else "ticks/s"
+        faster = with_kernels > without
+        print(f"{engine:<8}{with_kernels:>12.0f} {unit} with kernels, {without:.0f} without "
+              f"({with_kernels / without:.2f}x)  {'ok' if faster else 'no faster'}")
+        ok &= faster
+    return ok
+
+
+def check_spatial(n_agents, width, height, radius, n_ticks, repeat):
+    """Time SpatialGrid against a straight scan for many agents on a large pitch
+
+    Fails if the grid finds different neighbours or is no faster. Each
+    timing is the best of repeat runs.
+    """
+    runs = [spatial_queries(n_agents, width, height, radius, n_ticks) for _ in range(repeat)]
+    grid_s = min(run[0] for run in runs)
+    scan_s = min(run[1] for run in runs)
+    same = all(run[2] for run in runs)
+    queries = n_agents * n_ticks
+    faster = grid_s < scan_s
+    print(f"{n_agents} agents on {width}x{height}, radius {radius}: "
+          f"grid {queries / grid_s:.0f} queries/s, scan {queries / scan_s:.0f} queries/s "
+          f"({scan_s / grid_s:.1f}x)  "
+          f"{'ok' if same and faster else 'different neighbours' if not same else 'no faster'}")
+    return same and faster
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Simulation and rendering benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run scenarios and save the results as JSON")
+    run_parser.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                            help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    run_parser.add_argument("-o", "--output", default="benchmark.json", help="Results file")
+    run_parser.add_argument("--ticks", type=int, default=TICKS_PER_MATCH,
+                            help="Ticks per run (render scenarios draw one frame per 10 ticks)")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the median is kept")
+    run_parser.add_argument("--baseline", help="Compare against this results file afterwards")
+    run_parser.add_argument("--threshold", type=float, default=runner.DEFAULT_THRESHOLD,
+                            help="Relative change that counts as a regression (0.1 = 10%%)")
+
+    compare_parser = commands.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=runner.DEFAULT_THRESHOLD,
+                                help="Relative change that counts as a regression (0.1 = 10%%)")
+
+    startup_parser = commands.add_parser(
+        "startup", help=f"Check that the headless modules import without {', '.join(HEAVY_MODULES)} "
+                        "and within the start-up budget")
+    startup_parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+                                help="Longest allowed import, in milliseconds")
+    startup_parser.add_argument("--repeat", type=int, default=5, help="Imports per module; the best is kept")
+
+    kernels_parser = commands.add_parser(
+        "kernels", help="Check that the Numba kernels speed up the vector and batch engines")
+    kernels_parser.add_argument("--ticks", type=int, default=3000, help="Ticks per timing run")
+    kernels_parser.add_argument("--matches", type=int, default=1000,
+                                help="Matches in the batch timing run")
+    kernels_parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best is kept")
+
+    spatial_parser = commands.add_parser(
+        "spatial", help="Check that SpatialGrid beats a straight scan for many agents on a large pitch")
+    spatial_parser.add_argument("--agents", type=int, default=1000, help="Agents on the pitch")
+    spatial_parser.add_argument("--width", type=int, default=4000, help="Pitch width")
+    spatial_parser.add_argument("--height", type=int, default=3000, help="Pitch height")
+    spatial_parser.add_argument("--radius", type=float, default=25,
+                                help="Query radius (default: the largest tackle range)")
+    spatial_parser.add_argument("--ticks", type=int, default=5, help="Ticks per timing run")
+    spatial_parser.add_argument("--repeat", type=int, default=3, help="Runs; the best is kept")
+
+    commands.add_parser("list", help="List the scenarios")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print("\n".join(SCENARIOS))
+        return 0
+
+    if args.command == "startup":
+        return 0 if check_startup(args.budget, args.repeat) else 1
+
+    if args.command == "kernels":
+        return 0 if check_kernels(args.ticks, args.matches, args.repeat) else 1
+
+    if args.command == "spatial":
+        return 0 if check_spatial(args.agents, args.width, args.height, args.radius, args.ticks,
+                                  args.repeat) else 1
+
+    if args.command == "run":
+        unknown = [name for name in args.scenarios if name not in SCENARIOS]
+        if unknown:
+            parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+        def progress(name, result, elapsed):
+            print(f"{name} ({elapsed:.1f}s)", file=sys.stderr)
+
+        current = runner.run(args.scenarios, args.ticks, args.repeat, progress)
+        runner.save(current, args.output)
+        runner.print_results(current)
+        print(f"Results written to {args.output}")
+        if not args.baseline:
+            return 0
+        baseline = runner.load(args.baseline)
+    else:
+        baseline = runner.load(args.baseline)
+        current = runner.load(args.current)
+
+    rows = runner.compare(baseline, current, args.threshold)
+    runner.print_comparison(rows, args.threshold)
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.scenarios import SCENARIOS, TICKS_PER_MATCH
+
+DEFAULT_THRESHOLD = 0.10  # Flag changes more than 10% in the wrong direction
+
+
+def machine_info():
+    """Where and on what the benchmarks ran"""
+    info = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+    }
+    for module in ("numpy", "pygame", "numba"):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = None
+    try:
+        info["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                        capture_output=True, text=True, check=True,
+                                        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                                        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info["commit"] = None
+    return info
+
+
+def run_scenario(scenario, n_ticks, repeat):
+    """Run a scenario repeat times and keep the median of every metric"""
+    runs = [scenario(n_ticks) for _ in range(repeat)]
+    result = {}
+    for name, first in runs[0].items():
+        values = [run[name]["value"] for run in runs]
+        result[name] = dict(first, value=statistics.median(values), runs=values)
+    return result
+
+
+def run(names=None, n_ticks=TICKS_PER_MATCH, repeat=3, progress=None):
+    """Run the named scenarios (default: all) and return the results document"""
+    names = names or list(SCENARIOS)
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        results[name] = run_scenario(SCENARIOS[name], n_ticks, repeat)
+        if progress:
+            progress(name, results[name], time.perf_counter() - start)
+    return {"machine": machine_info(), "ticks": n_ticks, "repeat": repeat, "results": results}
+
+
+def save(document, path):
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Relative change of every metric present in both documents
+
+    Returns (scenario, metric, baseline value, current value, change,
+    regressed) rows; change is positive when the metric got better.
+    Metrics without a direction (higher_is_better None) are never flagged.
+    """
+    rows = []
+    for scenario, metrics in current["results"].items():
+        old_metrics = baseline["results"].get(scenario, {})
+        for name, new in metrics.items():
+            old = old_metrics.get(name)
+            if old is None or not old["value"]:
+                continue
+            direction = new.get("higher_is_better")
+            change = (new["value"] - old["value"]) / old["value"]
+            if direction is False:
+                change = -change
+            regressed = direction is not None and change < -threshold
+            rows.append((scenario, name, old["value"], new["value"], change, regressed))
+    return rows
+
+
+def print_results(document, file=sys.stdout):
+    for scenario, metrics in document["results"].items():
+        for name, m in metrics.items():
+            print(f"{scenario:<18}{name:<15}{m['value']:>14.1f} {m['unit']}", file=file)
+
+
+def print_comparison(rows, threshold, file=sys.stdout):
+    print(f"{'scenario':<18}{'metric':<15}{'baseline':>12}{'current':>12}{'change':>9}", file=file)
+    for scenario, name, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{scenario:<18}{name:<15}{old:>12.1f}{new:>12.1f}{change:>+9.1%}{flag}", file=file)
+    regressions = sum(row[-1] for row in rows)
+    print(f"{regressions} regression(s) beyond {threshold:.0%}", file=file)
@@ -0,0 +1,225 @@
+import gc
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+import formations
+from match import Match, HEIGHT, WIDTH
+from vector_engine import VectorMatch
+from batch_engine import BatchMatch
+
+SEED = 1234
+TICKS_PER_MATCH = 3600  # One simulated minute at the default tick
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_BUDGET_MS = 100  # Longest a headless entry point may take to import
+HEAVY_MODULES = ("pygame", "numpy", "numba")  # Loaded on demand only
+
+
+def metric(value, unit, higher_is_better=True):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def throughput(match, n_ticks):
+    """Ticks and matches per second for n_ticks steps of a match"""
+    start = time.perf_counter()
+    match.run(n_ticks)
+    elapsed = time.perf_counter() - start
+    return {
+        "ticks_per_s": metric(n_ticks / elapsed, "ticks/s"),
+        "matches_per_s": metric(n_ticks / elapsed / TICKS_PER_MATCH, "matches/s"),
+    }
+
+
+def headless(engine, home, away):
+    """Plain match between two formations"""
+    def scenario(n_ticks):
+        match = engine(formations.get(home), formations.get(away), seed=SEED)
+        return throughput(match, n_ticks)
+    return scenario
+
+
+def long_possession(engine):
+    """Nobody can win a tackle, so the ball stays with one side for long spells"""
+    def scenario(n_ticks):
+        match = engine(seed=SEED)
+        for player in match.players:
+            player.tackle_success = -1.0
+        return throughput(match, n_ticks)
+    return scenario
+
+
+def goal_heavy(engine, every=45):
+    """A shot from close range every `every` ticks, alternating ends"""
+    def scenario(n_ticks):
+        match = engine(seed=SEED)
+
+        def shoot(match):
+            if match.ticks % every == 0:
+                right = (match.ticks // every) % 2
+                match.ball.x = WIDTH - 80 if right else 80
+                match.ball.y = HEIGHT / 2
+                match.kick_towards(WIDTH if right else 0, HEIGHT / 2)
+        match.tick_listeners.append(shoot)
+
+        result = throughput(match, n_ticks)
+        result["goals"] = metric(match.score["A"] + match.score["B"], "goals", None)
+        return result
+    return scenario
+
+
+def batch(n_matches):
+    """Many matches in lockstep with the batch engine"""
+    def scenario(n_ticks):
+        matches = BatchMatch(n_matches, formations.formation_433, formations.formation_442, seed=SEED)
+        start = time.perf_counter()
+        matches.run(n_ticks)
+        elapsed = time.perf_counter() - start
+        return {
+            "ticks_per_s": metric(n_matches * n_ticks / elapsed, "match-ticks/s"),
+            "matches_per_s": metric(n_matches * n_ticks / elapsed / TICKS_PER_MATCH, "matches/s"),
+        }
+    return scenario
+
+
+def render(mode):
+    """Frames per second of a renderer on the dummy SDL video driver"""
+    def scenario(n_ticks):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+        from renderer import RENDERERS
+
+        pygame.display.init()
+        pygame.font.init()
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        renderer = RENDERERS[mode](screen)
+        match = Match(seed=SEED)
+        n_frames = max(1, n_ticks // 10)
+
+        start = time.perf_counter()
+        for _ in range(n_frames):
+            match.step()
+            renderer.draw_frame(match, False)
+        elapsed = time.perf_counter() - start
+        pygame.display.quit()
+        return {"fps": metric(n_frames / elapsed, "frames/s")}
+    return scenario
+
+
+def import_time(module):
+    """Import a module in a fresh interpreter
+
+    Returns the milliseconds the import took and which of HEAVY_MODULES it
+    loaded. Interpreter start-up itself is not counted.
+    """
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            f"import {module}\n"
+            "print((time.perf_counter() - start) * 1000)\n"
+            f"print(*(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout.splitlines()
+    return float(output[0]), output[1].split()
+
+
+def startup(module):
+    """Cold import of a headless entry point"""
+    def scenario(n_ticks):
+        elapsed, _ = import_time(module)
+        return {"import_ms": metric(elapsed, "ms", higher_is_better=False)}
+    return scenario
+
+
+def spatial_queries(n_agents, width, height, radius, n_ticks, seed=SEED):
+    """Every agent asks for its neighbours within radius, tick after tick
+
+    Agents take a small random step each tick, then each one runs a
+    fixed-radius query, answered once by a SpatialGrid (including the pass
+    that keeps it in sync) and once by scanning every agent. Returns the
+    seconds each took and whether they found the same neighbours.
+    """
+    from spatial import SpatialGrid
+    rng = random.Random(seed)
+    agents = [[rng.uniform(0, width), rng.uniform(0, height)] for _ in range(n_agents)]
+    grid = SpatialGrid(width, height)
+    for i, (x, y) in enumerate(agents):
+        grid.insert(i, x, y)
+
+    grid_s = scan_s = 0.0
+    same = True
+    for _ in range(n_ticks):
+        for agent in agents:
+            agent[0] = min(max(agent[0] + rng.uniform(-3, 3), 0), width)
+            agent[1] = min(max(agent[1] + rng.uniform(-3, 3), 0), height)
+
+        start = time.perf_counter()
+        for i, (x, y) in enumerate(agents):
+            grid.move(i, x, y)
+        by_grid = [grid.query_radius(x, y, radius) for x, y in agents]
+        grid_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        by_scan = [[j for j, (ox, oy) in enumerate(agents) if math.hypot(ox - x, oy - y) <= radius]
+                   for x, y in agents]
+        scan_s += time.perf_counter() - start
+        same &= by_grid == by_scan
+    return grid_s, scan_s, same
+
+
+def peak_memory(engine):
+    """Peak Python heap while building and running a match"""
+    def scenario(n_ticks):
+        tracemalloc.start()
+        try:
+            match = engine(seed=SEED)
+            match.run(n_ticks // 4)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {"peak_kib": metric(peak / 1024, "KiB", higher_is_better=False)}
+    return scenario
+
+
+def tick_allocations(engine, warmup=600):
+    """Memory churn and garbage collections per tick once a match is warmed up"""
+    def scenario(n_ticks):
+        match = engine(seed=SEED)
+        match.run(warmup)
+        collections = sum(stats["collections"] for stats in gc.get_stats())
+        tracemalloc.start()
+        try:
+            start, _ = tracemalloc.get_traced_memory()
+            match.run(n_ticks)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        collections = sum(stats["collections"] for stats in gc.get_stats()) - collections
+        return {
+            "peak_bytes": metric(peak - start, "B", higher_is_better=False),
+            "retained_bytes": metric(current - start, "B", higher_is_better=False),
+            "gc_per_1k_ticks": metric(1000 * collections / n_ticks, "collections",
+                                      higher_is_better=False),
+        }
+    return scenario
+
+
+SCENARIOS = {
+    "433v433_object": headless(Match, "formation_433", "formation_433"),
+    "433v433_vector": headless(VectorMatch, "formation_433", "formation_433"),
+    "433v442_object": headless(Match, "formation_433", "formation_442"),
+    "433v442_vector": headless(VectorMatch, "formation_433", "formation_442"),
+    "long_possession": long_possession(Match),
+    "goal_heavy": goal_heavy(Match),
+    "batch_256": batch(256),
+    "render_full": render("full"),
+    "render_dirty": render("dirty"),
+    "memory_object": peak_memory(Match),
+    "memory_vector": peak_memory(VectorMatch),
+    "alloc_object": tick_allocations(Match),
+    "alloc_vector": tick_allocations(VectorMatch),
+    "startup_match": startup("match"),
+    "startup_simulate": startup("simulate"),
+}
@@ -0,0 +1,185 @@
+import json
+import queue
+import threading
+from dataclasses import dataclass, asdict
+
+# Event kinds
+PASS = "pass"
+SHOT = "shot"
+DRIBBLE = "dribble"
+TACKLE = "tackle"
+MISSED_TACKLE = "missed_tackle"  # A tackle in range that didn't win the ball
+GOAL = "goal"
+POSSESSION = "possession"
+
+KINDS = (PASS, SHOT, DRIBBLE, TACKLE, MISSED_TACKLE, GOAL, POSSESSION)
+
+
+@dataclass
+class MatchEvent:
+    """Something that happened on the pitch during one tick.
+
+    player/role/team describe who did it (the passer, shooter, tackler,
+    scoring team...) and x/y where. target is the other player involved,
+    if any: the pass receiver, or the player who was tackled. Goals carry
+    the score after the goal.
+    """
+    kind: str
+    tick: int
+    player: str
+    role: str
+    team: str
+    x: float
+    y: float
+    target: str = None
+    target_role: str = None
+    score_a: int = None
+    score_b: int = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def player_event(kind, tick, player, target=None):
+    """MatchEvent for an action by player, at the player's position"""
+    return MatchEvent(kind, tick, player.name, player.role, player.team, player.x, player.y,
+                      target.name if target else None, target.role if target else None)
+
+
+class EventBus:
+    """Delivers match events to any number of subscribers.
+
+    Publishers check `active` before building an event, so a match nobody
+    listens to pays nothing for the event stream.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+
+    @property
+    def active(self):
+        return bool(self.subscribers)
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def publish(self, event):
+        for callback in self.subscribers:
+            callback(event)
+
+
+class ConsoleSubscriber:
+    """Prints commentary lines for tackles and goals"""
+
+    def __init__(self, kinds=(TACKLE, GOAL)):
+        self.kinds = kinds
+
+    def __call__(self, event):
+        if event.kind not in self.kinds:
+            return
+        if event.kind == TACKLE:
+            print(f"{event.role} tackles {event.target_role}!")
+        elif event.kind == GOAL:
+            print(f"GOAL! Team {event.team} scores! Score: {event.score_a} - {event.score_b}")
+        else:
+            print(f"[{event.tick}] {event.kind}: {event.player} ({event.role}, Team {event.team})")
+
+
+class JsonlWriter:
+    """Writes batches of events to a file as JSON lines"""
+
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def write_batch(self, events):
+        self.file.write("".join(json.dumps(event.to_dict()) + "\n" for event in events))
+
+    def close(self):
+        self.file.close()
+
+
+class QueueSink:
+    """Event subscriber that hands events to a writer on a background thread.
+
+    Events are collected into batches of batch_size on the publishing side
+    and each full batch goes onto a bounded queue (max_batches deep). A
+    background thread takes batches off the queue and passes them to
+    writer.write_batch, so the simulation never waits on disk or stdout.
+    When the queue is full the publisher blocks until there is room, or
+    with drop_when_full the batch is discarded and its size added to
+    `dropped`. flush() submits a partial batch; close() drains everything
+    and closes the writer.
+
+    If write_batch raises, the thread keeps taking batches off the queue
+    and drops them, so the publisher never blocks on a dead writer, and
+    the error is raised again from the next flush() or close().
+    """
+
+    _STOP = object()
+
+    def __init__(self, writer, batch_size=256, max_batches=64, drop_when_full=False):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.drop_when_full = drop_when_full
+        self.dropped = 0
+        self.error = None  # What write_batch raised, once it has failed
+        self._dropped_lock = threading.Lock()
+        self._batch = []
+        self.queue = queue.Queue(max_batches)
+        self.thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self.thread.start()
+
+    def __call__(self, event):
+        self._batch.append(event)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Hand the events collected so far to the writer thread"""
+        self._submit()
+        if self.error is not None:
+            raise self.error
+
+    def _submit(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        if self.drop_when_full or self.error is not None:
+            try:
+                self.queue.put_nowait(batch)
+            except queue.Full:
+                self._drop(batch)
+        else:
+            self.queue.put(batch)
+
+    def _drop(self, batch):
+        with self._dropped_lock:
+            self.dropped += len(batch)
+
+    def _run(self):
+        while True:
+            batch = self.queue.get()
+            if batch is self._STOP:
+                break
+            if self.error is not None:
+                self._drop(batch)
+                continue
+            try:
+                self.writer.write_batch(batch)
+            except Exception as error:
+                self.error = error
+                self._drop(batch)
+
+    def close(self):
+        try:
+            self._submit()
+        finally:
+            self.queue.put(self._STOP)
+            self.thread.join()
+            self.writer.close()
+        if self.error is not None:
+            raise self.error
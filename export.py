@@ -0,0 +1,221 @@
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+from match import WIDTH, HEIGHT
+from renderer import Renderer, draw_field
+from replay import Replay
+from spectator import StreamView
+
+FRAME_BYTES = WIDTH * HEIGHT * 3  # One raw RGB24 frame
+FORMATS = ("raw", "png", "pipe")
+
+
+def init_video():
+    """Initialise pygame for drawing without a window (SDL dummy video driver)"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    # A display surface lets the pitch and sprites be converted to its pixel format
+    pygame.display.set_mode((WIDTH, HEIGHT))
+
+
+class FrameExporter:
+    """Draws the records of a replay onto an offscreen Surface.
+
+    The pitch is drawn once to a background surface; each frame blits it
+    and draws players, ball and HUD over it through a Renderer with its
+    RenderCache, exactly as the live game would, minus the display flip.
+    """
+
+    def __init__(self, path):
+        self.replay = Replay(path)
+        self.view = StreamView(self.replay.roster)
+        self.surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
+        draw_field(self.background)
+        self.renderer = Renderer(self.surface)
+        # 24-bit surface in R, G, B byte order, whose pixel buffer is the RGB24
+        # frame (rows have no padding as WIDTH * 3 is a multiple of 4); one
+        # blit into it is over twice as fast as pygame.image.tobytes
+        self.rgb = pygame.Surface((WIDTH, HEIGHT), 0, 24, (0xFF, 0xFF00, 0xFF0000, 0))
+
+    def render(self, i):
+        """The frame of record i (the surface is reused for the next frame)"""
+        frame = self.replay.frame(i)
+        frame["time_ms"] = frame["tick"] * self.replay.tick_ms
+        self.view.apply(frame)
+        self.surface.blit(self.background, (0, 0))
+        self.renderer.draw_sprites(self.view, False)
+        return self.surface
+
+    def rgb_bytes(self):
+        """The last rendered frame as RGB24 bytes"""
+        self.rgb.blit(self.surface, (0, 0))
+        return self.rgb.get_buffer().raw
+
+
+_exporters = {}  # Per worker process: replay path -> FrameExporter
+
+
+def render_chunk(path, records, first, fmt, output=None):
+    """Render the given replay records as frames first, first + 1, ...
+
+    png writes one file per frame into the output directory and raw writes
+    each frame at its own offset of the output file, so chunks can finish
+    in any order. For pipe the frames come back as bytes, to be written in
+    order by the caller. Returns (frames, seconds spent, bytes).
+    """
+    start = time.perf_counter()
+    exporter = _exporters.get(path)
+    if exporter is None:
+        exporter = _exporters[path] = FrameExporter(path)
+
+    frames = []
+    raw = open(output, "r+b") if fmt == "raw" else None
+    try:
+        for n, i in enumerate(records, first):
+            surface = exporter.render(i)
+            if fmt == "png":
+                pygame.image.save(surface, os.path.join(output, f"frame_{n:06d}.png"))
+                continue
+            data = exporter.rgb_bytes()
+            if raw is not None:
+                raw.seek(n * FRAME_BYTES)
+                raw.write(data)
+            else:
+                frames.append(data)
+    finally:
+        if raw is not None:
+            raw.close()
+    return len(records), time.perf_counter() - start, b"".join(frames)
+
+
+def frame_records(replay, fps, start_ms=0, end_ms=None):
+    """Indices of the replay records that become frames at fps
+
+    start_ms and end_ms are match times, as for Replay.index_at. A window
+    that is empty or doesn't overlap the recording raises ValueError
+    instead of being clamped to its first or last record.
+    """
+    begin = replay.first_tick * replay.tick_ms
+    finish = begin + replay.duration_ms
+    if end_ms is not None and end_ms <= start_ms:
+        raise ValueError(f"end {end_ms / 60000:g} min is not after start {start_ms / 60000:g} min")
+    if start_ms >= finish:
+        raise ValueError(f"start {start_ms / 60000:g} min is past the end of the recording "
+                         f"({finish / 60000:g} min)")
+    if end_ms is not None and end_ms < begin:
+        raise ValueError(f"end {end_ms / 60000:g} min is before the recording starts "
+                         f"({begin / 60000:g} min)")
+    step = max(1, round(1000 / fps / (replay.tick_ms * replay.every)))
+    first = replay.index_at(start_ms)
+    last = len(replay) if end_ms is None else replay.index_at(end_ms) + 1
+    return range(first, last, step)
+
+
+def export(path, fmt, output, fps=30, start_ms=0, end_ms=None, workers=None, chunk_size=60,
+           encoder=None, progress=None):
+    """Render a replay to raw RGB frames, PNGs or an encoder's stdin
+
+    Frame ranges of chunk_size frames are split across a process pool of
+    workers (workers=1 renders in this process). At most two chunks per
+    worker are in flight, so piping to an encoder stays within a fixed
+    amount of memory. Returns (frames, wall seconds, render seconds summed
+    over the workers).
+    """
+    records = frame_records(Replay(path), fps, start_ms, end_ms)
+    n_frames = len(records)
+    chunks = [(records[k:k + chunk_size], k) for k in range(0, n_frames, chunk_size)]
+
+    encoder_process = None
+    if fmt == "raw":
+        with open(output, "wb") as f:
+            f.truncate(n_frames * FRAME_BYTES)
+    elif fmt == "png":
+        os.makedirs(output, exist_ok=True)
+    else:
+        command = encoder.format(width=WIDTH, height=HEIGHT, fps=fps)
+        encoder_process = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE)
+
+    done = 0
+    busy = 0.0
+
+    def finished(result):
+        nonlocal done, busy
+        frames, seconds, data = result
+        done += frames
+        busy += seconds
+        if encoder_process is not None:
+            encoder_process.stdin.write(data)
+        if progress:
+            progress(done, n_frames)
+
+    start = time.perf_counter()
+    try:
+        if workers == 1:
+            init_video()
+            for chunk, first in chunks:
+                finished(render_chunk(path, chunk, first, fmt, output))
+        else:
+            workers = workers or os.cpu_count()
+            with ProcessPoolExecutor(workers, initializer=init_video) as pool:
+                pending = deque()
+                for chunk, first in chunks:
+                    pending.append(pool.submit(render_chunk, path, chunk, first, fmt, output))
+                    if len(pending) >= 2 * workers:
+                        finished(pending.popleft().result())
+                while pending:
+                    finished(pending.popleft().result())
+    finally:
+        if encoder_process is not None:
+            encoder_process.stdin.close()
+            encoder_process.wait()
+    return n_frames, time.perf_counter() - start, busy
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render a recorded match to video frames offscreen, across worker processes")
+    parser.add_argument("replay", help="Replay file written by simulate.py --record")
+    parser.add_argument("output", nargs="?",
+                        help="raw: output file, png: output directory (unused for pipe)")
+    parser.add_argument("--format", choices=FORMATS, default="raw",
+                        help="raw: one file of RGB24 frames, png: one image per frame, "
+                             "pipe: RGB24 frames on the stdin of --encoder")
+    parser.add_argument("--encoder",
+                        default="ffmpeg -y -loglevel error -f rawvideo -pix_fmt rgb24 "
+                                "-s {width}x{height} -r {fps} -i - match.mp4",
+                        help="Encoder command for --format pipe; {width}, {height} and {fps} "
+                             "are filled in")
+    parser.add_argument("--fps", type=float, default=30, help="Frames per second of match time")
+    parser.add_argument("--start", type=float, default=0, help="First minute to render")
+    parser.add_argument("--end", type=float, help="Last minute to render (default: to the end)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count; 1 = no pool)")
+    parser.add_argument("--chunk-size", type=int, default=60, help="Frames per work item")
+    args = parser.parse_args()
+    if args.format != "pipe" and not args.output:
+        parser.error(f"--format {args.format} needs an output path")
+
+    def progress(done, total):
+        print(f"\r{done}/{total} frames", end="", file=sys.stderr, flush=True)
+
+    try:
+        n_frames, elapsed, busy = export(
+            args.replay, args.format, args.output, args.fps, args.start * 60000,
+            None if args.end is None else args.end * 60000, args.workers, args.chunk_size,
+            args.encoder, progress)
+    except ValueError as error:
+        parser.error(str(error))
+    print(file=sys.stderr)
+    print(f"{n_frames} frames in {elapsed:.2f}s: {n_frames / elapsed:.0f} frames/s, "
+          f"{n_frames / busy:.0f} frames/s per core")
+
+
+if __name__ == "__main__":
+    main()
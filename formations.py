@@ -1,48 +1,109 @@
-def formation_433(team_side):
-    """
-    4-3-3 Formation setup
-    team_side: "left" or "right"
-    Returns list of (role, x, y) for player positions
-    """
-    positions = [
-        ("GK", 0, 300),     # Goalkeeper
-        ("LB", 50, 150),    # Left Back
-        ("CB", 50, 250),    # Center Back 1
-        ("CB", 50, 350),    # Center Back 2
-        ("RB", 50, 450),    # Right Back
-        ("LM", 150, 180),   # Left Midfielder
-        ("CM", 150, 300),   # Center Midfielder
-        ("RM", 150, 420),   # Right Midfielder
-        ("LW", 250, 150),   # Left Winger
-        ("ST", 250, 300),   # Striker
-        ("RW", 250, 450),   # Right Winger
-    ]
-
-    if team_side == "left":
-        return [(role, x + 50, y) for role, x, y in positions]
-    elif team_side == "right":
-        # Flip X-axis across the midline (800px field width)
-        return [(role, 800 - x - 50, y) for role, x, y in positions]
-
-def formation_442(team_side):
+import json
+import os
+
+FIELD_WIDTH = 800
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "formation_data")
+
+
+class Formation:
+    """Starting positions of a team, callable like the original formation functions.
+
+    positions are (role, x, y) for a team defending the left goal, before
+    the 50px offset from the goal line. Both sides' positions are worked out
+    once here: formation("left") and formation("right") return copies of
+    the precomputed lists.
     """
-    4-4-2 Formation setup - Alternative formation
+
+    def __init__(self, name, positions, description=""):
+        self.__name__ = name
+        self.description = description
+        self.positions = [(role, x, y) for role, x, y in positions]
+        self.left = [(role, x + 50, y) for role, x, y in self.positions]
+        # Flip X-axis across the midline
+        self.right = [(role, FIELD_WIDTH - x - 50, y) for role, x, y in self.positions]
+
+    @property
+    def name(self):
+        return self.__name__
+
+    def __call__(self, team_side):
+        if team_side == "left":
+            return list(self.left)
+        elif team_side == "right":
+            return list(self.right)
+
+    def __repr__(self):
+        return f"Formation({self.__name__!r})"
+
+    def __reduce__(self):
+        # Pickled by name so worker processes use their own registry
+        return get, (self.__name__,)
+
+
+FORMATIONS = {}
+
+
+def register(formation):
+    """Add a formation to the registry (replacing one of the same name)"""
+    FORMATIONS[formation.name] = formation
+    return formation
+
+
+def get(name):
+    """Registered formation by name"""
+    try:
+        return FORMATIONS[name]
+    except KeyError:
+        raise ValueError(f"unknown formation {name!r} (known: {', '.join(FORMATIONS)})") from None
+
+
+def load(path):
+    """Register the formation in a JSON file
+
+    The file holds {"name": ..., "description": ..., "positions":
+    [[role, x, y], ...]} with positions for the left-hand team.
     """
-    positions = [
-        ("GK", 0, 300),     # Goalkeeper
-        ("LB", 50, 130),    # Left Back
-        ("CB", 50, 230),    # Center Back 1
-        ("CB", 50, 370),    # Center Back 2
-        ("RB", 50, 470),    # Right Back
-        ("LM", 150, 150),   # Left Midfielder
-        ("CM", 150, 250),   # Center Midfielder 1
-        ("CM", 150, 350),   # Center Midfielder 2
-        ("RM", 150, 450),   # Right Midfielder
-        ("ST", 250, 250),   # Striker 1
-        ("ST", 250, 350),   # Striker 2
-    ]
-
-    if team_side == "left":
-        return [(role, x + 50, y) for role, x, y in positions]
-    elif team_side == "right":
-        return [(role, 800 - x - 50, y) for role, x, y in positions]
+    with open(path) as f:
+        data = json.load(f)
+    return register(Formation(data["name"], data["positions"], data.get("description", "")))
+
+
+def load_directory(path=DATA_DIR):
+    """Register every *.json formation in a directory"""
+    if not os.path.isdir(path):
+        return []
+    return [load(os.path.join(path, name)) for name in sorted(os.listdir(path))
+            if name.endswith(".json")]
+
+
+# 4-3-3 Formation setup
+formation_433 = register(Formation("formation_433", [
+    ("GK", 0, 300),     # Goalkeeper
+    ("LB", 50, 150),    # Left Back
+    ("CB", 50, 250),    # Center Back 1
+    ("CB", 50, 350),    # Center Back 2
+    ("RB", 50, 450),    # Right Back
+    ("LM", 150, 180),   # Left Midfielder
+    ("CM", 150, 300),   # Center Midfielder
+    ("RM", 150, 420),   # Right Midfielder
+    ("LW", 250, 150),   # Left Winger
+    ("ST", 250, 300),   # Striker
+    ("RW", 250, 450),   # Right Winger
+], "4-3-3"))
+
+# 4-4-2 Formation setup - Alternative formation
+formation_442 = register(Formation("formation_442", [
+    ("GK", 0, 300),     # Goalkeeper
+    ("LB", 50, 130),    # Left Back
+    ("CB", 50, 230),    # Center Back 1
+    ("CB", 50, 370),    # Center Back 2
+    ("RB", 50, 470),    # Right Back
+    ("LM", 150, 150),   # Left Midfielder
+    ("CM", 150, 250),   # Center Midfielder 1
+    ("CM", 150, 350),   # Center Midfielder 2
+    ("RM", 150, 450),   # Right Midfielder
+    ("ST", 250, 250),   # Striker 1
+    ("ST", 250, 350),   # Striker 2
+], "4-4-2"))
+
+load_directory()
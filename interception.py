@@ -0,0 +1,50 @@
+import numpy as np
+from ball import possession_range
+from player import state_urgency
+
+
+def axis_positions(segments, ticks, friction):
+    """ball.axis_position for a whole array of ticks at once"""
+    start, x0, v0, length = (np.array(column, dtype=float) for column in zip(*segments))
+    i = np.searchsorted(start, ticks, side="right") - 1
+    k = np.minimum(ticks - start[i], length[i])
+    return x0[i] + v0[i] * (1 - friction ** k) / (1 - friction)
+
+
+def trajectory(ball, horizon):
+    """Ball positions 0..horizon ticks from now as a (horizon + 1, 2) array"""
+    ticks = np.arange(horizon + 1)
+    return np.stack([axis_positions(ball.segments(axis), ticks, ball.friction)
+                     for axis in (0, 1)], axis=-1)
+
+
+def interceptions(ball, players):
+    """Earliest tick at which each player can reach the ball, and where
+
+    A player covers at most max_speed times the chasing urgency per tick
+    and controls the ball within its possession range. The ball's path up
+    to where it stops comes from the closed-form trajectory, so every
+    player is checked against every future tick in one array operation.
+    Players who can't catch it while it rolls get the tick they reach its
+    resting place. Returns (ticks, points) with shapes (players,) and
+    (players, 2).
+    """
+    rest = ball.rest_tick()
+    path = trajectory(ball, rest)
+    ticks = np.arange(rest + 1)
+
+    position = np.array([(p.x, p.y) for p in players], dtype=float)
+    speed = np.array([p.max_speed * state_urgency("chasing") for p in players])
+    reach = np.array([possession_range(p.role) for p in players], dtype=float)
+
+    offset = path[None, :, :] - position[:, None, :]
+    distance = np.hypot(offset[..., 0], offset[..., 1]) - reach[:, None]
+    reachable = distance <= speed[:, None] * ticks[None, :]
+
+    first = reachable.argmax(axis=1)
+    caught = reachable.any(axis=1)
+    # Otherwise: walk to where the ball stops
+    late = np.maximum(rest, np.ceil(np.maximum(distance[:, -1], 0) / speed)).astype(int)
+    first = np.where(caught, first, late)
+    points = np.where(caught[:, None], path[np.minimum(first, rest)], path[-1])
+    return first, points
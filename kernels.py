@@ -0,0 +1,557 @@
+import argparse
+import copy
+import functools
+import importlib.util
+import math
+import os
+import time
+import numpy as np
+from streams import (OFFSET_X, OFFSET_Y, SUPPORT, SUPPORT_X, SUPPORT_Y, ROW_SHIFT, REPEAT_BITS,
+                     MIX_1, MIX_2, UNIT)
+
+# The array engines call these kernels instead of their NumPy code when
+# Numba is installed. Set FOOTBALL_NO_NUMBA=1 (or ENABLED = False) to
+# compare against the NumPy path.
+AVAILABLE = importlib.util.find_spec("numba") is not None
+ENABLED = AVAILABLE and not os.environ.get("FOOTBALL_NO_NUMBA")
+
+
+def _compile(function):
+    """Compile a kernel with Numba on its first call; plain Python without Numba
+
+    Importing Numba takes longer than the rest of the simulation together,
+    so it waits until a kernel actually runs. The compiled kernel then
+    replaces the placeholder in this module, and later calls (as
+    kernels.name) go straight to it.
+    """
+    if not AVAILABLE:
+        return function
+
+    @functools.wraps(function)
+    def first_call(*args):
+        from numba import njit
+        kernel = globals()[function.__name__] = njit(cache=True, nogil=True)(function)
+        return kernel(*args)
+    return first_call
+
+
+@_compile
+def move_players(position, velocity, target, urgency, max_speed, acceleration, friction, low, high):
+    """Player.update_movement and Player.update for every player, in place
+
+    position, velocity and target have shape (matches, players, 2) and
+    urgency (matches, players); max_speed, acceleration and friction are
+    per player. Positions are clamped to [low, high]. The arithmetic is
+    that of Player.move_towards, operation for operation.
+    """
+    n_matches, n_players = urgency.shape
+    for m in range(n_matches):
+        for i in range(n_players):
+            vx = velocity[m, i, 0]
+            vy = velocity[m, i, 1]
+            dx = target[m, i, 0] - position[m, i, 0]
+            dy = target[m, i, 1] - position[m, i, 1]
+            distance = math.hypot(dx, dy)
+            if distance > 5:
+                speed = min(max_speed[i] * urgency[m, i], distance * 0.1)
+                vx += (dx / distance * speed - vx) * acceleration[i]
+                vy += (dy / distance * speed - vy) * acceleration[i]
+
+            vx *= friction[i]
+            vy *= friction[i]
+            velocity[m, i, 0] = vx
+            velocity[m, i, 1] = vy
+            position[m, i, 0] = min(max(position[m, i, 0] + vx, low[0]), high[0])
+            position[m, i, 1] = min(max(position[m, i, 1] + vy, low[1]), high[1])
+
+
+@_compile
+def update_balls(ball, velocity, radius, bounds, friction, min_velocity, damping):
+    """Ball.update for an (n, 2) array of balls, in place"""
+    for m in range(ball.shape[0]):
+        for axis in range(2):
+            x = ball[m, axis] + velocity[m, axis]
+            v = velocity[m, axis] * friction
+            if abs(v) < min_velocity:
+                v = 0.0
+            if x <= radius:
+                x = radius
+                v = -v * damping
+            elif x >= bounds[axis] - radius:
+                x = bounds[axis] - radius
+                v = -v * damping
+            ball[m, axis] = x
+            velocity[m, axis] = v
+
+
+@_compile
+def closest_players(position, ball, index, distance):
+    """Index of and distance to the player closest to the ball, per match
+
+    position is (matches, players, 2) and ball (matches, 2); the results
+    are written to index and distance. Ties go to the lower index.
+    """
+    for m in range(position.shape[0]):
+        best = 0
+        best_distance = math.inf
+        for i in range(position.shape[1]):
+            d = math.hypot(position[m, i, 0] - ball[m, 0], position[m, i, 1] - ball[m, 1])
+            if d < best_distance:
+                best = i
+                best_distance = d
+        index[m] = best
+        distance[m] = best_distance
+
+
+@_compile
+def decide_players(due, position, ball, team, role_group, support_range, direction, defend_x,
+                   home, support_draw, forward_draw, side_draw, home_draw, groups, states,
+                   target, state):
+    """Player.decide_action for every due player of a BatchMatch, in place
+
+    The random numbers come from the caller as (matches, players) arrays,
+    the same ones the NumPy code uses. groups is
+    the (defender, midfielder, attacker) role group ids and states the
+    (positioning, chasing, supporting) state ids.
+    """
+    defender, midfielder, attacker = groups
+    positioning, chasing, supporting = states
+    n_matches, n_players = due.shape
+    for m in range(n_matches):
+        ball_x = ball[m, 0]
+        ball_y = ball[m, 1]
+        closest = 0
+        closest_distance = math.inf
+        for i in range(n_players):
+            d = math.hypot(ball_x - position[m, i, 0], ball_y - position[m, i, 1])
+            if d < closest_distance:
+                closest = i
+                closest_distance = d
+
+        for i in range(n_players):
+            if not due[m, i]:
+                continue
+            if i == closest:
+                target[m, i, 0] = ball_x
+                target[m, i, 1] = ball_y
+                state[m, i] = chasing
+                continue
+
+            # should_support: chance depends on role group, side and ball position
+            group = role_group[i]
+            if group == attacker and (ball_x > 300 if team[i] == 0 else ball_x < 500):
+                chance = 0.7
+            elif group == midfielder:
+                chance = 0.5
+            elif group == defender and (ball_x < 400 if team[i] == 0 else ball_x > 400):
+                chance = 0.6
+            else:
+                chance = 0.0
+            distance = math.hypot(ball_x - position[m, i, 0], ball_y - position[m, i, 1])
+            if distance < support_range[i] and support_draw[m, i] < chance:
+                # calculate_support_position: offer a pass forward, or cut off the goal
+                if team[closest] == team[i]:
+                    target[m, i, 0] = ball_x + direction[i] * forward_draw[m, i]
+                    target[m, i, 1] = ball_y + side_draw[m, i]
+                else:
+                    target[m, i, 0] = (ball_x + defend_x[i]) / 2
+                    target[m, i, 1] = (ball_y + 300) / 2
+                state[m, i] = supporting
+            else:
+                target[m, i, 0] = home[i, 0] + home_draw[m, i, 0]
+                target[m, i, 1] = home[i, 1] + home_draw[m, i, 1]
+                state[m, i] = positioning
+
+
+# streams.draw's constants as uint64, so Numba mixes in wrapping 64-bit integers
+_MIX_1, _MIX_2 = np.uint64(MIX_1), np.uint64(MIX_2)
+_ROW_SHIFT, _REPEAT_BITS = np.uint64(ROW_SHIFT), np.uint64(REPEAT_BITS)
+_SHIFTS = (np.uint64(30), np.uint64(27), np.uint64(31), np.uint64(11))
+
+
+@_compile
+def plan_players(rows, position, ball, team, support_range, support_chance, support_low,
+                 support_high, direction, defend_x, home, key, base, target, state, drawn):
+    """Player.plan for the players rows of one match, in place
+
+    The random numbers are those of streams.draw for key at counter base
+    (counter() of the tick with row and purpose 0), worked out here for
+    every player and purpose; drawn[i] gets bit p for each purpose p that
+    player i actually used, so the caller can count the draws in its
+    streams. support_chance, support_low and support_high are
+    vector_engine.support_odds per player. state gets the BatchMatch ids
+    (0 positioning, 1 chasing, 2 supporting) and chasers target the ball.
+    """
+    s30, s27, s31, s11 = _SHIFTS
+    ball_x = ball[0]
+    ball_y = ball[1]
+    closest = 0
+    closest_distance = math.inf
+    for i in range(position.shape[0]):
+        d = math.hypot(ball_x - position[i, 0], ball_y - position[i, 1])
+        if d < closest_distance:
+            closest = i
+            closest_distance = d
+
+    draws = np.empty(SUPPORT_Y + 1)
+    for k in range(rows.size):
+        i = rows[k]
+        if i == closest:
+            target[i, 0] = ball_x
+            target[i, 1] = ball_y
+            state[i] = 1
+            drawn[i] = 0
+            continue
+
+        for purpose in range(SUPPORT_Y + 1):
+            z = base | (np.uint64(i) << _ROW_SHIFT) | (np.uint64(purpose) << _REPEAT_BITS)
+            z += key[0]
+            for r in range(2):
+                z = (z ^ (z >> s30)) * _MIX_1
+                z = (z ^ (z >> s27)) * _MIX_2
+                z = z ^ (z >> s31)
+                if r == 0:
+                    z ^= key[1]
+            draws[purpose] = np.float64(z >> s11) * UNIT
+
+        # should_support rolls only near the ball with it in the player's window
+        bits = 0
+        supporting = False
+        distance = math.hypot(ball_x - position[i, 0], ball_y - position[i, 1])
+        if distance < support_range[i] and support_low[i] < ball_x < support_high[i]:
+            bits |= 1 << SUPPORT
+            supporting = draws[SUPPORT] < support_chance[i]
+        if supporting:
+            # calculate_support_position: offer a pass forward, or cut off the goal
+            if team[closest] == team[i]:
+                target[i, 0] = ball_x + direction[i] * (30 + 50 * draws[SUPPORT_X])
+                target[i, 1] = ball_y + (-60 + 120 * draws[SUPPORT_Y])
+                bits |= (1 << SUPPORT_X) | (1 << SUPPORT_Y)
+            else:
+                target[i, 0] = (ball_x + defend_x[i]) / 2
+                target[i, 1] = (ball_y + 300) / 2
+            state[i] = 2
+        else:
+            target[i, 0] = home[i, 0] + (-20 + 40 * draws[OFFSET_X])
+            target[i, 1] = home[i, 1] + (-20 + 40 * draws[OFFSET_Y])
+            bits |= (1 << OFFSET_X) | (1 << OFFSET_Y)
+            state[i] = 0
+        drawn[i] = bits
+
+
+@_compile
+def tackle_chances(position, matches, possessor, opponents, tackle_range, tackle_success, chance):
+    """Player.attempt_tackle odds of every player against the possessor
+
+    chance[k, i] is player i's chance of winning the ball in match
+    matches[k]: zero for teammates and anyone out of tackle range,
+    otherwise the base rate plus up to 0.15 for being close.
+    """
+    for k in range(matches.size):
+        m = matches[k]
+        holder = possessor[k]
+        x = position[m, holder, 0]
+        y = position[m, holder, 1]
+        for i in range(position.shape[1]):
+            d = math.hypot(x - position[m, i, 0], y - position[m, i, 1])
+            if opponents[holder, i] and d <= tackle_range[i]:
+                chance[k, i] = tackle_success[i] + (tackle_range[i] - d) / tackle_range[i] * 0.15
+            else:
+                chance[k, i] = 0.0
+
+
+@_compile
+def pass_chances(position, matches, possessor, last_passer, same_team, direction, sight_range,
+                 chance, ahead):
+    """Player.can_see odds of the possessor spotting each teammate
+
+    chance[k, i] is zero for the passer, whoever passed to them, opponents
+    and anyone beyond sight_range; ahead[k, i] is whether player i is no
+    more than 30px behind the passer in the direction of attack.
+    """
+    for k in range(matches.size):
+        m = matches[k]
+        holder = possessor[k]
+        x = position[m, holder, 0]
+        y = position[m, holder, 1]
+        for i in range(position.shape[1]):
+            dx = position[m, i, 0] - x
+            d = math.hypot(dx, position[m, i, 1] - y)
+            ahead[k, i] = direction[holder] * dx > -30
+            if same_team[holder, i] and i != holder and i != last_passer[m] and d <= sight_range:
+                chance[k, i] = max(0.3, 1.0 - d / 200.0)
+            else:
+                chance[k, i] = 0.0
+
+
+def check_parity(n_matches=64, n_ticks=600, seed=0, tolerance=1e-9):
+    """Run every kernel and the NumPy code it replaces on the same states
+
+    The states come from a batch of real matches; every few ticks each
+    phase is run once with the kernels and once without, from identical
+    copies, and the results compared.
+    Returns True when every kernel agrees to within tolerance.
+    """
+    # The engines read the flag of the imported module, also when this
+    # file runs as __main__
+    import kernels
+    from batch_engine import BatchMatch
+    from vector_engine import VectorMatch
+
+    batch = BatchMatch(n_matches, seed=seed)
+    match = VectorMatch(seed=seed)
+    phases = {
+        "ai": lambda b: (b._decide(b.clock.tick_ms), {"t": b.target, "s": b.state,
+                                                       "timer": b.decision_timer})[1],
+        "ball": lambda b: (b._update_ball(), {"ball": b.ball, "v": b.ball_velocity})[1],
+        "movement": lambda b: (b._move(b.clock.tick_ms), {"p": b.position, "v": b.velocity})[1],
+        "possession": lambda b: {"possessor": b._find_possessor()},
+        "tackles": lambda b: (b._resolve_tackles(*_holders(b)),
+                              {"v": b.ball_velocity, "passer": b.last_passer})[1],
+        "passes": lambda b: (b._pass(*_holders(b)),
+                             {"v": b.ball_velocity, "passer": b.last_passer})[1],
+        "vector step": lambda v: (v.arrays.step(), {"p": v.arrays.position, "v": v.arrays.velocity})[1],
+        "closest": lambda v: dict(zip(("i", "d"), v.arrays.closest_to(v.ball.x, v.ball.y))),
+    }
+
+    enabled = kernels.ENABLED
+    agrees = {name: True for name in phases}
+    try:
+        for tick in range(n_ticks):
+            batch.step()
+            match.step()
+            if tick % 10:
+                continue
+            for name, phase in phases.items():
+                engine = match if name in ("vector step", "closest") else batch
+                results = []
+                for use_kernels in (True, False):
+                    kernels.ENABLED = use_kernels
+                    results.append(phase(copy.deepcopy(engine)))
+                agrees[name] &= all(np.allclose(results[0][k], results[1][k], rtol=0, atol=tolerance)
+                                   for k in results[0])
+            kernels.ENABLED = enabled
+    finally:
+        kernels.ENABLED = enabled
+
+    for name, ok in agrees.items():
+        print(f"{name:<14}{'ok' if ok else 'MISMATCH'}")
+    return all(agrees.values())
+
+
+class _OddsProbe:
+    """Stands in for a player's rng and records the odds each roll is compared with"""
+
+    def __init__(self):
+        self.odds = []
+
+    def random(self, row, purpose):
+        return _Roll(self.odds)
+
+
+class _Roll:
+    """A draw that loses every comparison and notes the chance it was held against"""
+
+    def __init__(self, odds):
+        self.odds = odds
+
+    def __lt__(self, chance):
+        self.odds.append(chance)
+        return False
+
+
+def _odds(player, roll):
+    """The chance roll(player) compared its draw with, 0 if it drew nothing
+
+    roll runs on a copy of the player, whose rng is an _OddsProbe.
+    """
+    player = copy.copy(player)
+    player.rng = probe = _OddsProbe()
+    roll(player)
+    return probe.odds[0] if probe.odds else 0.0
+
+
+def check_reference(n_matches=4, n_ticks=600, seed=0, tolerance=1e-9):
+    """Run every kernel and the Player and Ball code it stands for on the same states
+
+    The states come from object matches; every few ticks the players and
+    ball are copied and each kernel is compared with the reference
+    methods run on the copies: move_players with
+    Player.update_movement and Player.update, update_balls with
+    Ball.update, closest_players with Ball.possessed_by,
+    tackle_chances and pass_chances with the odds of Player.attempt_tackle and
+    Player.can_see (and the 30px "ahead" rule of Match._play_ball), and
+    plan_players with Player.plan and the draws it made.
+    Returns True when every kernel agrees to within tolerance.
+    """
+    from match import Match, WIDTH, HEIGHT
+    from player import SIGHT_RANGE
+    from streams import RandomStreams, counter
+    from vector_engine import PlayerArrays, POSITION_MIN, POSITION_MAX, STATES
+
+    agrees = {name: True for name in ("movement", "ball", "possession", "tackles", "passes", "ai")}
+
+    def close(a, b):
+        return np.allclose(a, b, rtol=0, atol=tolerance)
+
+    for m in range(n_matches):
+        match = Match(seed=seed + m)
+        players = match.players
+        arrays = PlayerArrays(players)
+        n = len(players)
+        team = arrays.team
+        opponents = team[:, None] != team[None, :]
+        same_team = ~opponents
+        direction = arrays.direction
+        tackle_range = np.array([p.tackle_range for p in players], dtype=float)
+        tackle_success = np.array([p.tackle_success for p in players])
+        for tick in range(n_ticks):
+            match.step()
+            if tick % 10:
+                continue
+            dt = match.clock.tick_ms
+            arrays.load()
+            ball = np.array([[match.ball.x, match.ball.y]], dtype=float)
+
+            # Movement
+            moved = [copy.copy(p) for p in players]
+            for p in moved:
+                p.update_movement(dt)
+                p.update(dt)
+            position, velocity = arrays.position[None].copy(), arrays.velocity[None].copy()
+            move_players(position, velocity, arrays.target[None], arrays.urgency[None],
+                         arrays.max_speed, arrays.acceleration, arrays.friction,
+                         POSITION_MIN, POSITION_MAX)
+            agrees["movement"] &= (close(position[0], [(p.x, p.y) for p in moved])
+                                   and close(velocity[0], [(p.velocity_x, p.velocity_y) for p in moved]))
+
+            # Ball
+            rolled = copy.deepcopy(match.ball)
+            rolled.update()
+            kicked, spin = ball.copy(), np.array([match.ball.velocity], dtype=float)
+            update_balls(kicked, spin, rolled.radius, np.array([WIDTH, HEIGHT], dtype=float),
+                         rolled.friction, rolled.min_velocity, rolled.bounce_damping)
+            agrees["ball"] &= close(kicked[0], (rolled.x, rolled.y)) and close(spin[0], rolled.velocity)
+
+            # Possession
+            index = np.zeros(1, dtype=np.intp)
+            distance = np.zeros(1)
+            closest_players(arrays.position[None], ball, index, distance)
+            owner = players[int(index[0])] if distance[0] < arrays.possession_range[index[0]] else None
+            agrees["possession"] &= owner is match.ball.possessed_by(players)
+
+            # Tackles and passes, with each player in turn on the ball
+            holders = np.arange(n)
+            in_match = np.zeros(n, dtype=np.intp)
+            chance = np.zeros((n, n))
+            tackle_chances(arrays.position[None], in_match, holders, opponents, tackle_range,
+                           tackle_success, chance)
+            odds = [[_odds(p, lambda p: p.attempt_tackle(carrier)) if opponents[h, i] else 0.0
+                     for i, p in enumerate(players)] for h, carrier in enumerate(players)]
+            agrees["tackles"] &= close(chance, odds)
+
+            last_passer = np.array([-1 if match.ball.last_passer is None
+                                    else match.ball.last_passer.index])
+            ahead = np.zeros((n, n), dtype=bool)
+            pass_chances(arrays.position[None], in_match, holders, last_passer, same_team,
+                         direction, SIGHT_RANGE, chance, ahead)
+            odds = [[_odds(carrier, lambda carrier, p=p: carrier.can_see(p))
+                     if same_team[h, i] and i not in (h, last_passer[0]) else 0.0
+                     for i, p in enumerate(players)] for h, carrier in enumerate(players)]
+            forward = [[(p.x > carrier.x - 30) if carrier.team == "A" else (p.x < carrier.x + 30)
+                        for p in players] for carrier in players]
+            agrees["passes"] &= close(chance, odds) and (ahead == np.array(forward)).all()
+
+            # Decisions: every player plans, from fresh streams at this tick
+            streams = RandomStreams(match.clock, match.seed)
+            planned = [copy.copy(p) for p in players]
+            for p in planned:
+                p.rng = streams
+            for p in planned:
+                p.plan(match.ball, planned)
+            target = np.zeros((n, 2))
+            state = np.zeros(n, dtype=np.int8)
+            drawn = np.zeros(n, dtype=np.int64)
+            with np.errstate(over="ignore"):  # The mixing wraps on purpose without Numba
+                plan_players(np.arange(n), arrays.position, ball[0], arrays.side,
+                             arrays.support_range, arrays.support_chance, arrays.support_low,
+                             arrays.support_high, direction, arrays.defend_x, arrays.home,
+                             np.array(streams.key, dtype=np.uint64),
+                             np.uint64(counter(match.ticks, 0, 0)), target, state, drawn)
+            used = [sum(1 << purpose for row, purpose in streams._repeats if row == i)
+                    for i in range(n)]
+            agrees["ai"] &= (close(target, [(p.target_x, p.target_y) for p in planned])
+                             and [STATES[s] for s in state.tolist()] == [p.state for p in planned]
+                             and drawn.tolist() == used)
+
+    for name, ok in agrees.items():
+        print(f"{name:<14}{'ok' if ok else 'MISMATCH'}")
+    return all(agrees.values())
+
+
+def _holders(batch):
+    """(matches, possessor) of the matches in a batch where someone has the ball"""
+    possessor = batch._find_possessor()
+    active = np.flatnonzero(possessor >= 0)
+    return active, possessor[active]
+
+
+def benchmark(engine, n_ticks, n_matches, repeat=3):
+    """Best ticks (batch: match-ticks) per second with the kernels and without
+
+    The two modes take turns, repeat runs each, so a noisy neighbour on
+    the machine hits both alike.
+    """
+    # The engines read the flag of the imported module, also when this
+    # file runs as __main__
+    import kernels
+    from batch_engine import BatchMatch
+    from vector_engine import VectorMatch
+
+    enabled = kernels.ENABLED
+    rates = {True: 0.0, False: 0.0}
+    try:
+        for _ in range(repeat):
+            for use_kernels in (True, False):
+                kernels.ENABLED = use_kernels
+                if engine == "batch":
+                    match = BatchMatch(n_matches, seed=1)
+                    work = n_matches * n_ticks
+                else:
+                    match = VectorMatch(seed=1)
+                    work = n_ticks
+                match.run(10)  # Compile (or load the cached kernels) before timing
+                start = time.perf_counter()
+                match.run(n_ticks)
+                rates[use_kernels] = max(rates[use_kernels], work / (time.perf_counter() - start))
+    finally:
+        kernels.ENABLED = enabled
+    return rates[True], rates[False]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the compiled kernels against the NumPy engines and time both")
+    parser.add_argument("--ticks", type=int, default=3000, help="Ticks per timing run")
+    parser.add_argument("--matches", type=int, default=1000, help="Matches in the batch timing run")
+    args = parser.parse_args()
+
+    if not AVAILABLE:
+        print("Numba is not installed: the engines use their NumPy code")
+        return
+    print("Parity with the NumPy code:")
+    agrees = check_parity()
+    print("Parity with the Player and Ball objects:")
+    agrees &= check_reference()
+    print("Speed:")
+    for engine in ("vector", "batch"):
+        with_kernels, without = benchmark(engine, args.ticks, args.matches)
+        unit = "match-ticks/s" if engine == "batch" else "ticks/s"
+        print(f"{engine:<8}{with_kernels:>12.0f} {unit} with kernels, {without:.0f} without "
+              f"({with_kernels / without:.2f}x)")
+    if not agrees:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+import math
+import time
+from player import Player, SIGHT_RANGE
+from ball import Ball
+from formations import formation_433
+from proximity import ProximityContext
+from scheduler import DecisionScheduler
+from events import (EventBus, MatchEvent, player_event, PASS, SHOT, DRIBBLE, TACKLE, MISSED_TACKLE,
+                    GOAL, POSSESSION)
+from sim_clock import SimClock, TICK_MS
+from streams import (RandomStreams, MATCH_ROW, ACTION, ACTION_KIND, SHOT_Y, SHOT_POWER, PASS_TARGET,
+                     DRIBBLE_X, DRIBBLE_Y, SCATTER_X, SCATTER_Y)
+
+WIDTH, HEIGHT = 800, 600
+MATCH_LENGTH_MS = 90 * 60 * 1000
+
+TEAM_COLORS = {
+    "A": (0, 0, 255),    # Blue
+    "B": (255, 0, 0),    # Red
+}
+
+
+class GoalMouth:
+    """Axis-aligned box of a goal, the headless stand-in for pygame.Rect
+
+    collidepoint gives pygame's answer for the ball's (non-negative)
+    coordinates: the left and top edges are inside, right and bottom aren't.
+    """
+    __slots__ = ("left", "top", "right", "bottom")
+
+    def __init__(self, left, top, width, height):
+        self.left = left
+        self.top = top
+        self.right = left + width
+        self.bottom = top + height
+
+    def collidepoint(self, x, y):
+        return self.left <= x < self.right and self.top <= y < self.bottom
+
+
+LEFT_GOAL = GoalMouth(0, 250, 10, 100)
+RIGHT_GOAL = GoalMouth(790, 250, 10, 100)
+
+
+class Match:
+    """Headless match engine: players, ball, score and the rules of play.
+
+    Nothing here touches the display, the event queue or a frame limiter,
+    so a match can be stepped as fast as the CPU allows. The interactive
+    game in football_final.py is a front-end on top of this class.
+
+    That is not fast enough for bulk simulation: stepping one Player object
+    at a time runs at about 8,000 ticks/s on one core, so a 90-minute match
+    at the default 60 ticks per second (324,000 ticks) takes around 40 s.
+    VectorMatch (vector_engine.py) is two to three times faster, and BatchMatch
+    (batch_engine.py) reaches about 220,000 match-ticks/s with 1,000
+    matches in lockstep and the Numba kernels - about 1.5 s per match.
+
+    Time advances in fixed ticks of tick_ms and all randomness comes from
+    counter-based streams keyed by seed (streams.RandomStreams), so the same
+    seed and settings always play out the same match, whatever order the
+    players are evaluated in.
+
+    With intercept=True a player chasing the ball runs to the earliest
+    point where it can reach the ball's predicted path rather than to
+    where the ball is now.
+    """
+
+    def __init__(self, home_formation=formation_433, away_formation=formation_433,
+                 seed=None, tick_ms=TICK_MS, intercept=False):
+        self.home_formation = home_formation
+        self.away_formation = away_formation
+        # Passes, shots, dribbles, tackles, goals and possession changes
+        self.events = EventBus()
+        self.seed = seed
+        self.clock = SimClock(tick_ms)
+        self.rng = RandomStreams(self.clock, seed)
+
+        self.players = []
+        # Team A (left) - Blue
+        for i, (role, x, y) in enumerate(home_formation("left")):
+            self.players.append(Player(x, y, team="A", name=f"A{i+1}", role=role,
+                                       color=TEAM_COLORS["A"], rng=self.rng,
+                                       index=len(self.players)))
+        # Team B (right) - Red
+        for i, (role, x, y) in enumerate(away_formation("right")):
+            self.players.append(Player(x, y, team="B", name=f"B{i+1}", role=role,
+                                       color=TEAM_COLORS["B"], rng=self.rng,
+                                       index=len(self.players)))
+
+        # Decision timers start staggered so re-planning is spread over ticks
+        self.scheduler = DecisionScheduler()
+        self.scheduler.stagger(self.players)
+
+        self.ball = Ball(WIDTH // 2, HEIGHT // 2)
+        # Distances to the ball and team partitions, shared by everyone each tick
+        interceptor = None
+        if intercept:
+            # Chasers run to where they can first reach the ball (needs NumPy)
+            from interception import interceptions as interceptor
+        self.intercept = intercept
+        self.proximity = ProximityContext(self.players, interceptor)
+        self.max_tackle_range = max(p.tackle_range for p in self.players)
+        # Scratch lists reused by every tick's pass and tackle queries
+        self._nearby = []
+        self._visible = []
+        self._forward = []
+        self.score = {"A": 0, "B": 0}
+        self.possessor = None  # Player who had the ball at the end of the last tick
+        self._last_holder = None  # Last player to have had the ball at all
+
+        # Callables run with the match after every tick (recorders, streams)
+        self.tick_listeners = []
+        # Optional profiler.Profiler timing each phase of step()
+        self.profiler = None
+
+    @property
+    def game_time(self):
+        """Simulated milliseconds since kick-off"""
+        return self.clock.time_ms
+
+    @property
+    def ticks(self):
+        return self.clock.ticks
+
+    def reset(self):
+        """Reset ball, players, score and clock"""
+        self.ball.reset()
+        for player in self.players:
+            player.reset_position()
+        self.score = {"A": 0, "B": 0}
+        self.possessor = None
+        self._last_holder = None
+        self.clock.reset()
+
+    def snapshot(self):
+        """MatchSnapshot of the current state, see restore()"""
+        from snapshot import MatchSnapshot  # Needs NumPy, which Match itself doesn't
+        return MatchSnapshot.capture(self)
+
+    def restore(self, snapshot):
+        """Return to the state of a snapshot taken from a match with the same formations"""
+        snapshot.restore(self)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, seed=None):
+        """New match continuing from a snapshot
+
+        Without a seed it replays the snapshot's own future exactly; with
+        one the random streams are rekeyed, so every seed is a different
+        continuation of the same position.
+        """
+        home, away = snapshot.formations()
+        match = cls(home, away, seed=snapshot.seed, tick_ms=snapshot.tick_ms,
+                    intercept=snapshot.intercept)
+        match.restore(snapshot)
+        if seed is not None:
+            match.seed = seed
+            match.rng.reseed(seed)
+        return match
+
+    def kick_towards(self, x, y):
+        """Kick the ball towards a point, harder the further away it is"""
+        dx = x - self.ball.x
+        dy = y - self.ball.y
+        mag = math.hypot(dx, dy)
+        if mag != 0:
+            # Normalize and apply kick
+            power = min(1.0, mag / 100.0)  # Power based on distance
+            self.ball.kick(dx / mag, dy / mag, power)
+
+    def run(self, n_ticks):
+        """Advance the match by n_ticks steps and return the score"""
+        for _ in range(n_ticks):
+            self.step()
+        return self.score
+
+    def step(self):
+        """Advance the match by one fixed tick"""
+        self.clock.advance()
+        dt = self.clock.tick_ms
+
+        profiler = self.profiler
+        if profiler is not None:
+            self._profiled_step(profiler, dt)
+            return
+
+        self._update_ball()
+        # Everyone decides from the same snapshot of positions before anyone
+        # moves, so the result does not depend on the order of the roster
+        self._decide_players(dt)
+        self._move_players(dt)
+
+        possessor = self._update_possession()
+        if possessor:
+            self._play_ball(possessor)
+            self._resolve_tackles(possessor)
+
+        self._check_goals()
+
+        for listener in self.tick_listeners:
+            listener(self)
+
+    def _profiled_step(self, profiler, dt):
+        """step() with every phase timed by the profiler"""
+        timed = profiler.time
+        start = time.perf_counter_ns()
+
+        timed("ball", self._update_ball)
+        timed("ai", self._decide_players, dt)
+        timed("movement", self._move_players, dt)
+
+        possessor = timed("possession", self._update_possession)
+        if possessor:
+            timed("play", self._play_ball, possessor)
+            timed("tackles", self._resolve_tackles, possessor)
+
+        timed("goals", self._check_goals)
+
+        for listener in self.tick_listeners:
+            timed("listeners", listener, self)
+
+        profiler.record("tick", start, time.perf_counter_ns())
+
+    def _update_ball(self):
+        self.ball.update()
+        self.proximity.update(self.ball)
+
+    def _decide_players(self, dt):
+        """Run the AI decision for every player"""
+        for player in self.players:
+            player.decide_action(self.ball, self.players, dt, self.proximity)
+
+    def _move_players(self, dt):
+        """Move every player towards its target"""
+        for player in self.players:
+            player.update_movement(dt)
+            player.update(dt)
+        self.proximity.update(self.ball)
+
+    def _update_possession(self):
+        """Work out who has the ball and announce changes of possession"""
+        possessor = self._find_possessor()
+        self.possessor = possessor
+        if possessor and possessor is not self._last_holder:
+            self._last_holder = possessor
+            self._replan_urgently()
+            if self.events.active:
+                self.events.publish(player_event(POSSESSION, self.ticks, possessor))
+        return possessor
+
+    def _replan_urgently(self):
+        """Let the players nearest the ball react to a change of possession now"""
+        urgent = self.scheduler.urgent_players(self.proximity)
+        for player in urgent:
+            player.plan(self.ball, self.players, self.proximity)
+        return urgent
+
+    def _players_near(self, player, radius, teammates):
+        """The player's teammates (or opponents) within radius of them, in roster order
+
+        A straight scan. Only the player on the ball asks, once or twice a
+        tick, so a SpatialGrid (spatial.py) would spend more re-bucketing
+        the moving roster than it saves on the queries: it measured slower
+        at every roster size from 22 to 352 players on this pitch. The grid
+        pays off when many agents query each tick on a large pitch (see
+        python -m benchmarks spatial).
+        """
+        x, y = player.x, player.y
+        near = self._nearby
+        near.clear()
+        for p in self.proximity.teammates(player) if teammates else self.proximity.opponents(player):
+            if math.hypot(p.x - x, p.y - y) <= radius:
+                near.append(p)
+        return near
+
+    def _find_possessor(self):
+        """Return the player in possession of the ball, if any"""
+        # The proximity context already has the closest player this tick
+        return self.ball.possessed_by(self.players, self.proximity)
+
+    def _play_ball(self, possessor):
+        """Let the player in possession shoot, pass or dribble"""
+        ball = self.ball
+
+        # Less frequent decision making for smoother gameplay
+        if self.rng.random(MATCH_ROW, ACTION) >= 0.02:  # 2% chance per frame = ~1.2 times per second
+            return
+
+        action = self.rng.random(MATCH_ROW, ACTION_KIND)
+
+        # SHOOT if close to goal
+        if (possessor.team == "A" and ball.x > 650) or (possessor.team == "B" and ball.x < 150):
+            goal_x = 800 if possessor.team == "A" else 0
+            goal_y = 300 + self.rng.uniform(MATCH_ROW, SHOT_Y, -40, 40)
+            dx = goal_x - ball.x
+            dy = goal_y - ball.y
+            mag = math.hypot(dx, dy)
+            if mag > 0:
+                ball.kick(dx / mag, dy / mag, self.rng.uniform(MATCH_ROW, SHOT_POWER, 0.8, 1.0))
+            ball.last_passer = None
+            if self.events.active:
+                self.events.publish(player_event(SHOT, self.ticks, possessor))
+
+        # PASS
+        elif action < 0.7:
+            # Only teammates within sight range can be seen at all
+            teammates = self._players_near(possessor, SIGHT_RANGE, teammates=True)
+
+            # Smart pass selection: forward teammates first, anyone visible otherwise
+            visible = self._visible
+            forward_players = self._forward
+            visible.clear()
+            forward_players.clear()
+            attacking_right = possessor.team == "A"
+            for p in teammates:
+                if p is possessor or p is ball.last_passer or not possessor.can_see(p):
+                    continue
+                visible.append(p)
+                if (p.x > possessor.x - 30) if attacking_right else (p.x < possessor.x + 30):
+                    forward_players.append(p)
+
+            if visible:
+                candidates = forward_players if forward_players else visible
+
+                if candidates:
+                    pick = self.rng.random(MATCH_ROW, PASS_TARGET)
+                    target_player = candidates[int(pick * len(candidates))]
+                    dx = target_player.x - ball.x
+                    dy = target_player.y - ball.y
+                    mag = math.hypot(dx, dy)
+                    if mag > 0:
+                        pass_power = min(1.0, mag / 150.0)
+                        ball.kick(dx / mag, dy / mag, pass_power)
+                    ball.last_passer = possessor
+                    if self.events.active:
+                        self.events.publish(player_event(PASS, self.ticks, possessor, target_player))
+
+        # DRIBBLE
+        else:
+            direction = 1 if possessor.team == "A" else -1
+            dx = direction + self.rng.uniform(MATCH_ROW, DRIBBLE_X, -0.5, 0.5)
+            dy = self.rng.uniform(MATCH_ROW, DRIBBLE_Y, -0.5, 0.5)
+            mag = math.hypot(dx, dy)
+            if mag > 0:
+                ball.kick(dx / mag, dy / mag, 0.4)
+            if self.events.active:
+                self.events.publish(player_event(DRIBBLE, self.ticks, possessor))
+
+    def _resolve_tackles(self, possessor):
+        """Give every opponent of the possessor a chance to win the ball"""
+        ball = self.ball
+        opponents = self._players_near(possessor, self.max_tackle_range, teammates=False)
+        for opponent in opponents:
+            if opponent.attempt_tackle(possessor):
+                if self.events.active:
+                    self.events.publish(player_event(TACKLE, self.ticks, opponent, possessor))
+                # Loose ball
+                dx = self.rng.uniform(MATCH_ROW, SCATTER_X, -1, 1)
+                dy = self.rng.uniform(MATCH_ROW, SCATTER_Y, -1, 1)
+                mag = math.hypot(dx, dy)
+                if mag > 0:
+                    ball.kick(dx / mag, dy / mag, 0.3)
+                ball.last_passer = None
+                break
+            if (self.events.active and math.hypot(possessor.x - opponent.x, possessor.y - opponent.y)
+                    <= opponent.tackle_range):
+                self.events.publish(player_event(MISSED_TACKLE, self.ticks, opponent, possessor))
+
+    def _check_goals(self):
+        """Award a goal and restart from kick-off if the ball is in a net"""
+        if LEFT_GOAL.collidepoint(self.ball.x, self.ball.y):
+            self._goal("B")
+        elif RIGHT_GOAL.collidepoint(self.ball.x, self.ball.y):
+            self._goal("A")
+
+    def _goal(self, team):
+        self.score[team] += 1
+        if self.events.active:
+            # Where the ball crossed the line, before the kick-off reset
+            self.events.publish(MatchEvent(GOAL, self.ticks, None, None, team,
+                                           self.ball.x, self.ball.y,
+                                           score_a=self.score["A"], score_b=self.score["B"]))
+        self.ball.reset()
+        for player in self.players:
+            player.reset_position()
+        self._last_holder = None
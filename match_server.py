@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import json
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import formations
+from match import Match, MATCH_LENGTH_MS
+from replay import STATES, STATE_CODES
+
+STREAM_SCALE = 8  # Positions sent in 1/8 px: uint16 in keyframes, int8 steps in deltas
+MESSAGE = struct.Struct("<BH")     # kind, payload length
+FRAME = struct.Struct("<IIBBb")    # tick, match time in ms, score A, score B, possessor
+
+# Message kinds
+HELLO = 0     # JSON: match id, tick_ms, roster
+KEYFRAME = 1  # FRAME, absolute uint16 positions, int8 states
+DELTA = 2     # FRAME, int8 position changes since the last frame, int8 states
+
+KEYFRAME_EVERY = 60  # Broadcast frames between keyframes sent to everyone
+CLIENT_QUEUE = 8     # Frames a slow spectator may fall behind before being resynced
+
+
+def message(kind, payload):
+    return MESSAGE.pack(kind, len(payload)) + payload
+
+
+class SnapshotEncoder:
+    """Turns the state of a match into keyframe and delta messages.
+
+    A snapshot is what the renderer draws: player and ball positions, AI
+    states, score and clock. Positions are quantized to 1/8 px; a delta
+    carries the change of each quantized coordinate since the previous
+    snapshot as an int8, so it decodes exactly and errors never build up.
+    Snapshots are encoded once and the same bytes go to every spectator.
+    """
+
+    def __init__(self, match, match_id=0):
+        self.match = match
+        self.match_id = match_id
+        self.players = match.players
+        self.index = {p: i for i, p in enumerate(self.players)}
+        self.previous = None
+        self.frames = 0
+
+    def hello(self):
+        """Message describing the match, sent once when a spectator joins"""
+        header = {
+            "match": self.match_id,
+            "n_players": len(self.players),
+            "tick_ms": self.match.clock.tick_ms,
+            "scale": STREAM_SCALE,
+            "states": list(STATES),
+            "roster": [{"name": p.name, "role": p.role, "team": p.team,
+                        "color": list(p.color), "home": [p.home_x, p.home_y]}
+                       for p in self.players],
+        }
+        return message(HELLO, json.dumps(header).encode())
+
+    def reset(self):
+        """Start over; the next snapshot will only come as a keyframe"""
+        self.previous = None
+
+    def encode(self):
+        """(keyframe, delta) messages for the current state
+
+        delta is None when it can't be sent: no previous snapshot, a change
+        too large for int8 (a goal reset, a hard kick) or time for the
+        periodic keyframe.
+        """
+        match = self.match
+        ball = match.ball
+        coords = [c for p in self.players for c in (p.x, p.y)]
+        coords += (ball.x, ball.y)
+        quantized = np.clip(np.rint(np.array(coords) * STREAM_SCALE), 0, 65535).astype(np.int32)
+
+        head = FRAME.pack(match.ticks, int(match.game_time),
+                          min(match.score["A"], 255), min(match.score["B"], 255),
+                          self.index.get(match.possessor, -1))
+        states = bytes(STATE_CODES.get(p.state, 0) for p in self.players)
+        keyframe = message(KEYFRAME, head + quantized.astype("<u2").tobytes() + states)
+
+        delta = None
+        if self.previous is not None and self.frames % KEYFRAME_EVERY:
+            change = quantized - self.previous
+            if np.abs(change).max() <= 127:
+                delta = message(DELTA, head + change.astype("i1").tobytes() + states)
+        self.previous = quantized
+        self.frames += 1
+        return keyframe, delta
+
+
+class SnapshotDecoder:
+    """Rebuilds snapshots from a spectator's message stream"""
+
+    def __init__(self, hello):
+        self.header = json.loads(hello)
+        self.roster = self.header["roster"]
+        self.n_players = self.header["n_players"]
+        self.scale = self.header["scale"]
+        self.states = self.header["states"]
+        self.quantized = None
+
+    def decode(self, kind, payload):
+        """Decoded state for a KEYFRAME or DELTA, or None if it can't be applied yet"""
+        n_coords = 2 * (self.n_players + 1)
+        tick, time_ms, score_a, score_b, possessor = FRAME.unpack_from(payload)
+        body = payload[FRAME.size:]
+        if kind == KEYFRAME:
+            self.quantized = np.frombuffer(body, "<u2", n_coords).astype(np.int32)
+            states = body[2 * n_coords:]
+        elif kind == DELTA and self.quantized is not None:
+            self.quantized = self.quantized + np.frombuffer(body, "i1", n_coords)
+            states = body[n_coords:]
+        else:
+            return None
+
+        coords = self.quantized / self.scale
+        return {
+            "tick": tick,
+            "time_ms": time_ms,
+            "x": coords[0:-2:2],
+            "y": coords[1:-2:2],
+            "state": [self.states[s] for s in states],
+            "ball": (coords[-2], coords[-1]),
+            "score": {"A": score_a, "B": score_b},
+            "possessor": possessor,
+        }
+
+
+class Spectator:
+    """One connected viewer with its own bounded queue of outgoing frames.
+
+    The simulation only ever calls offer(), which never waits. A separate
+    send loop writes the queue to the socket at whatever pace the client
+    reads. When a client falls CLIENT_QUEUE frames behind, its backlog is
+    thrown away and it is resynced with the next keyframe.
+    """
+
+    def __init__(self, writer, queue_size=CLIENT_QUEUE):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.needs_keyframe = True
+        self.dropped = 0
+
+    def offer(self, keyframe, delta):
+        """Queue the latest snapshot for this spectator"""
+        if self.queue.full():
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.needs_keyframe = True
+        if self.needs_keyframe or delta is None:
+            self.queue.put_nowait(keyframe)
+            self.needs_keyframe = False
+        else:
+            self.queue.put_nowait(delta)
+
+    async def send_loop(self):
+        while True:
+            data = await self.queue.get()
+            self.writer.write(data)
+            await self.writer.drain()
+
+
+class HostedMatch:
+    """A headless match played in real time (times speed) for its spectators"""
+
+    def __init__(self, match_id, match, length_ms=MATCH_LENGTH_MS):
+        self.match_id = match_id
+        self.match = match
+        self.length_ms = length_ms
+        self.encoder = SnapshotEncoder(match, match_id)
+        self.spectators = set()
+
+    def advance(self, real_ms):
+        """Run the ticks real_ms of wall-clock time covers; restart after full time"""
+        match = self.match
+        for _ in range(match.clock.accumulate(real_ms)):
+            match.step()
+        if match.game_time >= self.length_ms:
+            match.reset()
+            self.encoder.reset()
+
+    def broadcast(self):
+        if not self.spectators:
+            return
+        keyframe, delta = self.encoder.encode()
+        for spectator in self.spectators:
+            spectator.offer(keyframe, delta)
+
+
+class MatchServer:
+    """Hosts many concurrent headless matches and streams them to spectators.
+
+    Spectators connect over TCP and send the id of the match they want to
+    watch followed by a newline. They get a HELLO with the roster, then a
+    keyframe, then mostly deltas - the snapshot stream described in
+    SnapshotEncoder. Every snapshot is encoded once, whatever the number
+    of viewers; slow viewers only ever cost themselves frames (see
+    Spectator).
+
+    The matches are stepped one at a time on a separate simulation thread,
+    so the asyncio loop that accepts connections and feeds the send loops
+    keeps running while a step is in progress, and gets a turn between
+    matches however many there are or however fast they run.
+    """
+
+    def __init__(self, n_matches=1, home_formation=formations.formation_433,
+                 away_formation=formations.formation_433, seed=None,
+                 speed=1.0, broadcast_hz=30):
+        self.matches = [
+            HostedMatch(i, Match(home_formation, away_formation,
+                                 seed=None if seed is None else seed + i))
+            for i in range(n_matches)]
+        self.speed = speed
+        self.broadcast_hz = broadcast_hz
+        # Ticks a broadcast frame covers, with room to catch up a late one
+        ticks_per_frame = 1000 / broadcast_hz * speed / self.matches[0].match.clock.tick_ms
+        for hosted in self.matches:
+            hosted.match.clock.max_ticks_per_frame = max(8, int(2 * ticks_per_frame) + 1)
+        self.stepper = ThreadPoolExecutor(1, thread_name_prefix="simulation")
+
+    @property
+    def n_spectators(self):
+        return sum(len(hosted.spectators) for hosted in self.matches)
+
+    async def simulate(self):
+        """Step and broadcast every match broadcast_hz times a second"""
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.broadcast_hz
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            real_ms = (now - last) * 1000 * self.speed
+            last = now
+            for hosted in self.matches:
+                # Spectator queues belong to the loop, so only the step runs off it
+                await loop.run_in_executor(self.stepper, hosted.advance, real_ms)
+                hosted.broadcast()
+
+    async def handle(self, reader, writer):
+        """Serve one spectator connection"""
+        try:
+            match_id = int((await reader.readline()).strip() or 0)
+            hosted = self.matches[match_id]
+        except (ValueError, IndexError, ConnectionError):
+            writer.close()
+            return
+
+        spectator = Spectator(writer)
+        writer.write(hosted.encoder.hello())
+        hosted.spectators.add(spectator)
+        try:
+            await spectator.send_loop()
+        except ConnectionError:
+            pass
+        finally:
+            hosted.spectators.discard(spectator)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        simulation = asyncio.create_task(self.simulate())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            simulation.cancel()
+            self.stepper.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host headless matches for network spectators")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--matches", type=int, default=1, help="Number of concurrent matches")
+    parser.add_argument("--home", default="formation_433", help="Team A formation")
+    parser.add_argument("--away", default="formation_433", help="Team B formation")
+    parser.add_argument("--seed", type=int, help="Seed of match 0 (match i gets seed + i)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Simulated time per real time")
+    parser.add_argument("--hz", type=float, default=30, help="Snapshots per second")
+    args = parser.parse_args()
+
+    server = MatchServer(args.matches, formations.get(args.home), formations.get(args.away),
+                         seed=args.seed, speed=args.speed, broadcast_hz=args.hz)
+    print(f"Serving {args.matches} match(es) on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,33 @@
-import pygame
 import math
-import random
+from streams import (SequentialDraws, OFFSET_X, OFFSET_Y, SUPPORT, SUPPORT_X, SUPPORT_Y,
+                     SIGHT, TACKLE)
+
+SIGHT_RANGE = 180  # Players can't see teammates further away than this
+DECISION_INTERVAL = 200  # Milliseconds between a player's re-plans
+
+# State indicator dot colors
+STATE_COLORS = {
+    "chasing": (255, 255, 0),    # Yellow
+    "supporting": (0, 255, 0),   # Green
+    "positioning": (128, 128, 128)  # Gray
+}
+
+def state_urgency(state):
+    """Fraction of top speed a player moves at in the given AI state"""
+    if state == "chasing":
+        return 1.2
+    elif state == "supporting":
+        return 0.8
+    return 0.6  # positioning
 
 class Player:
-    def __init__(self, x, y, team, name, role, color, radius=10):
+    # Fixed attribute set: smaller instances, faster attribute access
+    __slots__ = ("x", "y", "home_x", "home_y", "team", "name", "role", "color", "radius",
+                 "velocity_x", "velocity_y", "max_speed", "acceleration", "friction",
+                 "state", "target_x", "target_y", "decision_timer", "last_decision_time",
+                 "rng", "index", "tackle_range", "tackle_success", "support_range")
+
+    def __init__(self, x, y, team, name, role, color, radius=10, rng=None, index=0):
         self.x = x
         self.y = y
         self.home_x = x  # Original position for formation
@@ -27,6 +51,10 @@ class Player:
         self.target_y = y
         self.decision_timer = 0
         self.last_decision_time = 0
+        # Source of randomness; a Match shares its streams.RandomStreams with
+        # everyone, and each draw is keyed by the player's roster index
+        self.rng = rng if rng is not None else SequentialDraws()
+        self.index = index
 
         # Role-based attributes
         self.set_role_attributes()
@@ -36,18 +64,22 @@ class Player:
         if self.role == "GK":
             self.max_speed = 1.5
             self.tackle_range = 25
+            self.tackle_success = 0.35
             self.support_range = 100
         elif self.role in ["CB", "LB", "RB"]:
             self.max_speed = 1.8
             self.tackle_range = 20
+            self.tackle_success = 0.25
             self.support_range = 120
         elif self.role in ["CM", "LM", "RM"]:
             self.max_speed = 2.2
             self.tackle_range = 18
+            self.tackle_success = 0.20
             self.support_range = 140
         elif self.role in ["LW", "RW", "ST"]:
             self.max_speed = 2.5
             self.tackle_range = 15
+            self.tackle_success = 0.15
             self.support_range = 130
 
     def update(self, dt):
@@ -88,49 +120,51 @@ class Player:
                 self.velocity_x += (desired_vel_x - self.velocity_x) * self.acceleration
                 self.velocity_y += (desired_vel_y - self.velocity_y) * self.acceleration
 
-    def draw(self, screen):
-        # Draw player as colored circle with better visibility
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(screen, (255, 255, 255), (int(self.x), int(self.y)), self.radius, 2)
-
-        # Draw role text above player
-        font = pygame.font.SysFont(None, 14)
-        text = font.render(self.role, True, (255, 255, 255))
-        text_rect = text.get_rect(center=(int(self.x), int(self.y - 18)))
-        screen.blit(text, text_rect)
-
-        # Draw state indicator (small dot)
-        state_colors = {
-            "chasing": (255, 255, 0),    # Yellow
-            "supporting": (0, 255, 0),   # Green  
-            "positioning": (128, 128, 128)  # Gray
-        }
-        if self.state in state_colors:
-            pygame.draw.circle(screen, state_colors[self.state], 
-                             (int(self.x + 8), int(self.y - 8)), 3)
-
-    def decide_action(self, ball, all_players, dt):
-        """Make decisions about what to do"""
+    def draw(self, screen, cache=None):
+        """Draw the player and return the screen area it covers
+
+        Drawing lives in renderer.py, imported on first use so the
+        simulation never loads pygame.
+        """
+        from renderer import draw_player
+        return draw_player(screen, self, cache)
+
+    def decide_action(self, ball, all_players, dt, context=None):
+        """Make decisions about what to do
+
+        context is an optional ProximityContext for this tick; without one
+        the distances are worked out from scratch.
+        """
         # Only make decisions every 200ms to avoid jittery behavior
-        if self.decision_timer < 200:
+        if self.decision_timer < DECISION_INTERVAL:
             return
 
         self.decision_timer = 0
+        self.plan(ball, all_players, context)
+
+    def plan(self, ball, all_players, context=None):
+        """Choose a state and target right now, whatever the decision timer says"""
+        if context is not None:
+            ball_distance = context.distance(self)
+            teammates = context.teammates(self)
+            closest_to_ball = context.closest
+        else:
+            ball_distance = math.hypot(ball.x - self.x, ball.y - self.y)
 
-        ball_distance = math.hypot(ball.x - self.x, ball.y - self.y)
-
-        # Find teammates and opponents
-        teammates = [p for p in all_players if p.team == self.team and p != self]
-        opponents = [p for p in all_players if p.team != self.team]
+            # Find teammates
+            teammates = [p for p in all_players if p.team == self.team and p != self]
 
-        # Determine closest player to ball
-        closest_to_ball = min(all_players, key=lambda p: math.hypot(ball.x - p.x, ball.y - p.y))
+            # Determine closest player to ball
+            closest_to_ball = min(all_players, key=lambda p: math.hypot(ball.x - p.x, ball.y - p.y))
 
         # Decision logic
         if closest_to_ball == self:
             self.state = "chasing"
-            self.target_x = ball.x
-            self.target_y = ball.y
+            if context is not None:
+                self.target_x, self.target_y = context.chase_point(self)
+            else:
+                self.target_x = ball.x
+                self.target_y = ball.y
         else:
             # Check if we should support
             if ball_distance < self.support_range and self.should_support(ball, teammates):
@@ -139,8 +173,8 @@ class Player:
             else:
                 self.state = "positioning"
                 # Move towards formation position with some variation
-                offset_x = random.uniform(-20, 20)
-                offset_y = random.uniform(-20, 20)
+                offset_x = self.rng.uniform(self.index, OFFSET_X, -20, 20)
+                offset_y = self.rng.uniform(self.index, OFFSET_Y, -20, 20)
                 self.target_x = self.home_x + offset_x
                 self.target_y = self.home_y + offset_y
 
@@ -149,20 +183,20 @@ class Player:
         # Attackers are more likely to support in attack
         if self.role in ["ST", "LW", "RW"]:
             if self.team == "A" and ball.x > 300:
-                return random.random() < 0.7
+                return self.rng.random(self.index, SUPPORT) < 0.7
             elif self.team == "B" and ball.x < 500:
-                return random.random() < 0.7
+                return self.rng.random(self.index, SUPPORT) < 0.7
 
         # Midfielders support more generally
         elif self.role in ["CM", "LM", "RM"]:
-            return random.random() < 0.5
+            return self.rng.random(self.index, SUPPORT) < 0.5
 
         # Defenders support when defending
         elif self.role in ["CB", "LB", "RB"]:
             if self.team == "A" and ball.x < 400:
-                return random.random() < 0.6
+                return self.rng.random(self.index, SUPPORT) < 0.6
             elif self.team == "B" and ball.x > 400:
-                return random.random() < 0.6
+                return self.rng.random(self.index, SUPPORT) < 0.6
 
         return False
 
@@ -172,11 +206,11 @@ class Player:
             # Position for pass reception
             if self.team == "A":
                 # Move forward and to the side
-                self.target_x = ball.x + random.uniform(30, 80)
-                self.target_y = ball.y + random.uniform(-60, 60)
+                self.target_x = ball.x + self.rng.uniform(self.index, SUPPORT_X, 30, 80)
+                self.target_y = ball.y + self.rng.uniform(self.index, SUPPORT_Y, -60, 60)
             else:
-                self.target_x = ball.x - random.uniform(30, 80)
-                self.target_y = ball.y + random.uniform(-60, 60)
+                self.target_x = ball.x - self.rng.uniform(self.index, SUPPORT_X, 30, 80)
+                self.target_y = ball.y + self.rng.uniform(self.index, SUPPORT_Y, -60, 60)
         else:
             # Defensive positioning
             goal_x = 50 if self.team == "A" else 750
@@ -186,15 +220,7 @@ class Player:
 
     def update_movement(self, dt):
         """Update player movement towards target"""
-        urgency = 1.0
-        if self.state == "chasing":
-            urgency = 1.2
-        elif self.state == "supporting":
-            urgency = 0.8
-        else:  # positioning
-            urgency = 0.6
-
-        self.move_towards(self.target_x, self.target_y, urgency)
+        self.move_towards(self.target_x, self.target_y, state_urgency(self.state))
 
     def can_see(self, target_player):
         """Improved line of sight calculation"""
@@ -203,12 +229,12 @@ class Player:
         distance = math.hypot(dx, dy)
 
         # Can't see if too far
-        if distance > 180:
+        if distance > SIGHT_RANGE:
             return False
 
         # Add some randomness to make it feel more realistic
         visibility_chance = max(0.3, 1.0 - distance / 200.0)
-        return random.random() < visibility_chance
+        return self.rng.random(target_player.index, SIGHT) < visibility_chance
 
     def attempt_tackle(self, opponent):
         """Improved tackling with better success rates"""
@@ -217,22 +243,11 @@ class Player:
         distance = math.hypot(dx, dy)
 
         if distance <= self.tackle_range:
-            # Base success rate
-            base_success = 0.15
-
-            # Role-based modifiers
-            if self.role in ["CB", "LB", "RB"]:
-                base_success = 0.25
-            elif self.role in ["CM", "LM", "RM"]:
-                base_success = 0.20
-            elif self.role == "GK":
-                base_success = 0.35
-
-            # Distance modifier (closer = better)
+            # Distance modifier (closer = better) on top of the role's base rate
             distance_modifier = (self.tackle_range - distance) / self.tackle_range
-            final_success = base_success + (distance_modifier * 0.15)
+            final_success = self.tackle_success + (distance_modifier * 0.15)
 
-            return random.random() < final_success
+            return self.rng.random(self.index, TACKLE) < final_success
 
         return False
 
@@ -0,0 +1,152 @@
+import json
+import os
+import time
+
+SUB_BUCKETS = 8  # Histogram buckets per power of two (about 9% resolution)
+SUB_BITS = 3
+
+
+def bucket_index(ns):
+    """Log-linear histogram bucket for a duration in nanoseconds"""
+    exponent = ns.bit_length()
+    if exponent <= SUB_BITS + 1:
+        return ns
+    return ((exponent - SUB_BITS) << SUB_BITS) | ((ns >> (exponent - SUB_BITS - 1)) & (SUB_BUCKETS - 1))
+
+
+def bucket_bounds(index):
+    """Smallest and largest duration (ns) that land in a bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return index, index
+    exponent = (index >> SUB_BITS) + SUB_BITS
+    step = 1 << (exponent - SUB_BITS - 1)
+    low = (1 << (exponent - 1)) + (index & (SUB_BUCKETS - 1)) * step
+    return low, low + step - 1
+
+
+class Histogram:
+    """Timing histogram with log-spaced buckets, for cheap percentiles"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ns):
+        index = bucket_index(ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Duration (ns) below which q percent of the samples fall"""
+        if not self.count:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min((low + high) / 2, self.max)
+        return self.max
+
+
+class Profiler:
+    """Collects per-phase timings from a Match and a Renderer.
+
+    Assign one to match.profiler (and renderer.profiler) to switch it on and
+    set the attribute back to None to switch it off; with no profiler the
+    engines skip all timing. Every phase gets a Histogram of durations and,
+    with trace=True, every call is also kept as a span for write_trace().
+    """
+
+    def __init__(self, trace=True, max_trace_events=2_000_000):
+        self.histograms = {}
+        self.trace = trace
+        self.max_trace_events = max_trace_events
+        self.spans = []  # (name, start ns, duration ns)
+        self.dropped_spans = 0
+        self.origin = time.perf_counter_ns()
+
+    def record(self, name, start, end):
+        """Add one timed call of phase name (perf_counter_ns start and end)"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(end - start)
+        if self.trace:
+            if len(self.spans) < self.max_trace_events:
+                self.spans.append((name, start, end - start))
+            else:
+                self.dropped_spans += 1
+
+    def time(self, name, func, *args):
+        """Call func(*args), recording how long it took under name"""
+        start = time.perf_counter_ns()
+        result = func(*args)
+        self.record(name, start, time.perf_counter_ns())
+        return result
+
+    def reset(self):
+        self.histograms.clear()
+        self.spans.clear()
+        self.dropped_spans = 0
+        self.origin = time.perf_counter_ns()
+
+    def summary(self):
+        """Per-phase call counts and timings in microseconds"""
+        return {
+            name: {
+                "calls": h.count,
+                "total_ms": h.total / 1e6,
+                "mean_us": h.mean / 1e3,
+                "p50_us": h.percentile(50) / 1e3,
+                "p95_us": h.percentile(95) / 1e3,
+                "p99_us": h.percentile(99) / 1e3,
+                "max_us": h.max / 1e3,
+            }
+            for name, h in self.histograms.items()
+        }
+
+    def report(self):
+        """Text table of the summary, slowest phases first"""
+        rows = sorted(self.summary().items(), key=lambda item: -item[1]["total_ms"])
+        lines = [f"{'phase':<18}{'calls':>9}{'total ms':>11}{'mean us':>10}"
+                 f"{'p50 us':>9}{'p95 us':>9}{'p99 us':>9}{'max us':>10}"]
+        for name, s in rows:
+            lines.append(f"{name:<18}{s['calls']:>9}{s['total_ms']:>11.1f}{s['mean_us']:>10.1f}"
+                         f"{s['p50_us']:>9.1f}{s['p95_us']:>9.1f}{s['p99_us']:>9.1f}{s['max_us']:>10.1f}")
+        if self.dropped_spans:
+            lines.append(f"({self.dropped_spans} trace spans over the limit were not kept)")
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        """Write the spans in Chrome trace format (chrome://tracing, Perfetto, speedscope)"""
+        pid = os.getpid()
+        events = [{"name": name, "cat": "render" if name.startswith("render.") else "sim",
+                   "ph": "X", "pid": pid, "tid": 0,
+                   "ts": (start - self.origin) / 1e3, "dur": duration / 1e3}
+                  for name, start, duration in self.spans]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def write(self, path):
+        """Write the Chrome trace to path and the text report next to it"""
+        self.write_trace(path)
+        with open(os.path.splitext(path)[0] + ".txt", "w") as f:
+            f.write(self.report() + "\n")
@@ -0,0 +1,114 @@
+import math
+
+
+class ProximityContext:
+    """Shared per-tick view of where everyone is relative to the ball.
+
+    Team partitions are built once per roster. Ball-to-player distances, the
+    closest player overall and per team, and the ordering by distance are
+    computed at most once per snapshot, on first use, in a single pass over
+    the players - instead of every caller scanning everyone again. Call
+    update() whenever the ball or the players have moved.
+    """
+
+    def __init__(self, players, interceptor=None):
+        self.players = players
+        # Optional interception.interceptions: chasers head for the point
+        # where they can first reach the ball instead of where it is now
+        self.interceptor = interceptor
+        self._chase_points = None
+        self.index = {p: i for i, p in enumerate(players)}
+
+        # Team partitions, in roster order
+        self.teams = {}
+        for p in players:
+            self.teams.setdefault(p.team, []).append(p)
+        self._teammates = {p: [q for q in self.teams[p.team] if q is not p] for p in players}
+        self._opponents = {p: [q for q in players if q.team != p.team] for p in players}
+
+        self.ball = None
+        self._distances = None
+        self._closest = None
+        self._closest_by_team = {}
+        self._by_distance = None
+        # Filled in place on every measurement instead of allocated per tick
+        self._distance_buffer = [0.0] * len(players)
+        self._team_distance = {}
+
+    def update(self, ball):
+        """Start a new snapshot; distances are recomputed when next needed"""
+        self.ball = ball
+        self._distances = None
+        self._by_distance = None
+        self._chase_points = None
+
+    def chase_point(self, player):
+        """Where a player chasing the ball should run to"""
+        if self.interceptor is None:
+            return self.ball.x, self.ball.y
+        if self._chase_points is None:
+            _, points = self.interceptor(self.ball, self.players)
+            self._chase_points = points.tolist()
+        return tuple(self._chase_points[self.index[player]])
+
+    def teammates(self, player):
+        """Everyone else on the player's team"""
+        return self._teammates[player]
+
+    def opponents(self, player):
+        """Everyone on the other team(s)"""
+        return self._opponents[player]
+
+    @property
+    def distances(self):
+        """Ball-to-player distance for every player, in roster order"""
+        if self._distances is None:
+            self._measure()
+        return self._distances
+
+    def distance(self, player):
+        return self.distances[self.index[player]]
+
+    @property
+    def closest(self):
+        """Player closest to the ball (first in roster order on ties)"""
+        if self._distances is None:
+            self._measure()
+        return self._closest
+
+    def closest_in_team(self, team):
+        if self._distances is None:
+            self._measure()
+        return self._closest_by_team.get(team)
+
+    def by_distance(self):
+        """Players ordered from closest to furthest from the ball"""
+        if self._by_distance is None:
+            distances = self.distances
+            order = sorted(range(len(self.players)), key=distances.__getitem__)
+            self._by_distance = [self.players[i] for i in order]
+        return self._by_distance
+
+    def _measure(self):
+        ball_x = self.ball.x
+        ball_y = self.ball.y
+        distances = self._distance_buffer
+        closest = None
+        min_distance = float('inf')
+        closest_by_team = self._closest_by_team
+        team_distance = self._team_distance
+        closest_by_team.clear()
+        team_distance.clear()
+
+        for i, p in enumerate(self.players):
+            dist = math.hypot(ball_x - p.x, ball_y - p.y)
+            distances[i] = dist
+            if dist < min_distance:
+                min_distance = dist
+                closest = p
+            if dist < team_distance.get(p.team, float('inf')):
+                team_distance[p.team] = dist
+                closest_by_team[p.team] = p
+
+        self._distances = distances
+        self._closest = closest
@@ -0,0 +1,307 @@
+import pygame
+import math
+from match import WIDTH, HEIGHT, TEAM_COLORS
+from player import STATE_COLORS
+
+# Colors
+GREEN = (34, 139, 34)
+BLUE = TEAM_COLORS["A"]
+RED = TEAM_COLORS["B"]
+WHITE = (255, 255, 255)
+LIGHT_GREEN = (50, 205, 50)
+
+def draw_field(screen):
+    """Draw the football field with proper markings"""
+    # Grass pattern
+    for i in range(0, WIDTH, 40):
+        color = GREEN if (i // 40) % 2 == 0 else LIGHT_GREEN
+        pygame.draw.rect(screen, color, (i, 0, 40, HEIGHT))
+
+    # Center line
+    pygame.draw.line(screen, WHITE, (WIDTH//2, 0), (WIDTH//2, HEIGHT), 3)
+
+    # Center circle
+    pygame.draw.circle(screen, WHITE, (WIDTH//2, HEIGHT//2), 80, 3)
+    pygame.draw.circle(screen, WHITE, (WIDTH//2, HEIGHT//2), 3)
+
+    # Goals
+    pygame.draw.rect(screen, WHITE, (0, 250, 10, 100), 3)
+    pygame.draw.rect(screen, WHITE, (790, 250, 10, 100), 3)
+
+    # Penalty areas
+    pygame.draw.rect(screen, WHITE, (0, 180, 80, 240), 3)
+    pygame.draw.rect(screen, WHITE, (720, 180, 80, 240), 3)
+
+    # Goal areas
+    pygame.draw.rect(screen, WHITE, (0, 220, 40, 160), 3)
+    pygame.draw.rect(screen, WHITE, (760, 220, 40, 160), 3)
+
+    # Corner arcs
+    pygame.draw.arc(screen, WHITE, (-10, -10, 20, 20), 0, math.pi/2, 3)
+    pygame.draw.arc(screen, WHITE, (790, -10, 20, 20), math.pi/2, math.pi, 3)
+    pygame.draw.arc(screen, WHITE, (-10, 590, 20, 20), 3*math.pi/2, 2*math.pi, 3)
+    pygame.draw.arc(screen, WHITE, (790, 590, 20, 20), math.pi, 3*math.pi/2, 3)
+
+SCORE_FONT = ('Arial', 32, True)
+LABEL_FONT = ('Arial', 18)
+PAUSE_FONT = ('Arial', 48, True)
+ROLE_FONT = (None, 14)  # SysFont arguments for the role label
+
+
+class RenderCache:
+    """Fonts, text and sprites created once and reused every frame.
+
+    Fonts are loaded on first use. Static text such as role labels and team
+    names is rendered once per string and colour; text that keeps changing
+    (score, clock) goes through a named slot that only re-renders when its
+    string changes. Player discs with their state dot, and the ball with
+    its shadow, are pre-drawn to per-pixel-alpha sprites.
+    """
+
+    def __init__(self):
+        self._fonts = {}
+        self._text = {}
+        self._slots = {}
+        self._sprites = {}
+
+    def font(self, spec):
+        """Cached SysFont for a (name, size[, bold]) tuple"""
+        font = self._fonts.get(spec)
+        if font is None:
+            font = self._fonts[spec] = pygame.font.SysFont(*spec)
+        return font
+
+    def text(self, font_spec, text, color):
+        """Rendered text that rarely changes (labels, names)"""
+        key = (font_spec, text, color)
+        surface = self._text.get(key)
+        if surface is None:
+            surface = self._text[key] = self.font(font_spec).render(text, True, color)
+        return surface
+
+    def slot_text(self, slot, font_spec, text, color):
+        """Rendered text for a value that changes over time
+
+        Only the latest string is kept per slot, and it is re-rendered only
+        when the string changes.
+        """
+        cached = self._slots.get(slot)
+        if cached is None or cached[0] != (font_spec, text, color):
+            surface = self.font(font_spec).render(text, True, color)
+            cached = self._slots[slot] = ((font_spec, text, color), surface)
+        return cached[1]
+
+    def player_sprite(self, color, radius, state):
+        """Player disc, outline and state dot, and the sprite's centre point"""
+        key = ("player", color, radius, state)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            # Room for the disc plus the state dot at (+8, -8) with radius 3
+            half = max(radius, 11) + 1
+            surface = pygame.Surface((2 * half, 2 * half), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (half, half), radius)
+            pygame.draw.circle(surface, WHITE, (half, half), radius, 2)
+            if state in STATE_COLORS:
+                pygame.draw.circle(surface, STATE_COLORS[state], (half + 8, half - 8), 3)
+            sprite = self._sprites[key] = (surface, (half, half))
+        return sprite
+
+    def ball_sprite(self, color, radius):
+        """Ball with its drop shadow, and the sprite's centre point"""
+        key = ("ball", color, radius)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            shadow_offset = 3
+            half = radius + 1
+            size = 2 * half + shadow_offset
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (100, 100, 100),
+                               (half + shadow_offset, half + shadow_offset), radius)
+            pygame.draw.circle(surface, color, (half, half), radius)
+            pygame.draw.circle(surface, (200, 200, 200), (half, half), radius, 2)
+            sprite = self._sprites[key] = (surface, (half, half))
+        return sprite
+
+
+def draw_player(screen, player, cache=None):
+    """Draw a player and return the screen area it covers
+
+    cache is an optional RenderCache holding pre-rendered sprites and
+    labels; without one everything is drawn from scratch.
+    """
+    x, y = int(player.x), int(player.y)
+    if cache is not None:
+        # Disc, outline and state dot come as one pre-blitted sprite
+        sprite, (centre_x, centre_y) = cache.player_sprite(player.color, player.radius, player.state)
+        area = screen.blit(sprite, (x - centre_x, y - centre_y))
+        text = cache.text(ROLE_FONT, player.role, WHITE)
+        area.union_ip(screen.blit(text, text.get_rect(center=(x, int(player.y - 18)))))
+        return area
+
+    # Draw player as colored circle with better visibility
+    area = pygame.draw.circle(screen, player.color, (x, y), player.radius)
+    pygame.draw.circle(screen, WHITE, (x, y), player.radius, 2)
+
+    # Draw role text above player
+    font = pygame.font.SysFont(*ROLE_FONT)
+    text = font.render(player.role, True, WHITE)
+    text_rect = text.get_rect(center=(x, int(player.y - 18)))
+    area.union_ip(screen.blit(text, text_rect))
+
+    # Draw state indicator (small dot)
+    if player.state in STATE_COLORS:
+        area.union_ip(pygame.draw.circle(screen, STATE_COLORS[player.state],
+                                         (int(player.x + 8), int(player.y - 8)), 3))
+    return area
+
+
+def draw_ball(screen, ball, cache=None):
+    """Draw the ball and return the screen area it covers
+
+    cache is an optional RenderCache holding the pre-rendered ball.
+    """
+    if cache is not None:
+        sprite, (centre_x, centre_y) = cache.ball_sprite(ball.color, ball.radius)
+        return screen.blit(sprite, (int(ball.x) - centre_x, int(ball.y) - centre_y))
+
+    # Draw ball with shadow effect
+    shadow_offset = 3
+    area = pygame.draw.circle(screen, (100, 100, 100),
+                              (int(ball.x + shadow_offset), int(ball.y + shadow_offset)),
+                              ball.radius)
+    area.union_ip(pygame.draw.circle(screen, ball.color, (int(ball.x), int(ball.y)), ball.radius))
+    pygame.draw.circle(screen, (200, 200, 200), (int(ball.x), int(ball.y)), ball.radius, 2)
+    return area
+
+
+def draw_hud(screen, match, paused, cache=None):
+    """Draw score, team labels, clock and pause indicator
+
+    Returns the list of screen areas drawn on. With a RenderCache the fonts
+    and text are reused instead of being created every frame.
+    """
+    score = match.score
+    areas = []
+    minutes = int(match.game_time // 60000)
+    seconds = int((match.game_time % 60000) // 1000)
+
+    if cache is not None:
+        score_text = cache.slot_text("score", SCORE_FONT, f"{score['A']} - {score['B']}", WHITE)
+        team_a_text = cache.text(LABEL_FONT, "Team A", BLUE)
+        team_b_text = cache.text(LABEL_FONT, "Team B", RED)
+        time_text = cache.slot_text("time", LABEL_FONT, f"Time: {minutes:02d}:{seconds:02d}", WHITE)
+        pause_text = cache.text(PAUSE_FONT, "PAUSED", WHITE) if paused else None
+    else:
+        font = pygame.font.SysFont(*SCORE_FONT)
+        score_text = font.render(f"{score['A']} - {score['B']}", True, WHITE)
+        small_font = pygame.font.SysFont(*LABEL_FONT)
+        team_a_text = small_font.render("Team A", True, BLUE)
+        team_b_text = small_font.render("Team B", True, RED)
+        time_text = small_font.render(f"Time: {minutes:02d}:{seconds:02d}", True, WHITE)
+        pause_text = None
+        if paused:
+            pause_font = pygame.font.SysFont(*PAUSE_FONT)
+            pause_text = pause_font.render("PAUSED", True, WHITE)
+
+    score_rect = score_text.get_rect(center=(WIDTH//2, 30))
+
+    # Score background
+    areas.append(pygame.draw.rect(screen, (0, 0, 0, 128), score_rect.inflate(20, 10)))
+    screen.blit(score_text, score_rect)
+
+    # Team labels
+    areas.append(screen.blit(team_a_text, (score_rect.left - 60, 25)))
+    areas.append(screen.blit(team_b_text, (score_rect.right + 10, 25)))
+
+    # Game time
+    areas.append(screen.blit(time_text, (WIDTH//2 - time_text.get_width()//2, 55)))
+
+    # Pause indicator
+    if pause_text is not None:
+        pause_rect = pause_text.get_rect(center=(WIDTH//2, HEIGHT//2))
+        areas.append(pygame.draw.rect(screen, (0, 0, 0, 180), pause_rect.inflate(40, 20)))
+        screen.blit(pause_text, pause_rect)
+
+    return areas
+
+
+class Renderer:
+    """Draws a whole frame from scratch and flips the full display
+
+    With use_cache (the default) fonts, text and sprites come from a
+    RenderCache; without it every frame creates them anew.
+    """
+
+    def __init__(self, screen, use_cache=True):
+        self.screen = screen
+        self.cache = RenderCache() if use_cache else None
+        self.profiler = None  # Optional profiler.Profiler timing each stage
+
+    def _stage(self, name, func, *args):
+        """Call func(*args), timed as a render stage when profiling"""
+        if self.profiler is None:
+            return func(*args)
+        return self.profiler.time(name, func, *args)
+
+    def invalidate(self):
+        """Forget what is on screen (e.g. after the window was uncovered)"""
+
+    def draw_frame(self, match, paused):
+        self._stage("render.field", draw_field, self.screen)
+        self.draw_sprites(match, paused)
+        self._stage("render.flip", pygame.display.flip)
+
+    def draw_sprites(self, match, paused):
+        """Draw players, ball and HUD; returns the areas they cover"""
+        cache = self.cache
+        areas = self._stage("render.players", self._draw_players, match.players)
+        areas.append(self._stage("render.ball", draw_ball, self.screen, match.ball, cache))
+        areas.extend(self._stage("render.hud", draw_hud, self.screen, match, paused, cache))
+        return areas
+
+    def _draw_players(self, players):
+        screen, cache = self.screen, self.cache
+        return [draw_player(screen, player, cache) for player in players]
+
+
+class DirtyRectRenderer(Renderer):
+    """Renders on top of a pitch pre-drawn once to an off-screen surface.
+
+    Each frame only the areas under last frame's players, ball and HUD are
+    restored from the cached background, the sprites are drawn again, and
+    just those rectangles are pushed to the display.
+    """
+
+    def __init__(self, screen, use_cache=True):
+        super().__init__(screen, use_cache)
+        self.background = pygame.Surface(screen.get_size()).convert()
+        draw_field(self.background)
+        self.previous = None
+
+    def invalidate(self):
+        self.previous = None
+
+    def draw_frame(self, match, paused):
+        screen = self.screen
+        if self.previous is None:
+            # First frame (or screen contents lost): start from the full pitch
+            self._stage("render.field", screen.blit, self.background, (0, 0))
+            self.previous = self.draw_sprites(match, paused)
+            self._stage("render.flip", pygame.display.flip)
+            return
+
+        self._stage("render.field", self._restore, self.previous)
+        current = self.draw_sprites(match, paused)
+        self._stage("render.flip", pygame.display.update, self.previous + current)
+        self.previous = current
+
+    def _restore(self, areas):
+        """Paint the cached pitch back over the given areas"""
+        for area in areas:
+            self.screen.blit(self.background, area, area)
+
+
+RENDERERS = {
+    "full": Renderer,
+    "dirty": DirtyRectRenderer,
+}
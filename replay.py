@@ -0,0 +1,240 @@
+import json
+import os
+import struct
+import numpy as np
+
+MAGIC = b"FBRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")  # magic, version, length of the JSON header
+ALIGN = 64  # Records start on a multiple of this many bytes
+
+POSITION_SCALE = 64    # Positions stored in 1/64 px (uint16: up to 1023 px)
+VELOCITY_SCALE = 1000  # Ball velocity stored in 1/1000 px per tick (int16)
+
+# AI states, stored as int8 codes
+STATES = ("positioning", "chasing", "supporting")
+STATE_CODES = {state: i for i, state in enumerate(STATES)}
+
+
+def record_dtype(n_players):
+    """Fixed-width record for one tick of a match with n_players players"""
+    return np.dtype([
+        ("x", "<u2", (n_players,)),
+        ("y", "<u2", (n_players,)),
+        ("state", "i1", (n_players,)),
+        ("ball_x", "<u2"),
+        ("ball_y", "<u2"),
+        ("ball_vx", "<i2"),
+        ("ball_vy", "<i2"),
+        ("score", "u1", (2,)),
+        ("possessor", "i1"),    # Roster index, -1 for a loose ball
+        ("last_passer", "i1"),  # Roster index, -1 for none
+    ])
+
+
+def quantize_position(value):
+    return np.clip(np.rint(np.asarray(value) * POSITION_SCALE), 0, 65535)
+
+
+def quantize_velocity(value):
+    return np.clip(np.rint(np.asarray(value) * VELOCITY_SCALE), -32768, 32767)
+
+
+class ReplayWriter:
+    """Streams a match to disk as fixed-width binary records, one per tick.
+
+    Positions are quantized to 1/64 px in uint16 and states, possessor and
+    score are int8/uint8, which comes to about 120 bytes per tick for 22
+    players. Because every record has the same size, each one doubles as a
+    keyframe: record i sits at a fixed offset and can be decoded on its own.
+    Records are buffered and written in blocks; call close() (or use the
+    writer as a context manager) to flush the tail.
+
+        with ReplayWriter("match.fbr", match) as writer:
+            match.tick_listeners.append(writer.record)
+            match.run(n_ticks)
+    """
+
+    def __init__(self, path, match, every=1, buffer_ticks=600):
+        self.match = match
+        self.every = every
+        self.players = match.players
+        self.index = {p: i for i, p in enumerate(self.players)}
+        self.dtype = record_dtype(len(self.players))
+
+        # Raw per-tick values, quantized a whole block at a time in flush()
+        n = len(self.players)
+        self._x = np.zeros((buffer_ticks, n))
+        self._y = np.zeros((buffer_ticks, n))
+        self._state = np.zeros((buffer_ticks, n), dtype=np.int8)
+        self._ball = np.zeros((buffer_ticks, 4))
+        self._misc = np.zeros((buffer_ticks, 4), dtype=np.int16)
+        self._pending = 0
+
+        self.records = 0
+        self.first_tick = None
+        self.path = path
+        self._file = open(path, "wb")
+        self._header_written = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_header(self):
+        header = {
+            "version": VERSION,
+            "n_players": len(self.players),
+            "tick_ms": self.match.clock.tick_ms,
+            "first_tick": self.first_tick,
+            "every": self.every,
+            "seed": self.match.seed,
+            "home_formation": getattr(self.match.home_formation, "__name__", None),
+            "away_formation": getattr(self.match.away_formation, "__name__", None),
+            "position_scale": POSITION_SCALE,
+            "velocity_scale": VELOCITY_SCALE,
+            "states": list(STATES),
+            "roster": [{"name": p.name, "role": p.role, "team": p.team,
+                        "color": list(p.color), "home": [p.home_x, p.home_y]}
+                       for p in self.players],
+        }
+        blob = json.dumps(header).encode()
+        offset = HEADER.size + len(blob)
+        padding = -offset % ALIGN
+        self._file.write(HEADER.pack(MAGIC, VERSION, len(blob) + padding))
+        self._file.write(blob + b" " * padding)
+        self._header_written = True
+
+    def record(self, match):
+        """Tick listener: append the current state of the match"""
+        if self.first_tick is None:
+            self.first_tick = match.ticks
+            self._write_header()
+        if (match.ticks - self.first_tick) % self.every:
+            return
+
+        k = self._pending
+        players = self.players
+        self._x[k] = [p.x for p in players]
+        self._y[k] = [p.y for p in players]
+        self._state[k] = [STATE_CODES.get(p.state, 0) for p in players]
+        ball = match.ball
+        self._ball[k] = (ball.x, ball.y, ball.velocity[0], ball.velocity[1])
+        self._misc[k] = (match.score["A"], match.score["B"],
+                         self.index.get(match.possessor, -1),
+                         self.index.get(ball.last_passer, -1))
+
+        self._pending += 1
+        self.records += 1
+        if self._pending == len(self._x):
+            self.flush()
+
+    def flush(self):
+        """Quantize and write the buffered records"""
+        k = self._pending
+        if k:
+            block = np.zeros(k, dtype=self.dtype)
+            block["x"] = quantize_position(self._x[:k])
+            block["y"] = quantize_position(self._y[:k])
+            block["state"] = self._state[:k]
+            block["ball_x"] = quantize_position(self._ball[:k, 0])
+            block["ball_y"] = quantize_position(self._ball[:k, 1])
+            block["ball_vx"] = quantize_velocity(self._ball[:k, 2])
+            block["ball_vy"] = quantize_velocity(self._ball[:k, 3])
+            block["score"] = np.minimum(self._misc[:k, :2], 255)
+            block["possessor"] = self._misc[:k, 2]
+            block["last_passer"] = self._misc[:k, 3]
+            self._file.write(block.tobytes())
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        if not self._header_written:
+            self.first_tick = self.match.ticks
+            self._write_header()
+        self.flush()
+        self._file.close()
+
+
+class Replay:
+    """Memory-mapped playback of a file written by ReplayWriter.
+
+    Nothing is read up front beyond the header; frame(i) and the slicing
+    helpers touch only the records they need, so seeking to any tick or
+    minute is O(1) and a whole match is never loaded into RAM.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a replay file")
+            if version != VERSION:
+                raise ValueError(f"{path}: unsupported replay version {version}")
+            self.header = json.loads(f.read(length))
+
+        self.roster = self.header["roster"]
+        self.tick_ms = self.header["tick_ms"]
+        self.first_tick = self.header["first_tick"]
+        self.every = self.header["every"]
+        self.dtype = record_dtype(self.header["n_players"])
+
+        # Only whole records count; a writer may still be appending
+        offset = HEADER.size + length
+        n_records = (os.path.getsize(path) - offset) // self.dtype.itemsize
+        if n_records > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r",
+                                     offset=offset, shape=(n_records,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration_ms(self):
+        return len(self) * self.every * self.tick_ms
+
+    def tick(self, i):
+        """Match tick of record i"""
+        return self.first_tick + i * self.every
+
+    def index_at(self, time_ms):
+        """Record index closest to a match time, clamped to the recording"""
+        tick = round(time_ms / self.tick_ms)
+        i = (tick - self.first_tick) // self.every
+        return min(max(i, 0), len(self) - 1)
+
+    def seek_minute(self, minute):
+        """Record index at the start of a match minute"""
+        return self.index_at(minute * 60000)
+
+    def frame(self, i):
+        """Decoded state at record i"""
+        r = self.records[i]
+        return {
+            "tick": self.tick(i),
+            "x": r["x"] / POSITION_SCALE,
+            "y": r["y"] / POSITION_SCALE,
+            "state": [STATES[s] for s in r["state"]],
+            "ball": (r["ball_x"] / POSITION_SCALE, r["ball_y"] / POSITION_SCALE),
+            "ball_velocity": (r["ball_vx"] / VELOCITY_SCALE, r["ball_vy"] / VELOCITY_SCALE),
+            "score": {"A": int(r["score"][0]), "B": int(r["score"][1])},
+            "possessor": int(r["possessor"]),
+            "last_passer": int(r["last_passer"]),
+        }
+
+    def positions(self, start=0, stop=None):
+        """Player positions for records start..stop-1 as a (ticks, players, 2) array"""
+        chunk = self.records[start:stop]
+        return np.stack([chunk["x"], chunk["y"]], axis=-1) / POSITION_SCALE
+
+    def ball_positions(self, start=0, stop=None):
+        """Ball positions for records start..stop-1 as a (ticks, 2) array"""
+        chunk = self.records[start:stop]
+        return np.stack([chunk["ball_x"], chunk["ball_y"]], axis=-1) / POSITION_SCALE
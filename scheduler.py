@@ -0,0 +1,45 @@
+from player import DECISION_INTERVAL
+
+URGENT_REPLANS = 2  # Players per team nearest the ball who react to a change of possession
+
+
+class DecisionScheduler:
+    """Spreads AI re-planning evenly over the decision interval.
+
+    Every player re-plans once per interval (Player.decide_action). If all
+    decision timers start at zero, all 22 players re-plan on the same tick
+    and that tick does 22 times the AI work of the ones around it. Instead
+    each timer starts at its own phase offset, so only a couple of players
+    re-plan on any one tick. A decision resets the timer and every timer
+    advances by the same dt, so the offsets hold for the whole match and
+    the average decision rate does not change.
+
+    When possession changes, the players nearest the ball on each team
+    re-plan straight away, outside their turn. Their timers are left alone
+    so the spread stays even.
+    """
+
+    def __init__(self, interval=DECISION_INTERVAL, urgent=URGENT_REPLANS):
+        self.interval = interval
+        self.urgent = urgent
+
+    def offsets(self, n_players):
+        """Starting decision timer for each of n_players, evenly spaced over the interval"""
+        return [self.interval * i / n_players for i in range(n_players)]
+
+    def stagger(self, players):
+        """Give every player its phase offset"""
+        for player, offset in zip(players, self.offsets(len(players))):
+            player.decision_timer = offset
+
+    def urgent_players(self, context):
+        """The players on each team closest to the ball, from a ProximityContext"""
+        if not self.urgent:
+            return []
+        picked = {}
+        urgent = []
+        for player in context.by_distance():
+            if picked.get(player.team, 0) < self.urgent:
+                picked[player.team] = picked.get(player.team, 0) + 1
+                urgent.append(player)
+        return urgent
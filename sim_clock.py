@@ -0,0 +1,49 @@
+TICK_MS = 1000 / 60  # Default simulated milliseconds per tick (60 FPS)
+
+
+class SimClock:
+    """Fixed-timestep simulation clock.
+
+    Simulated time only ever advances in whole ticks of tick_ms, so a match
+    plays out the same way however fast or slow the machine running it is.
+    Time is derived from the tick count rather than summed, so it never
+    drifts. Real-time front-ends feed wall-clock frame times to accumulate()
+    and run as many ticks as it hands back.
+    """
+
+    def __init__(self, tick_ms=TICK_MS, max_ticks_per_frame=8):
+        self.tick_ms = tick_ms
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.ticks = 0
+        self._backlog_ms = 0.0
+
+    @property
+    def time_ms(self):
+        """Simulated milliseconds since kick-off"""
+        return self.ticks * self.tick_ms
+
+    def advance(self, ticks=1):
+        self.ticks += ticks
+
+    def reset(self):
+        self.ticks = 0
+        self._backlog_ms = 0.0
+
+    def ticks_for(self, duration_ms):
+        """Number of ticks covering duration_ms of simulated time"""
+        return int(round(duration_ms / self.tick_ms))
+
+    def accumulate(self, real_ms):
+        """Add real elapsed time and return how many ticks are now due
+
+        At most max_ticks_per_frame ticks are handed out per call so a slow
+        frame can't snowball into ever longer catch-up frames.
+        """
+        self._backlog_ms += real_ms
+        due = int(self._backlog_ms // self.tick_ms)
+        if due > self.max_ticks_per_frame:
+            due = self.max_ticks_per_frame
+            self._backlog_ms = 0.0
+        else:
+            self._backlog_ms -= due * self.tick_ms
+        return due
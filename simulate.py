@@ -0,0 +1,122 @@
+import argparse
+import importlib
+import time
+import formations
+from match import TICK_MS, MATCH_LENGTH_MS
+from events import QueueSink, JsonlWriter
+from profiler import Profiler
+
+# Engines by name, as (module, class): only the one in use is imported, so
+# the object engine starts without loading NumPy
+ENGINES = {
+    "object": ("match", "Match"),                # One Player object at a time
+    "vector": ("vector_engine", "VectorMatch"),  # NumPy structure-of-arrays movement
+    "batch": ("batch_engine", "BatchMatch"),     # Many matches in lockstep, see --matches
+}
+
+
+def engine_class(name):
+    """The match class of an engine in ENGINES"""
+    module, cls = ENGINES[name]
+    return getattr(importlib.import_module(module), cls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a headless football match")
+    parser.add_argument("--home", default="formation_433", help="Team A formation")
+    parser.add_argument("--away", default="formation_433", help="Team B formation")
+    parser.add_argument("--minutes", type=float, default=MATCH_LENGTH_MS / 60000,
+                        help="Simulated match length in minutes")
+    parser.add_argument("--ticks", type=int, help="Number of ticks (overrides --minutes)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="object",
+                        help="Simulation engine")
+    parser.add_argument("--matches", type=int, default=1000,
+                        help="Number of matches simulated by the batch engine")
+    parser.add_argument("--seed", type=int, help="Random seed (same seed, same match)")
+    parser.add_argument("--tick-ms", type=float, default=TICK_MS,
+                        help="Simulated milliseconds per tick")
+    parser.add_argument("--intercept", action="store_true",
+                        help="Chasers run to the predicted interception point (object/vector engines)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Jump over quiet ticks instead of stepping them (object engine, "
+                             "see time_skip.py); ticks are stepped as usual while recording")
+    parser.add_argument("--record", metavar="PATH", help="Write a binary replay of the match")
+    parser.add_argument("--record-every", type=int, default=1,
+                        help="Record one tick in this many")
+    parser.add_argument("--events", metavar="PATH",
+                        help="Write passes, shots, tackles, goals and possession changes as JSON lines")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Time each phase of the tick, print a report and write a "
+                             "Chrome trace to PATH (report saved next to it)")
+    args = parser.parse_args()
+    if args.adaptive and args.engine != "object":
+        parser.error("--adaptive needs --engine object")
+    profiler = Profiler() if args.profile else None
+
+    n_ticks = args.ticks if args.ticks is not None else int(args.minutes * 60000 / args.tick_ms)
+    home = formations.get(args.home)
+    away = formations.get(args.away)
+
+    if args.engine == "batch":
+        batch = engine_class("batch")(args.matches, home, away, seed=args.seed, tick_ms=args.tick_ms)
+        batch.profiler = profiler
+        run_batch(batch, n_ticks)
+        write_profile(profiler, args.profile)
+        return
+
+    match = engine_class(args.engine)(home, away, seed=args.seed, tick_ms=args.tick_ms,
+                                 intercept=args.intercept)
+    match.profiler = profiler
+    recorder = None
+    if args.record:
+        from replay import ReplayWriter
+        recorder = ReplayWriter(args.record, match, every=args.record_every)
+        match.tick_listeners.append(recorder.record)
+    sink = None
+    if args.events:
+        sink = match.events.subscribe(QueueSink(JsonlWriter(args.events)))
+
+    start = time.perf_counter()
+    if args.adaptive:
+        from time_skip import AdaptiveStepper
+        AdaptiveStepper(match).run(n_ticks)
+    else:
+        match.run(n_ticks)
+    elapsed = time.perf_counter() - start
+
+    if recorder:
+        recorder.close()
+        print(f"Recorded {recorder.records} ticks to {args.record}")
+    if sink:
+        sink.close()
+        print(f"Wrote match events to {args.events}" +
+              (f" ({sink.dropped} dropped)" if sink.dropped else ""))
+
+    print(f"Final score: A {match.score['A']} - {match.score['B']} B")
+    print(f"{n_ticks} ticks in {elapsed:.2f}s ({n_ticks / elapsed:.0f} ticks/s)")
+    write_profile(profiler, args.profile)
+
+
+def write_profile(profiler, path):
+    if profiler:
+        print(profiler.report())
+        profiler.write(path)
+        print(f"Profile written to {path}")
+
+
+def run_batch(batch, n_ticks):
+    """Run a BatchMatch and summarise the per-match score array"""
+    start = time.perf_counter()
+    score = batch.run(n_ticks)
+    elapsed = time.perf_counter() - start
+
+    goals_a, goals_b = score[:, 0], score[:, 1]
+    print(f"{batch.n_matches} matches: A wins {(goals_a > goals_b).mean():.1%}, "
+          f"draws {(goals_a == goals_b).mean():.1%}, B wins {(goals_a < goals_b).mean():.1%}")
+    print(f"Mean score: A {goals_a.mean():.2f} - {goals_b.mean():.2f} B")
+    print(f"{n_ticks} ticks in {elapsed:.2f}s "
+          f"({batch.n_matches * n_ticks / elapsed:.0f} match-ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import io
+import json
+import numpy as np
+import formations
+from replay import STATES, STATE_CODES
+
+
+class MatchSnapshot:
+    """Complete, immutable state of a Match at the end of a tick.
+
+    Player state lives in a handful of small NumPy arrays (position,
+    velocity, target, decision timer, AI state), so capturing costs one
+    pass over the roster and a snapshot is a few kilobytes. Nothing in a
+    snapshot is ever modified: any number of matches can be restored from
+    the same one, and BatchMatch.from_snapshot broadcasts it into thousands
+    of array-backed continuations at once.
+
+        snapshot = match.snapshot()
+        fork = Match.from_snapshot(snapshot, seed=1)  # a different future
+        replay = Match.from_snapshot(snapshot)        # the same future
+    """
+
+    def __init__(self, **state):
+        self.__dict__.update(state)
+
+    @classmethod
+    def capture(cls, match):
+        players = match.players
+        index = {p: i for i, p in enumerate(players)}
+        ball = match.ball
+        return cls(
+            home_formation=match.home_formation.__name__,
+            away_formation=match.away_formation.__name__,
+            seed=match.seed,
+            tick_ms=match.clock.tick_ms,
+            intercept=match.intercept,
+            ticks=match.ticks,
+            score=(match.score["A"], match.score["B"]),
+            position=np.array([(p.x, p.y) for p in players], dtype=float),
+            velocity=np.array([(p.velocity_x, p.velocity_y) for p in players], dtype=float),
+            target=np.array([(p.target_x, p.target_y) for p in players], dtype=float),
+            decision_timer=np.array([p.decision_timer for p in players], dtype=float),
+            state=np.array([STATE_CODES.get(p.state, 0) for p in players], dtype=np.int8),
+            ball=np.array([ball.x, ball.y, ball.velocity[0], ball.velocity[1]], dtype=float),
+            last_passer=index.get(ball.last_passer, -1),
+            possessor=index.get(match.possessor, -1),
+            last_holder=index.get(match._last_holder, -1),
+            rng_key=match.rng.key,
+        )
+
+    @property
+    def game_time(self):
+        return self.ticks * self.tick_ms
+
+    def restore(self, match):
+        """Put a match (with the same formations) into this state"""
+        players = match.players
+        for p, (x, y), (vx, vy), (tx, ty), timer, state in zip(
+                players, self.position.tolist(), self.velocity.tolist(), self.target.tolist(),
+                self.decision_timer.tolist(), self.state.tolist()):
+            p.x = x
+            p.y = y
+            p.velocity_x = vx
+            p.velocity_y = vy
+            p.target_x = tx
+            p.target_y = ty
+            p.decision_timer = timer
+            p.state = STATES[state]
+
+        ball = match.ball
+        ball.x, ball.y, ball.velocity[0], ball.velocity[1] = self.ball.tolist()
+        ball.last_passer = players[self.last_passer] if self.last_passer >= 0 else None
+
+        match.score = {"A": self.score[0], "B": self.score[1]}
+        match.possessor = players[self.possessor] if self.possessor >= 0 else None
+        match._last_holder = players[self.last_holder] if self.last_holder >= 0 else None
+        match.clock.reset()
+        match.clock.ticks = self.ticks
+        match.rng.key = self.rng_key
+
+        match.proximity.update(ball)
+
+    def formations(self):
+        """(home, away) formation functions"""
+        return formations.get(self.home_formation), formations.get(self.away_formation)
+
+    def to_bytes(self):
+        """Compact serialised form, see from_bytes"""
+        meta = {
+            "home_formation": self.home_formation,
+            "away_formation": self.away_formation,
+            "seed": self.seed,
+            "tick_ms": self.tick_ms,
+            "intercept": self.intercept,
+            "ticks": self.ticks,
+            "score": list(self.score),
+            "last_passer": self.last_passer,
+            "possessor": self.possessor,
+            "last_holder": self.last_holder,
+            "rng_key": list(self.rng_key),
+        }
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+                            position=self.position, velocity=self.velocity, target=self.target,
+                            decision_timer=self.decision_timer, state=self.state,
+                            ball=self.ball)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        with np.load(io.BytesIO(data)) as arrays:
+            meta = json.loads(arrays["meta"].tobytes())
+            meta["score"] = tuple(meta["score"])
+            meta["rng_key"] = tuple(meta["rng_key"])
+            meta.setdefault("intercept", False)
+            return cls(**{name: arrays[name] for name in
+                          ("position", "velocity", "target", "decision_timer", "state", "ball")},
+                       **meta)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
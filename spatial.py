@@ -0,0 +1,202 @@
+import math
+
+
+class SpatialGrid:
+    """Uniform grid spatial hash for fixed-radius and nearest-neighbour queries.
+
+    The pitch is cut into square cells of cell_size pixels and every item is
+    kept in the bucket of the cell it stands in. move() only touches the
+    buckets when an item actually crosses into another cell, so keeping the
+    grid in sync with moving players is cheap. Query results come back in
+    insertion order, so callers that draw random numbers per result stay
+    reproducible.
+    """
+
+    def __init__(self, width=800, height=600, cell_size=50):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.cols = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+
+        # item -> [x, y, cell index, insertion order]
+        self._entries = {}
+        self._next_order = 0
+        # Reused by _candidates; every query consumes it before returning
+        self._scratch = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def _cell_coords(self, x, y):
+        cx = int(x // self.cell_size)
+        cy = int(y // self.cell_size)
+        # Anything off the grid lives in the nearest edge cell
+        if cx < 0:
+            cx = 0
+        elif cx >= self.cols:
+            cx = self.cols - 1
+        if cy < 0:
+            cy = 0
+        elif cy >= self.rows:
+            cy = self.rows - 1
+        return cx, cy
+
+    def insert(self, item, x, y):
+        """Add an item at (x, y)"""
+        if item in self._entries:
+            raise ValueError(f"{item!r} is already in the grid")
+        cx, cy = self._cell_coords(x, y)
+        cell = cy * self.cols + cx
+        self._entries[item] = [x, y, cell, self._next_order]
+        self._next_order += 1
+        self.cells[cell].append(item)
+
+    def remove(self, item):
+        """Take an item out of the grid"""
+        entry = self._entries.pop(item)
+        self.cells[entry[2]].remove(item)
+
+    def move(self, item, x, y):
+        """Update an item's position, re-bucketing only if it changed cell"""
+        entry = self._entries[item]
+        entry[0] = x
+        entry[1] = y
+        cx, cy = self._cell_coords(x, y)
+        cell = cy * self.cols + cx
+        if cell != entry[2]:
+            self.cells[entry[2]].remove(item)
+            self.cells[cell].append(item)
+            entry[2] = cell
+
+    def update(self, players):
+        """Move every player in the list to its current position"""
+        entries = self._entries
+        cells = self.cells
+        cell_size = self.cell_size
+        cols, rows = self.cols, self.rows
+        for p in players:
+            entry = entries[p]
+            x = entry[0] = p.x
+            y = entry[1] = p.y
+            # Inlined _cell_coords: this runs for every player every tick
+            cx = int(x // cell_size)
+            cy = int(y // cell_size)
+            if cx < 0 or cx >= cols or cy < 0 or cy >= rows:
+                cx, cy = self._cell_coords(x, y)
+            cell = cy * cols + cx
+            if cell != entry[2]:
+                cells[entry[2]].remove(p)
+                cells[cell].append(p)
+                entry[2] = cell
+
+    def position(self, item):
+        entry = self._entries[item]
+        return entry[0], entry[1]
+
+    def query_radius(self, x, y, r, predicate=None, out=None):
+        """Items within distance r of (x, y), in insertion order
+
+        predicate, if given, filters the candidates before the distance test.
+        Pass a list as out to have it cleared and filled instead of getting
+        a new list back.
+        """
+        entries = self._entries
+        found = [] if out is None else out
+        found.clear()
+        for item in self._candidates(x, y, r):
+            if predicate is not None and not predicate(item):
+                continue
+            entry = entries[item]
+            if math.hypot(entry[0] - x, entry[1] - y) <= r:
+                found.append(item)
+        if len(found) > 1:
+            found.sort(key=self._order)
+        return found
+
+    def _order(self, item):
+        return self._entries[item][3]
+
+    def _candidates(self, x, y, r):
+        """Items in the cells overlapping the square around a circle of radius r"""
+        x0, y0 = self._cell_coords(x - r, y - r)
+        x1, y1 = self._cell_coords(x + r, y + r)
+
+        # With few items or a huge radius a straight scan beats visiting cells
+        if (x1 - x0 + 1) * (y1 - y0 + 1) >= len(self._entries):
+            return self._entries
+
+        candidates = self._scratch
+        candidates.clear()
+        cols = self.cols
+        cells = self.cells
+        for cy in range(y0, y1 + 1):
+            row = cy * cols
+            for cell in range(row + x0, row + x1 + 1):
+                candidates.extend(cells[cell])
+        return candidates
+
+    def nearest(self, x, y, max_radius=float('inf'), predicate=None):
+        """Closest item to (x, y) within max_radius, and its distance
+
+        Returns (None, inf) when nothing qualifies. Ties go to the item
+        inserted first.
+        """
+        entries = self._entries
+        best = None
+        best_distance = float('inf')
+        best_order = None
+
+        if max_radius != float('inf'):
+            # Bounded search: just look at the cells the radius covers
+            for item in self._candidates(x, y, max_radius):
+                if predicate is not None and not predicate(item):
+                    continue
+                entry = entries[item]
+                dist = math.hypot(entry[0] - x, entry[1] - y)
+                if dist <= max_radius and (dist < best_distance or
+                                           (dist == best_distance and entry[3] < best_order)):
+                    best = item
+                    best_distance = dist
+                    best_order = entry[3]
+            return best, best_distance
+
+        # Unbounded search: expand rings of cells outwards from (x, y)
+        cx, cy = self._cell_coords(x, y)
+        for ring in range(max(self.cols, self.rows) + 1):
+            # Everything in later rings is at least this far away
+            if best is not None and (ring - 1) * self.cell_size > best_distance:
+                break
+            for item in self._ring(cx, cy, ring):
+                if predicate is not None and not predicate(item):
+                    continue
+                entry = entries[item]
+                dist = math.hypot(entry[0] - x, entry[1] - y)
+                if dist < best_distance or (dist == best_distance and entry[3] < best_order):
+                    best = item
+                    best_distance = dist
+                    best_order = entry[3]
+
+        return best, best_distance
+
+    def _ring(self, cx, cy, ring):
+        """Items in the square ring of cells at Chebyshev distance ring"""
+        cells = self.cells
+        cols, rows = self.cols, self.rows
+        if ring == 0:
+            yield from cells[cy * cols + cx]
+            return
+        for gy in range(cy - ring, cy + ring + 1):
+            if gy < 0 or gy >= rows:
+                continue
+            if gy in (cy - ring, cy + ring):
+                xs = range(cx - ring, cx + ring + 1)
+            else:
+                xs = (cx - ring, cx + ring)
+            for gx in xs:
+                if 0 <= gx < cols:
+                    yield from cells[gy * cols + gx]
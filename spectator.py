@@ -0,0 +1,112 @@
+import pygame
+import argparse
+import socket
+import threading
+from ball import Ball
+from player import Player
+from match import WIDTH, HEIGHT
+from match_server import MESSAGE, HELLO, SnapshotDecoder
+from renderer import RENDERERS
+
+
+class StreamView:
+    """Just enough of a Match for a Renderer to draw, fed by decoded snapshots"""
+
+    def __init__(self, roster):
+        self.players = [Player(*r["home"], team=r["team"], name=r["name"], role=r["role"],
+                               color=tuple(r["color"])) for r in roster]
+        self.ball = Ball(WIDTH // 2, HEIGHT // 2)
+        self.score = {"A": 0, "B": 0}
+        self.game_time = 0
+
+    def apply(self, frame):
+        for player, x, y, state in zip(self.players, frame["x"], frame["y"], frame["state"]):
+            player.x = x
+            player.y = y
+            player.state = state
+        self.ball.x, self.ball.y = frame["ball"]
+        self.score = frame["score"]
+        self.game_time = frame["time_ms"]
+
+
+def read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) < size:
+        raise ConnectionError("server closed the connection")
+    return data
+
+
+def read_message(stream):
+    kind, length = MESSAGE.unpack(read_exactly(stream, MESSAGE.size))
+    return kind, read_exactly(stream, length)
+
+
+class StreamReader(threading.Thread):
+    """Reads and decodes the stream in the background, keeping the latest snapshot"""
+
+    def __init__(self, stream, decoder):
+        super().__init__(daemon=True)
+        self.stream = stream
+        self.decoder = decoder
+        self.latest = None
+        self.closed = False
+
+    def run(self):
+        try:
+            while True:
+                frame = self.decoder.decode(*read_message(self.stream))
+                if frame is not None:
+                    self.latest = frame
+        except (ConnectionError, OSError):
+            self.closed = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a match hosted by match_server.py")
+    parser.add_argument("--host", default="127.0.0.1", help="Server address")
+    parser.add_argument("--port", type=int, default=8765, help="Server TCP port")
+    parser.add_argument("--match", type=int, default=0, help="Id of the match to watch")
+    parser.add_argument("--render", choices=sorted(RENDERERS), default="dirty",
+                        help="full: redraw everything each frame, "
+                             "dirty: cached pitch and dirty-rectangle updates")
+    args = parser.parse_args()
+
+    connection = socket.create_connection((args.host, args.port))
+    connection.sendall(f"{args.match}\n".encode())
+    stream = connection.makefile("rb")
+    kind, payload = read_message(stream)
+    if kind != HELLO:
+        raise SystemExit("Unexpected reply from the server")
+    decoder = SnapshotDecoder(payload)
+    reader = StreamReader(stream, decoder)
+    reader.start()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Football Simulation - Match {args.match}")
+    clock = pygame.time.Clock()
+    renderer = RENDERERS[args.render](screen)
+    view = StreamView(decoder.roster)
+
+    running = True
+    while running and not reader.closed:
+        clock.tick(60)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                running = False
+
+        frame = reader.latest
+        if frame is not None:
+            view.apply(frame)
+        renderer.draw_frame(view, False)
+
+    connection.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
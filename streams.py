@@ -0,0 +1,156 @@
+import random
+
+# Purposes of a player's draws; the row is the player's index in the roster
+OFFSET_X, OFFSET_Y = 0, 1       # Wobble around the formation position (decide_action)
+SUPPORT = 2                     # should_support roll
+SUPPORT_X, SUPPORT_Y = 3, 4     # calculate_support_position offsets
+SIGHT = 5                       # can_see roll of the passer looking for this player
+TACKLE = 6                      # attempt_tackle roll of this player
+
+# Purposes of the match's own draws, all on MATCH_ROW
+MATCH_ROW = 0xFFF
+ACTION = 0                      # Does the possessor act this tick (2%)
+ACTION_KIND = 1                 # Pass or dribble
+SHOT_Y, SHOT_POWER = 2, 3
+PASS_TARGET = 4
+DRIBBLE_X, DRIBBLE_Y = 5, 6
+SCATTER_X, SCATTER_Y = 7, 8     # Loose ball after a tackle
+
+# Bit widths of the fields of a draw's counter, from the top: tick, row,
+# purpose, repeat (draws of the same row and purpose within one tick)
+TICK_BITS, ROW_BITS, PURPOSE_BITS, REPEAT_BITS = 40, 12, 8, 4
+ROW_SHIFT = PURPOSE_BITS + REPEAT_BITS
+TICK_SHIFT = ROW_BITS + ROW_SHIFT
+
+MASK = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15     # SplitMix64 increment
+MIX_1 = 0xBF58476D1CE4E5B9
+MIX_2 = 0x94D049BB133111EB
+UNIT = 2.0 ** -53
+
+
+def mix64(z):
+    """SplitMix64 finaliser: scrambles a 64-bit integer, one-to-one"""
+    z = ((z ^ (z >> 30)) * MIX_1) & MASK
+    z = ((z ^ (z >> 27)) * MIX_2) & MASK
+    return z ^ (z >> 31)
+
+
+def stream_key(seed, index=0):
+    """Key pair of match index of a seed (a lone Match is index 0)"""
+    base = (seed if seed is not None else random.SystemRandom().getrandbits(64)) & MASK
+    return (mix64((base + (2 * index + 1) * GOLDEN) & MASK),
+            mix64((base + (2 * index + 2) * GOLDEN) & MASK))
+
+
+def counter(tick, row, purpose, repeat=0):
+    """Position of one draw in a match's stream
+
+    A field outside its bit width would spill into its neighbour and give
+    the number of another draw, so that raises ValueError instead.
+    """
+    if not (0 <= repeat < 1 << REPEAT_BITS and 0 <= purpose < 1 << PURPOSE_BITS
+            and 0 <= row < 1 << ROW_BITS and 0 <= tick < 1 << TICK_BITS):
+        raise ValueError(f"draw (tick {tick}, row {row}, purpose {purpose}, repeat {repeat}) "
+                         f"doesn't fit the stream layout")
+    return (tick << TICK_SHIFT) | (row << ROW_SHIFT) | (purpose << REPEAT_BITS) | repeat
+
+
+def draw(key, tick, row, purpose, repeat=0):
+    """The uniform [0, 1) number at (tick, row, purpose, repeat) of a key's stream"""
+    z = mix64((counter(tick, row, purpose, repeat) + key[0]) & MASK)
+    return (mix64(z ^ key[1]) >> 11) * UNIT
+
+
+class RandomStreams:
+    """Counter-based random numbers for one match.
+
+    Every draw is a pure function of the match key, the tick, a row (a
+    player's roster index, or MATCH_ROW) and a purpose, instead of the
+    next number off a shared generator. The order players and rules are
+    evaluated in makes no difference, a tick's draws can be computed in
+    any order or all at once (draw_array), and a match is reproduced by
+    its key and tick alone. Asking for the same (row, purpose) again
+    within a tick gives the next number of that slot.
+    """
+
+    def __init__(self, clock, seed=None, index=0):
+        self.clock = clock
+        self.key = stream_key(seed, index)
+        self._tick = None
+        self._repeats = {}
+
+    def reseed(self, seed, index=0):
+        self.key = stream_key(seed, index)
+
+    def random(self, row, purpose):
+        tick = self.clock.ticks
+        if tick != self._tick:
+            self._tick = tick
+            self._repeats.clear()
+        slot = (row, purpose)
+        repeat = self._repeats.get(slot, 0)
+        self._repeats[slot] = repeat + 1
+        return draw(self.key, tick, row, purpose, repeat)
+
+    def uniform(self, row, purpose, low, high):
+        return low + (high - low) * self.random(row, purpose)
+
+    def skip(self, row, purpose):
+        """Count a draw of (row, purpose) made outside random(), e.g. in a kernel"""
+        tick = self.clock.ticks
+        if tick != self._tick:
+            self._tick = tick
+            self._repeats.clear()
+        slot = (row, purpose)
+        self._repeats[slot] = self._repeats.get(slot, 0) + 1
+
+
+class SequentialDraws:
+    """The RandomStreams interface on an ordinary generator, ignoring the keys.
+
+    For players that live outside a Match, where there is no clock and
+    nothing to reproduce.
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+
+    def random(self, row, purpose):
+        return self.rng.random()
+
+    def uniform(self, row, purpose, low, high):
+        return self.rng.uniform(low, high)
+
+
+def stream_keys(seed, n_matches):
+    """(n_matches, 2) uint64 keys of matches 0..n_matches-1 of a seed"""
+    import numpy as np
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    return np.array([stream_key(seed, i) for i in range(n_matches)], dtype=np.uint64)
+
+
+def _mix64_array(z):
+    import numpy as np
+    z = (z ^ (z >> 30)) * np.uint64(MIX_1)
+    z = (z ^ (z >> 27)) * np.uint64(MIX_2)
+    return z ^ (z >> 31)
+
+
+def draw_array(keys, tick, row, purpose, repeat=0):
+    """draw() for arrays of keys and rows in one vectorised call
+
+    keys is (..., 2) uint64 and broadcasts against row; the result is the
+    same number draw() gives for each (key, row), bit for bit.
+    """
+    # NumPy is only needed by the array engines; a lone Match stays without it
+    import numpy as np
+    row = np.asarray(row)
+    # Checks the scalar fields; counter() raises if they don't fit
+    base = counter(tick, 0, purpose, repeat)
+    if row.size and (row.min() < 0 or row.max() >= 1 << ROW_BITS):
+        raise ValueError(f"rows {row.min()} - {row.max()} don't fit the stream layout")
+    position = np.uint64(base) | (row.astype(np.uint64) << np.uint64(ROW_SHIFT))
+    z = _mix64_array(position + keys[..., 0])
+    return (_mix64_array(z ^ keys[..., 1]) >> np.uint64(11)) * UNIT
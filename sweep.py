@@ -0,0 +1,178 @@
+import argparse
+import itertools
+import json
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from statistics import NormalDist
+import formations
+from match import TICK_MS, MATCH_LENGTH_MS
+from tournament import ENGINES, SINGLE_CHUNK, play_chunk, summarise
+
+ALPHA = 0.05  # Chance over all looks of calling a pairing settled when it isn't
+
+
+class Pairing:
+    """Matches played so far between two formations and the sequential test on them.
+
+    The statistic is the mean of +1 (A wins), 0 (draw) and -1 (B wins),
+    i.e. P(A wins) - P(B wins). After every look the pairing is settled
+    once a confidence interval around it excludes zero. Look k tests at
+    level alpha / (k (k + 1)); those levels sum to alpha, so stopping at
+    whichever look first succeeds keeps the overall error rate at alpha.
+    """
+
+    def __init__(self, home, away, alpha=ALPHA):
+        self.home = home
+        self.away = away
+        self.alpha = alpha
+        self.results = []
+        self.looks = 0
+        self.submitted = 0
+        self.in_flight = 0
+        self.status = "running"
+
+    @property
+    def label(self):
+        return f"{self.home} v {self.away}"
+
+    def difference(self):
+        """P(A wins) - P(B wins) and the half-width of its interval at the current look"""
+        n = len(self.results)
+        margins = [(a > b) - (a < b) for _, a, b in self.results]
+        mean = sum(margins) / n
+        if n < 2:
+            return mean, math.inf
+        variance = sum((m - mean) ** 2 for m in margins) / (n - 1)
+        z = NormalDist().inv_cdf(1 - self.alpha / (self.looks * (self.looks + 1)) / 2)
+        return mean, z * math.sqrt(variance / n)
+
+    def settled(self):
+        mean, half_width = self.difference()
+        return abs(mean) > half_width
+
+
+def run_sweep(names, n_ticks, look_size=100, max_matches=2000, master_seed=0, workers=None,
+              chunk_size=None, engine="batch", alpha=ALPHA, progress=None):
+    """Play every pairing of the named formations until its test settles or max_matches
+
+    All pairings share one process pool. A pairing's next look is only
+    queued once its previous look is complete and still undecided, so the
+    work keeps flowing to the close matchups.
+    """
+    pairings = [Pairing(home, away, alpha) for home, away in itertools.combinations(names, 2)]
+    # The batch engine plays each look as one BatchMatch
+    chunk_size = chunk_size or (look_size if engine == "batch" else SINGLE_CHUNK)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def submit_look(pairing):
+            pairing.looks += 1
+            stop = min(pairing.submitted + look_size, max_matches)
+            for start in range(pairing.submitted, stop, chunk_size):
+                future = pool.submit(play_chunk, pairing.home, pairing.away, engine, n_ticks,
+                                     master_seed, start, min(start + chunk_size, stop))
+                pending[future] = pairing
+                pairing.in_flight += 1
+            pairing.submitted = stop
+
+        for pairing in pairings:
+            submit_look(pairing)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pairing = pending.pop(future)
+                pairing.results.extend(future.result())
+                pairing.in_flight -= 1
+                if pairing.in_flight:
+                    continue
+                if pairing.settled():
+                    pairing.status = "settled"
+                elif pairing.submitted >= max_matches:
+                    pairing.status = "unsettled"
+                else:
+                    submit_look(pairing)
+                    continue
+                pairing.results.sort()
+                if progress:
+                    progress(pairing, pairings)
+
+    return pairings
+
+
+def report(pairing):
+    """Summary of a finished pairing, as in tournament.summarise plus the test result"""
+    summary = summarise(pairing.results)
+    mean, half_width = pairing.difference()
+    summary.update(home=pairing.home, away=pairing.away, status=pairing.status,
+                   looks=pairing.looks, difference=mean,
+                   interval=[mean - half_width, mean + half_width])
+    return summary
+
+
+def print_reports(reports):
+    print(f"{'pairing':<34}{'matches':>8}{'A wins':>8}{'draws':>8}{'B wins':>8}"
+          f"{'A-B':>8}  {'interval':<17}status")
+    for r in sorted(reports, key=lambda r: abs(r["difference"]), reverse=True):
+        rates = r["outcomes"]
+        low, high = r["interval"]
+        print(f"{r['home'] + ' v ' + r['away']:<34}{r['matches']:>8}"
+              f"{rates['A']['rate']:>8.1%}{rates['draw']['rate']:>8.1%}{rates['B']['rate']:>8.1%}"
+              f"{r['difference']:>+8.3f}  [{low:+.3f}, {high:+.3f}] {r['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play every formation pairing until a sequential test settles who is better")
+    parser.add_argument("formations", nargs="*", metavar="FORMATION",
+                        help=f"Formations to sweep (default: all of {', '.join(formations.FORMATIONS)})")
+    parser.add_argument("--minutes", type=float, default=MATCH_LENGTH_MS / 60000,
+                        help="Simulated match length in minutes")
+    parser.add_argument("--look", type=int, default=100, help="Matches added per pairing between tests")
+    parser.add_argument("--max-matches", type=int, default=2000,
+                        help="Give up on a pairing after this many matches")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="Overall error rate of each test")
+    parser.add_argument("--seed", type=int, default=0, help="Master seed")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int,
+                        help=f"Matches per work item (default: {SINGLE_CHUNK}, or a whole look for "
+                             "the batch engine)")
+    parser.add_argument("--engine", choices=ENGINES, default="batch",
+                        help="Engine used by the workers: batch plays each work item as one "
+                             "BatchMatch, vector and object one match at a time")
+    parser.add_argument("--json", help="Also write the reports to this JSON file")
+    args = parser.parse_args()
+
+    names = args.formations or list(formations.FORMATIONS)
+    unknown = [name for name in names if name not in formations.FORMATIONS]
+    if unknown:
+        parser.error(f"unknown formation(s): {', '.join(unknown)}")
+    if len(names) < 2:
+        parser.error("need at least two formations")
+
+    n_ticks = int(args.minutes * 60000 / TICK_MS)
+    start = time.perf_counter()
+
+    def progress(pairing, pairings):
+        finished = sum(p.status != "running" for p in pairings)
+        elapsed = time.perf_counter() - start
+        print(f"[{finished}/{len(pairings)}] {pairing.label}: {pairing.status} after "
+              f"{len(pairing.results)} matches ({elapsed:.0f}s)", file=sys.stderr)
+
+    pairings = run_sweep(names, n_ticks, args.look, args.max_matches, args.seed, args.workers,
+                         args.chunk_size, args.engine, args.alpha, progress)
+    reports = [report(p) for p in pairings]
+    print_reports(reports)
+    total = sum(r["matches"] for r in reports)
+    print(f"{total} matches in {time.perf_counter() - start:.0f}s "
+          f"(a fixed {args.max_matches} per pairing would be {args.max_matches * len(reports)})")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import threading
+import pytest
+from events import GOAL, MatchEvent, QueueSink
+from match import Match, LEFT_GOAL, RIGHT_GOAL
+from vector_engine import VectorMatch
+
+
+@pytest.mark.parametrize("engine", [Match, VectorMatch])
+def test_goal_event_is_where_the_ball_crossed_the_line(engine):
+    match = engine(seed=1)
+    goals = []
+    match.events.subscribe(lambda event: goals.append(event) if event.kind == GOAL else None)
+    match.run(20000)
+
+    assert goals
+    for goal in goals:
+        if goal.team == "A":
+            assert goal.x >= RIGHT_GOAL.left
+        else:
+            assert goal.x < LEFT_GOAL.right
+        assert LEFT_GOAL.top <= goal.y < LEFT_GOAL.bottom
+
+
+class BrokenWriter:
+    def __init__(self):
+        self.closed = False
+
+    def write_batch(self, events):
+        raise OSError("disk full")
+
+    def close(self):
+        self.closed = True
+
+
+def test_failing_writer_is_reported_instead_of_blocking():
+    writer = BrokenWriter()
+    sink = QueueSink(writer, batch_size=1, max_batches=1)
+    event = MatchEvent(GOAL, 0, None, None, "A", 400, 300)
+    errors = []
+
+    def publish():
+        try:
+            for _ in range(1000):
+                sink(event)
+        except OSError as error:
+            errors.append(error)
+        try:
+            sink.close()
+        except OSError as error:
+            errors.append(error)
+
+    # A dead writer thread used to leave the publisher blocked on the full queue
+    publisher = threading.Thread(target=publish, daemon=True)
+    publisher.start()
+    publisher.join(timeout=10)
+    assert not publisher.is_alive()
+    # Raised by a flush while publishing, and again by close()
+    assert [str(error) for error in errors] == ["disk full", "disk full"]
+    assert writer.closed
+    assert sink.dropped > 0
@@ -0,0 +1,10 @@
+import kernels
+
+
+def test_kernels_match_the_numpy_code():
+    assert kernels.check_parity(n_matches=8, n_ticks=200)
+
+
+def test_kernels_match_the_player_and_ball_objects():
+    assert kernels.check_reference(n_matches=2, n_ticks=200)
+
@@ -0,0 +1,71 @@
+import math
+import random
+import pytest
+from spatial import SpatialGrid
+
+
+def scattered(n, width, height, seed=3):
+    rng = random.Random(seed)
+    # Some points off the pitch too: they live in the edge cells
+    return [(rng.uniform(-50, width + 50), rng.uniform(-50, height + 50)) for _ in range(n)]
+
+
+def filled_grid(points, width, height):
+    grid = SpatialGrid(width, height)
+    for i, (x, y) in enumerate(points):
+        grid.insert(i, x, y)
+    return grid
+
+
+@pytest.mark.parametrize("radius", [0, 18, 25, 180, 5000])
+def test_query_radius_matches_a_scan(radius):
+    points = scattered(500, 1200, 900)
+    grid = filled_grid(points, 1200, 900)
+    rng = random.Random(radius)
+    for _ in range(200):
+        x, y = rng.uniform(-20, 1220), rng.uniform(-20, 920)
+        expected = [i for i, (px, py) in enumerate(points) if math.hypot(px - x, py - y) <= radius]
+        assert grid.query_radius(x, y, radius) == expected
+        evens = [i for i in expected if i % 2 == 0]
+        assert grid.query_radius(x, y, radius, lambda i: i % 2 == 0) == evens
+
+
+@pytest.mark.parametrize("max_radius", [20, 150, float('inf')])
+def test_nearest_matches_a_scan(max_radius):
+    points = scattered(300, 1200, 900)
+    grid = filled_grid(points, 1200, 900)
+    rng = random.Random(5)
+    for _ in range(200):
+        x, y = rng.uniform(-20, 1220), rng.uniform(-20, 920)
+        candidates = [(math.hypot(px - x, py - y), i) for i, (px, py) in enumerate(points) if i % 3]
+        distance, item = min(candidates)
+        if distance > max_radius:
+            distance, item = float('inf'), None
+        assert grid.nearest(x, y, max_radius, lambda i: i % 3) == (item, distance)
+
+
+def test_moves_keep_queries_right_and_in_insertion_order():
+    points = scattered(200, 800, 600)
+    grid = filled_grid(points, 800, 600)
+    rng = random.Random(9)
+    for _ in range(20):
+        for i, (x, y) in enumerate(points):
+            points[i] = (x + rng.uniform(-40, 40), y + rng.uniform(-40, 40))
+            grid.move(i, *points[i])
+    grid.remove(0)
+    for x, y in [(400, 300), (0, 0), (800, 600)]:
+        expected = [i for i, (px, py) in enumerate(points)
+                    if i and math.hypot(px - x, py - y) <= 120]
+        assert grid.query_radius(x, y, 120) == expected
+    assert 0 not in grid and len(grid) == 199
+
+
+def test_ties_go_to_the_item_inserted_first():
+    grid = SpatialGrid(800, 600)
+    grid.insert("first", 410, 300)
+    grid.insert("second", 390, 300)
+    grid.move("first", 410, 300)
+    assert grid.nearest(400, 300) == ("first", 10)
+    assert grid.query_radius(400, 300, 10) == ["first", "second"]
+    with pytest.raises(ValueError):
+        grid.insert("first", 0, 0)
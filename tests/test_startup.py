@@ -0,0 +1,11 @@
+import pytest
+from benchmarks.scenarios import import_time, STARTUP_BUDGET_MS
+
+
+@pytest.mark.parametrize("module", ["match", "simulate"])
+def test_headless_import_is_light(module):
+    # Best of a few fresh interpreters, so one slow start doesn't fail it
+    runs = [import_time(module) for _ in range(3)]
+    assert min(ms for ms, _ in runs) < STARTUP_BUDGET_MS
+    for _, heavy in runs:
+        assert heavy == []
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from sim_clock import SimClock
+from streams import (RandomStreams, stream_keys, draw, draw_array, MATCH_ROW, ROW_BITS, PURPOSE_BITS,
+                     REPEAT_BITS, OFFSET_X, TACKLE)
+
+
+def test_draw_array_matches_draw():
+    keys = stream_keys(7, 3)
+    rows = np.arange(22)
+    values = draw_array(keys[:, None], 1234, rows, TACKLE, 2)
+    for m, key in enumerate(keys.tolist()):
+        for row in rows.tolist():
+            assert values[m, row] == draw(tuple(key), 1234, row, TACKLE, 2)
+
+
+@pytest.mark.parametrize("tick, row, purpose, repeat", [
+    (0, 1 << ROW_BITS, 0, 0),
+    (0, 0, 1 << PURPOSE_BITS, 0),
+    (0, 0, 0, 1 << REPEAT_BITS),
+    (-1, 0, 0, 0),
+])
+def test_fields_outside_the_layout_raise(tick, row, purpose, repeat):
+    with pytest.raises(ValueError):
+        draw((1, 2), tick, row, purpose, repeat)
+
+
+def test_rows_outside_the_layout_raise_for_arrays():
+    with pytest.raises(ValueError):
+        draw_array(stream_keys(7, 1), 0, np.array([0, 1 << ROW_BITS]), OFFSET_X)
+
+
+def test_repeats_within_a_tick_are_distinct_until_the_limit():
+    rng = RandomStreams(SimClock(), seed=1)
+    values = {rng.random(MATCH_ROW, OFFSET_X) for _ in range(1 << REPEAT_BITS)}
+    assert len(values) == 1 << REPEAT_BITS
+    with pytest.raises(ValueError):
+        rng.random(MATCH_ROW, OFFSET_X)
@@ -0,0 +1,37 @@
+import pytest
+from match import Match
+from vector_engine import VectorMatch
+from time_skip import AdaptiveStepper, equivalent
+
+
+def state(match):
+    return (match.score, match.ticks, match.possessor and match.possessor.name, (match.ball.x, match.ball.y),
+            tuple(match.ball.velocity),
+            [(p.x, p.y, p.velocity_x, p.velocity_y, p.decision_timer, p.state, p.target_x,
+              p.target_y) for p in match.players])
+
+
+@pytest.mark.parametrize("seed", [1, 3])
+def test_stepper_plays_the_fixed_step_match(seed):
+    fixed = Match(seed=seed)
+    fixed.run(6000)
+    adaptive = Match(seed=seed)
+    stepper = AdaptiveStepper(adaptive)
+    stepper.run(6000)
+
+    assert state(adaptive) == state(fixed)
+    # Decisions are made inside the jumps, so the default stagger leaves plenty to skip
+    assert stepper.skipped > 6000 // 4
+    assert stepper.skipped + stepper.stepped == 6000
+
+
+def test_vector_engine_is_refused():
+    with pytest.raises(ValueError):
+        AdaptiveStepper(VectorMatch(seed=1))
+
+
+def test_disjoint_intervals_are_not_equivalent():
+    same = {"shot": (6.0, (5.5, 6.5), 6.2, (5.7, 6.7), True)}
+    different = dict(same, goals_a=(2.0, (1.8, 2.2), 3.0, (2.8, 3.2), False))
+    assert equivalent(same)
+    assert not equivalent(different)
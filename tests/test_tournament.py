@@ -0,0 +1,14 @@
+from tournament import play_chunk, run_tournament
+
+
+def test_batch_results_do_not_depend_on_the_chunking():
+    whole = play_chunk("formation_433", "formation_442", "batch", 600, 7, 0, 6)
+    split = (play_chunk("formation_433", "formation_442", "batch", 600, 7, 0, 2)
+             + play_chunk("formation_433", "formation_442", "batch", 600, 7, 2, 6))
+    assert whole == split
+    assert [index for index, _, _ in whole] == list(range(6))
+
+
+def test_tournament_defaults_to_the_batch_engine():
+    results = run_tournament("formation_433", "formation_442", 6, 600, master_seed=7, workers=1)
+    assert results == play_chunk("formation_433", "formation_442", "batch", 600, 7, 0, 6)
@@ -0,0 +1,22 @@
+import pytest
+import kernels
+from match import Match
+from vector_engine import VectorMatch
+
+
+@pytest.mark.parametrize("use_kernels", [True, False])
+@pytest.mark.parametrize("intercept", [False, True])
+def test_vector_match_plays_the_object_match(monkeypatch, use_kernels, intercept):
+    monkeypatch.setattr(kernels, "ENABLED", use_kernels and kernels.AVAILABLE)
+    reference = Match(seed=2, intercept=intercept)
+    vector = VectorMatch(seed=2, intercept=intercept)
+    reference.run(3000)
+    vector.run(3000)
+    vector.sync()
+
+    assert vector.score == reference.score
+    for p, q in zip(vector.players, reference.players):
+        assert (p.x, p.y) == pytest.approx((q.x, q.y), abs=1e-9)
+        assert (p.state, p.target_x, p.target_y) == (q.state, pytest.approx(q.target_x),
+                                                     pytest.approx(q.target_y))
+    assert (vector.ball.x, vector.ball.y) == pytest.approx((reference.ball.x, reference.ball.y))
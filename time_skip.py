@@ -0,0 +1,268 @@
+import argparse
+import math
+import time
+import formations
+from ball import possession_range
+from player import DECISION_INTERVAL, STATE_COLORS, state_urgency
+from match import Match, LEFT_GOAL, RIGHT_GOAL
+from vector_engine import VectorMatch
+from events import KINDS, GOAL
+from tournament import mean_interval
+
+MARGIN = 1e-9  # Slack on the possession test for float rounding, in pixels
+
+
+class AdaptiveStepper:
+    """Runs a Match by jumping over quiet stretches instead of stepping them.
+
+    A tick is quiet when nobody can come within possession range of the
+    ball and the ball can't reach a goal mouth: then there is nobody on the
+    ball to shoot, pass, dribble or be tackled, and no goal. A jump plays a
+    stretch of quiet ticks with only what they need - the ball update, the
+    players' movement and the decisions that fall due - and skips the
+    possession test, tackles, goal check and the second proximity pass of
+    every tick in it.
+
+    Decisions run inside the jump on the tick they are due, with Player.plan
+    against the ball and players as they stand on that tick, so the
+    staggered schedule of scheduler.DecisionScheduler is kept. Their draws
+    are keyed by tick and player, so they come out as in Match.step and a
+    jump ends in exactly the state stepping would reach. The movement is
+    Player.update_movement and Player.update written out in one loop.
+
+    Whether the next tick is quiet comes from bounds that need no
+    lookahead: no player moves faster than the larger of its current speed
+    and its top speed, whatever it decides, and the ball never speeds up.
+    The jump checks them for every player as it moves them and ends as soon
+    as the next tick might not be quiet. Ticks with a player on the ball,
+    tick listeners or a profiler are played with Match.step as usual.
+
+    VectorMatch is not supported: with its movement and range queries in
+    compiled kernels, a jump saves less than the bounds cost.
+    """
+
+    def __init__(self, match):
+        self.match = match
+        self.players = match.players
+        self.skipped = 0
+        self.stepped = 0
+        self.jumps = 0
+
+        if isinstance(match, VectorMatch):
+            raise ValueError("adaptive stepping plays the object engine (Match) only")
+        self.reach = [possession_range(p.role) + MARGIN for p in self.players]
+        self.top_speed = [p.max_speed * state_urgency("chasing") for p in self.players]
+        self.urgency = {state: state_urgency(state) for state in STATE_COLORS}
+
+    def run(self, n_ticks):
+        """Advance the match by n_ticks ticks and return the score"""
+        match = self.match
+        remaining = n_ticks
+        while remaining > 0:
+            if (match.possessor is None and not match.tick_listeners and match.profiler is None
+                    and self.next_tick_quiet()):
+                jumped = self.skip(remaining)
+                self.skipped += jumped
+                self.jumps += 1
+                remaining -= jumped
+            else:
+                match.step()
+                self.stepped += 1
+                remaining -= 1
+        return match.score
+
+    def _ball_stays_out_of_goals(self):
+        """Whether the ball is certain not to reach a goal mouth next tick"""
+        ball = self.match.ball
+        # The ball moves at most |vx| a tick along x
+        vx = abs(ball.velocity[0])
+        return LEFT_GOAL.right <= ball.x - vx and ball.x + vx < RIGHT_GOAL.left
+
+    def next_tick_quiet(self):
+        """Whether the next tick is certain to be quiet"""
+        if not self._ball_stays_out_of_goals():
+            return False
+
+        # Possession: the gap to each player closes by at most the ball's
+        # speed plus the player's top speed in a tick
+        hypot = math.hypot
+        ball = self.match.ball
+        ball_x, ball_y = ball.x, ball.y
+        ball_speed = hypot(*ball.velocity)
+        for p, reach, top_speed in zip(self.players, self.reach, self.top_speed):
+            speed = hypot(p.velocity_x, p.velocity_y)
+            closing = (speed if speed > top_speed else top_speed) + ball_speed
+            if hypot(p.x - ball_x, p.y - ball_y) - reach < closing:
+                return False
+        return True
+
+    def skip(self, limit):
+        """Play quiet ticks, up to limit, and return how many
+
+        Call only when next_tick_quiet() holds; the jump goes on while
+        the tick after the one just played is certain to be quiet too.
+        """
+        match = self.match
+        ball = match.ball
+        clock = match.clock
+        proximity = match.proximity
+        players = self.players
+        bounds = list(zip(players, self.reach, self.top_speed))
+        urgency = self.urgency
+        dt = clock.tick_ms
+        hypot = math.hypot
+
+        due = [p for p in players if p.decision_timer >= DECISION_INTERVAL]
+        played = 0
+        quiet = True
+        while quiet and played < limit:
+            clock.advance()
+            ball.update()
+            proximity.update(ball)
+            # Everyone due decides before anyone moves, as in Match.step
+            for p in due:
+                p.decision_timer = 0
+                p.plan(ball, players, proximity)
+            due.clear()
+
+            ball_x, ball_y = ball.x, ball.y
+            ball_speed = hypot(*ball.velocity)
+            quiet = self._ball_stays_out_of_goals()
+            # Player.update_movement then Player.update, for every player
+            for p, reach, top_speed in bounds:
+                x, y = p.x, p.y
+                vx, vy = p.velocity_x, p.velocity_y
+                dx = p.target_x - x
+                dy = p.target_y - y
+                distance = hypot(dx, dy)
+                if distance > 5:
+                    desired_speed = p.max_speed * urgency[p.state]
+                    if distance * 0.1 < desired_speed:
+                        desired_speed = distance * 0.1
+                    acceleration = p.acceleration
+                    vx += (dx / distance * desired_speed - vx) * acceleration
+                    vy += (dy / distance * desired_speed - vy) * acceleration
+                friction = p.friction
+                vx *= friction
+                vy *= friction
+                p.velocity_x = vx
+                p.velocity_y = vy
+                # Same clamping as max(10, min(790, x)), ties included
+                x += vx
+                y += vy
+                x = p.x = 10 if x <= 10 else 790 if x >= 790 else x
+                y = p.y = 10 if y <= 10 else 590 if y >= 590 else y
+                timer = p.decision_timer = p.decision_timer + dt
+                if timer >= DECISION_INTERVAL:
+                    due.append(p)
+
+                # Is this player certain to stay out of reach next tick?
+                if quiet:
+                    speed = hypot(vx, vy)
+                    closing = (speed if speed > top_speed else top_speed) + ball_speed
+                    quiet = hypot(x - ball_x, y - ball_y) - reach >= closing
+            played += 1
+
+        proximity.update(ball)
+        return played
+
+
+def match_stats(match, n_ticks, adaptive):
+    """Goals and event counts of one match, played fixed-step or adaptively"""
+    counts = dict.fromkeys(KINDS, 0)
+
+    def count(event):
+        counts[event.kind] += 1
+    match.events.subscribe(count)
+
+    start = time.perf_counter()
+    if adaptive:
+        stepper = AdaptiveStepper(match)
+        stepper.run(n_ticks)
+        skipped = stepper.skipped
+    else:
+        match.run(n_ticks)
+        skipped = 0
+    elapsed = time.perf_counter() - start
+
+    counts["goals_a"] = match.score["A"]
+    counts["goals_b"] = match.score["B"]
+    del counts[GOAL]
+    return counts, elapsed, skipped
+
+
+def validate(home, away, n_matches, n_ticks, engine=Match, seed=0, progress=None):
+    """Play the same seeds fixed-step and adaptively and compare the statistics
+
+    Returns {statistic: (fixed mean, its 95% interval, adaptive mean, its
+    95% interval, agree)} plus the total time and share of ticks skipped.
+    A statistic agrees when the two intervals overlap; see equivalent().
+    """
+    fixed = []
+    adaptive = []
+    time_fixed = time_adaptive = 0.0
+    skipped = 0
+    for i in range(n_matches):
+        stats, elapsed, _ = match_stats(engine(home, away, seed=seed + i), n_ticks, False)
+        fixed.append(stats)
+        time_fixed += elapsed
+        stats, elapsed, n_skipped = match_stats(engine(home, away, seed=seed + i), n_ticks, True)
+        adaptive.append(stats)
+        time_adaptive += elapsed
+        skipped += n_skipped
+        if progress:
+            progress(i + 1, n_matches)
+
+    comparison = {}
+    for name in fixed[0]:
+        fixed_mean, (f_low, f_high) = mean_interval([s[name] for s in fixed])
+        adaptive_mean, (a_low, a_high) = mean_interval([s[name] for s in adaptive])
+        comparison[name] = (fixed_mean, (f_low, f_high), adaptive_mean, (a_low, a_high),
+                            f_low <= a_high and a_low <= f_high)
+    return comparison, time_fixed, time_adaptive, skipped / (n_matches * n_ticks)
+
+
+def equivalent(comparison):
+    """Whether every statistic of a validate() comparison agrees
+
+    Disjoint 95% intervals mean the difference is significant at well
+    under the 5% level, so a failure is a real change in how matches play
+    rather than noise.
+    """
+    return all(agree for *_, agree in comparison.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that adaptive time skipping plays like fixed stepping, and time both")
+    parser.add_argument("--home", default="formation_433", help="Team A formation")
+    parser.add_argument("--away", default="formation_433", help="Team B formation")
+    parser.add_argument("-n", "--matches", type=int, default=50, help="Matches per mode")
+    parser.add_argument("--minutes", type=float, default=10,
+                        help="Simulated length of each match in minutes")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first match")
+    args = parser.parse_args()
+
+    n_ticks = int(args.minutes * 60000 / Match().clock.tick_ms)
+
+    def progress(done, total):
+        print(f"\r{done}/{total} matches", end="", flush=True)
+
+    comparison, time_fixed, time_adaptive, skipped = validate(
+        formations.get(args.home), formations.get(args.away), args.matches, n_ticks,
+        Match, args.seed, progress)
+    print()
+
+    print(f"{'statistic':<14}{'fixed':>24}{'adaptive':>24}  overlap")
+    for name, (fixed, (f_low, f_high), adaptive, (a_low, a_high), agree) in comparison.items():
+        print(f"{name:<14}{fixed:>8.2f} [{f_low:6.2f}, {f_high:6.2f}]"
+              f"{adaptive:>8.2f} [{a_low:6.2f}, {a_high:6.2f}]  {'yes' if agree else 'NO'}")
+    print(f"Skipped {skipped:.1%} of ticks; fixed {time_fixed:.2f}s, adaptive {time_adaptive:.2f}s "
+          f"({time_fixed / time_adaptive:.2f}x)")
+    if not equivalent(comparison):
+        print("Adaptive stepping changes the statistics marked NO")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import formations
+from match import TICK_MS, MATCH_LENGTH_MS
+from simulate import engine_class
+
+Z_95 = 1.959964  # Two-sided 95% normal quantile
+ENGINES = ("batch", "vector", "object")
+SINGLE_CHUNK = 10   # Matches per work item for the one-match-at-a-time engines
+BATCH_CHUNK = 500   # Most matches in one BatchMatch work item
+
+
+def match_seed(master_seed, index):
+    """Seed for match number index, independent of how matches are split up"""
+    return int(np.random.SeedSequence(master_seed, spawn_key=(index,)).generate_state(1)[0])
+
+
+def default_chunk_size(engine, n_matches, workers=None):
+    """Matches per work item: one batch per worker for the batch engine"""
+    if engine != "batch":
+        return SINGLE_CHUNK
+    workers = workers or os.cpu_count() or 1
+    return max(1, min(BATCH_CHUNK, math.ceil(n_matches / workers)))
+
+
+def play_chunk(home, away, engine, n_ticks, master_seed, start, stop):
+    """Play matches start..stop-1 and return their (index, goals_a, goals_b)
+
+    The batch engine plays the whole chunk as one BatchMatch, each match
+    still drawing from the streams of its own match_seed.
+    """
+    match_class = engine_class(engine)
+    home_formation = formations.get(home)
+    away_formation = formations.get(away)
+
+    if engine == "batch":
+        batch = match_class(stop - start, home_formation, away_formation,
+                            seeds=[match_seed(master_seed, index) for index in range(start, stop)])
+        score = batch.run(n_ticks).tolist()
+        return [(index, a, b) for index, (a, b) in zip(range(start, stop), score)]
+
+    results = []
+    for index in range(start, stop):
+        match = match_class(home_formation, away_formation,
+                            seed=match_seed(master_seed, index))
+        match.run(n_ticks)
+        results.append((index, match.score["A"], match.score["B"]))
+    return results
+
+
+def run_tournament(home, away, n_matches, n_ticks, master_seed=0, workers=None,
+                   chunk_size=None, engine="batch", progress=None):
+    """Play n_matches across a process pool and return the results in match order"""
+    chunk_size = chunk_size or default_chunk_size(engine, n_matches, workers)
+    chunks = [(start, min(start + chunk_size, n_matches))
+              for start in range(0, n_matches, chunk_size)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_chunk, home, away, engine, n_ticks, master_seed, start, stop)
+                   for start, stop in chunks]
+        for future in as_completed(futures):
+            results.extend(future.result())
+            if progress:
+                progress(len(results), n_matches)
+
+    results.sort()
+    return results
+
+
+def wilson_interval(successes, n, z=Z_95):
+    """Wilson score confidence interval for a proportion"""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return centre - half_width, centre + half_width
+
+
+def mean_interval(values, z=Z_95):
+    """Mean and normal-approximation confidence interval"""
+    values = np.asarray(values, dtype=float)
+    mean = values.mean()
+    if len(values) < 2:
+        return mean, (mean, mean)
+    half_width = z * values.std(ddof=1) / math.sqrt(len(values))
+    return mean, (mean - half_width, mean + half_width)
+
+
+def summarise(results):
+    """Score distribution, win/draw/loss rates and 95% confidence intervals"""
+    n = len(results)
+    goals_a = [a for _, a, _ in results]
+    goals_b = [b for _, _, b in results]
+    outcomes = Counter("A" if a > b else "B" if b > a else "draw" for _, a, b in results)
+
+    summary = {"matches": n, "outcomes": {}, "goals": {}}
+    for outcome in ("A", "draw", "B"):
+        low, high = wilson_interval(outcomes[outcome], n)
+        summary["outcomes"][outcome] = {"rate": outcomes[outcome] / n if n else 0.0,
+                                        "ci95": [low, high]}
+    for team, goals in (("A", goals_a), ("B", goals_b)):
+        mean, (low, high) = mean_interval(goals)
+        summary["goals"][team] = {"mean": mean, "ci95": [low, high]}
+    scores = Counter(f"{a}-{b}" for _, a, b in results)
+    summary["scores"] = dict(sorted(scores.items(), key=lambda item: (-item[1], item[0])))
+    return summary
+
+
+def print_summary(home, away, summary):
+    print(f"=== {home} (A) vs {away} (B): {summary['matches']} matches ===")
+    labels = {"A": "A wins", "draw": "Draws ", "B": "B wins"}
+    for outcome, label in labels.items():
+        stats = summary["outcomes"][outcome]
+        low, high = stats["ci95"]
+        print(f"{label}: {stats['rate']:6.1%}  (95% CI {low:.1%} - {high:.1%})")
+    for team in ("A", "B"):
+        stats = summary["goals"][team]
+        low, high = stats["ci95"]
+        print(f"Goals {team}: {stats['mean']:.2f}  (95% CI {low:.2f} - {high:.2f})")
+    print("Most common scores:")
+    for score, count in list(summary["scores"].items())[:10]:
+        print(f"  {score}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo tournament between two formations")
+    parser.add_argument("home", nargs="?", default="formation_433", help="Team A formation")
+    parser.add_argument("away", nargs="?", default="formation_442", help="Team B formation")
+    parser.add_argument("-n", "--matches", type=int, default=100, help="Number of matches")
+    parser.add_argument("--minutes", type=float, default=MATCH_LENGTH_MS / 60000,
+                        help="Simulated match length in minutes")
+    parser.add_argument("--seed", type=int, default=0, help="Master seed")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int,
+                        help=f"Matches per work item (default: {SINGLE_CHUNK}, or for the batch "
+                             f"engine the matches split evenly across workers, at most {BATCH_CHUNK})")
+    parser.add_argument("--engine", choices=ENGINES, default="batch",
+                        help="Engine used by the workers: batch plays each work item as one "
+                             "BatchMatch, vector and object one match at a time")
+    parser.add_argument("--json", help="Also write the summary to this JSON file")
+    args = parser.parse_args()
+
+    n_ticks = int(args.minutes * 60000 / TICK_MS)
+    start = time.perf_counter()
+
+    def progress(done, total):
+        elapsed = time.perf_counter() - start
+        print(f"\r{done}/{total} matches ({elapsed:.0f}s)", end="", file=sys.stderr, flush=True)
+
+    results = run_tournament(args.home, args.away, args.matches, n_ticks, args.seed,
+                             args.workers, args.chunk_size, args.engine, progress)
+    print(file=sys.stderr)
+
+    summary = summarise(results)
+    print_summary(args.home, args.away, summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
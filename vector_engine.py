@@ -0,0 +1,261 @@
+import math
+import numpy as np
+import kernels
+from ball import possession_range
+from match import Match
+from player import DECISION_INTERVAL, state_urgency
+from streams import OFFSET_X, OFFSET_Y, SUPPORT, SUPPORT_X, SUPPORT_Y, counter
+
+# Field bounds players are clamped to (see Player.update)
+POSITION_MIN = np.array([10.0, 10.0])
+POSITION_MAX = np.array([790.0, 590.0])
+
+# AI states by the ids kernels.plan_players writes, and the draws it can make
+STATES = ("positioning", "chasing", "supporting")
+PLAN_PURPOSES = (OFFSET_X, OFFSET_Y, SUPPORT, SUPPORT_X, SUPPORT_Y)
+
+
+def support_odds(player):
+    """Player.should_support as (chance, low, high)
+
+    The player rolls for the chance while low < ball x < high and never
+    supports otherwise.
+    """
+    if player.role in ("ST", "LW", "RW"):
+        return (0.7, 300, math.inf) if player.team == "A" else (0.7, -math.inf, 500)
+    if player.role in ("CM", "LM", "RM"):
+        return 0.5, -math.inf, math.inf
+    if player.role in ("CB", "LB", "RB"):
+        return (0.6, -math.inf, 400) if player.team == "A" else (0.6, 400, math.inf)
+    return 0.0, math.inf, -math.inf
+
+
+class PlayerArrays:
+    """Structure-of-arrays copy of the kinematic state of a list of players.
+
+    Row i of every array belongs to players[i]. Positions, velocities and
+    targets are (n, 2) arrays; the per-player constants are (n,) arrays.
+    """
+
+    def __init__(self, players):
+        self.players = players
+        n = len(players)
+        self.position = np.zeros((n, 2))
+        self.velocity = np.zeros((n, 2))
+        self.target = np.zeros((n, 2))
+        self.urgency = np.zeros(n)
+        self.max_speed = np.zeros(n)
+        self.acceleration = np.zeros(n)
+        self.friction = np.zeros(n)
+        self.decision_timer = np.zeros(n)
+        self.possession_range = np.array([possession_range(p.role) for p in players], dtype=float)
+        self.team = np.array([p.team for p in players])
+        # Constants of Player.plan, for kernels.plan_players
+        self.side = np.unique(self.team, return_inverse=True)[1]
+        self.home = np.array([(p.home_x, p.home_y) for p in players], dtype=float)
+        self.support_range = np.array([p.support_range for p in players], dtype=float)
+        self.support_chance, self.support_low, self.support_high = (
+            np.array(column, dtype=float) for column in zip(*map(support_odds, players)))
+        self.direction = np.where(self.team == "A", 1.0, -1.0)
+        self.defend_x = np.where(self.team == "A", 50.0, 750.0)
+        self.state = np.zeros(n, dtype=np.int8)
+        self.drawn = np.zeros(n, dtype=np.int64)
+        # Scratch arrays step() writes into instead of allocating temporaries
+        self._delta = np.zeros((n, 2))
+        self._steer = np.zeros((n, 2))
+        self._distance = np.zeros(n)
+        self._speed = np.zeros(n)
+        self._limit = np.zeros(n)
+        self._moving = np.zeros(n, dtype=bool)
+        self._closest = np.zeros(1, dtype=np.intp)
+        self._closest_distance = np.zeros(1)
+        self.load()
+
+    def load(self):
+        """Copy the full state of every player into the arrays"""
+        for i, p in enumerate(self.players):
+            self.position[i] = (p.x, p.y)
+            self.velocity[i] = (p.velocity_x, p.velocity_y)
+            self.max_speed[i] = p.max_speed
+            self.acceleration[i] = p.acceleration
+            self.friction[i] = p.friction
+            self.decision_timer[i] = p.decision_timer
+        self.load_targets(range(len(self.players)))
+
+    def load_targets(self, indices):
+        """Copy target and state-dependent urgency for the given players"""
+        for i in indices:
+            p = self.players[i]
+            self.target[i] = (p.target_x, p.target_y)
+            self.urgency[i] = state_urgency(p.state)
+
+    def store_positions(self):
+        """Write positions back to the player objects"""
+        for p, (x, y) in zip(self.players, self.position.tolist()):
+            p.x = x
+            p.y = y
+
+    def store(self):
+        """Write positions, velocities and decision timers back to the players"""
+        self.store_positions()
+        for p, (vx, vy), timer in zip(self.players, self.velocity.tolist(),
+                                      self.decision_timer.tolist()):
+            p.velocity_x = vx
+            p.velocity_y = vy
+            p.decision_timer = timer
+
+    def step(self):
+        """Player.update_movement followed by Player.update, for every player at once"""
+        if kernels.ENABLED:
+            kernels.move_players(self.position[None], self.velocity[None], self.target[None],
+                                 self.urgency[None], self.max_speed, self.acceleration,
+                                 self.friction, POSITION_MIN, POSITION_MAX)
+            return
+        delta = np.subtract(self.target, self.position, out=self._delta)
+        distance = np.hypot(delta[:, 0], delta[:, 1], out=self._distance)
+
+        # Steer only players more than 5px from their target (see move_towards)
+        moving = np.greater(distance, 5, out=self._moving)
+        if moving.any():
+            speed = np.multiply(self.max_speed, self.urgency, out=self._speed)
+            np.minimum(speed, np.multiply(distance, 0.1, out=self._limit), out=speed)
+            # Direction times speed; players not moving get a zero steer below
+            np.divide(speed, distance, out=speed, where=moving)
+            steer = np.multiply(delta, speed[:, None], out=self._steer)
+            steer -= self.velocity
+            steer *= self.acceleration[:, None]
+            steer *= moving[:, None]
+            self.velocity += steer
+
+        # Apply friction, move and keep within field bounds
+        self.velocity *= self.friction[:, None]
+        self.position += self.velocity
+        np.maximum(self.position, POSITION_MIN, out=self.position)
+        np.minimum(self.position, POSITION_MAX, out=self.position)
+
+    def within(self, x, y, radius):
+        """Mask of the players within radius of a point"""
+        return np.hypot(self.position[:, 0] - x, self.position[:, 1] - y) <= radius
+
+    def closest_to(self, x, y):
+        """Index of and distance to the player closest to a point"""
+        if kernels.ENABLED:
+            kernels.closest_players(self.position[None], np.array([[x, y]], dtype=float),
+                                    self._closest, self._closest_distance)
+            return int(self._closest[0]), float(self._closest_distance[0])
+        distance = np.hypot(x - self.position[:, 0], y - self.position[:, 1])
+        i = int(distance.argmin())
+        return i, float(distance[i])
+
+
+class VectorMatch(Match):
+    """Match whose player movement runs as batched NumPy operations.
+
+    Movement, the possession test and the pass and tackle range queries
+    work on PlayerArrays; with the Numba kernels the due players' AI
+    decisions do too (kernels.plan_players), drawing the same numbers from
+    the match's streams as the Player objects would. Tackles, passes and
+    the urgent re-plans on a change of possession go through the Player
+    objects. The match plays out as in the object engine to within float
+    rounding.
+
+    Only about two players re-plan on a tick, so the decision work is
+    small and each NumPy call costs more than it saves; without Numba the
+    decisions stay on the Player objects.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.arrays = PlayerArrays(self.players)
+        # (teammates, team) -> mask of that side, for _players_near
+        teams = self.arrays.team
+        self._sides = {}
+        for team in self.proximity.teams:
+            self._sides[True, team] = teams == team
+            self._sides[False, team] = teams != team
+
+    def reset(self):
+        self.arrays.store()
+        super().reset()
+        self.arrays.load()
+
+    def snapshot(self):
+        self.arrays.store()
+        return super().snapshot()
+
+    def restore(self, snapshot):
+        super().restore(snapshot)
+        self.arrays.load()
+
+    def _goal(self, team):
+        # Let the Player objects handle the kick-off reset, then reload
+        self.arrays.store()
+        super()._goal(team)
+        self.arrays.load()
+
+    def _decide_players(self, dt):
+        arrays = self.arrays
+        players = self.players
+
+        # Only players whose decision timer has run out re-plan this tick
+        due = np.flatnonzero(arrays.decision_timer >= DECISION_INTERVAL)
+        if not due.size:
+            return
+        arrays.decision_timer[due] = 0
+        if not kernels.ENABLED:
+            for i in due.tolist():
+                players[i].plan(self.ball, players, self.proximity)
+            arrays.load_targets(due.tolist())
+            return
+
+        rng = self.rng
+        kernels.plan_players(due, arrays.position, np.array((self.ball.x, self.ball.y), dtype=float),
+                             arrays.side, arrays.support_range, arrays.support_chance,
+                             arrays.support_low, arrays.support_high, arrays.direction,
+                             arrays.defend_x, arrays.home, np.array(rng.key, dtype=np.uint64),
+                             np.uint64(counter(self.ticks, 0, 0)), arrays.target, arrays.state,
+                             arrays.drawn)
+        # Hand the plans to the Player objects and count the draws they used
+        for i, (x, y), state, drawn in zip(due.tolist(), arrays.target[due].tolist(),
+                                            arrays.state[due].tolist(), arrays.drawn[due].tolist()):
+            player = players[i]
+            player.state = STATES[state]
+            if self.intercept and player.state == "chasing":
+                x, y = self.proximity.chase_point(player)
+                arrays.target[i] = (x, y)
+            player.target_x = x
+            player.target_y = y
+            arrays.urgency[i] = state_urgency(player.state)
+            for purpose in PLAN_PURPOSES:
+                if drawn >> purpose & 1:
+                    rng.skip(i, purpose)
+
+    def _replan_urgently(self):
+        urgent = super()._replan_urgently()
+        self.arrays.load_targets([self.proximity.index[p] for p in urgent])
+        return urgent
+
+    def _move_players(self, dt):
+        arrays = self.arrays
+        arrays.step()
+        arrays.decision_timer += dt
+        arrays.store_positions()
+        self.proximity.update(self.ball)
+
+    def _players_near(self, player, radius, teammates):
+        # One NumPy pass over the arrays instead of a loop over the objects
+        near = self.arrays.within(player.x, player.y, radius)
+        near &= self._sides[teammates, player.team]
+        players = self.players
+        return [players[i] for i in np.flatnonzero(near).tolist()]
+
+    def _find_possessor(self):
+        i, distance = self.arrays.closest_to(self.ball.x, self.ball.y)
+        if distance < self.arrays.possession_range[i]:
+            return self.players[i]
+        return None
+
+    def sync(self):
+        """Bring the Player objects fully up to date with the arrays"""
+        self.arrays.store()
+
@@ -0,0 +1,66 @@
+import argparse
+import time
+import formations
+from match import Match, MATCH_LENGTH_MS
+from batch_engine import BatchMatch
+from snapshot import MatchSnapshot
+from tournament import summarise, print_summary
+
+
+def checkpoint(home, away, minute, seed=None, score=None):
+    """Snapshot of a match played up to minute, optionally with the score overridden"""
+    match = Match(home, away, seed=seed)
+    match.run(match.clock.ticks_for(minute * 60000))
+    if score is not None:
+        match.score = {"A": score[0], "B": score[1]}
+    return match.snapshot()
+
+
+def continuations(snapshot, n_matches, length_ms=MATCH_LENGTH_MS, seed=None):
+    """Final (index, goals_a, goals_b) of n_matches forks of a snapshot played to full time"""
+    batch = BatchMatch.from_snapshot(snapshot, n_matches, seed=seed)
+    remaining = max(0, batch.clock.ticks_for(length_ms - snapshot.game_time))
+    score = batch.run(remaining)
+    return [(i, int(a), int(b)) for i, (a, b) in enumerate(score.tolist())]
+
+
+def parse_score(text):
+    goals_a, goals_b = text.split("-")
+    return int(goals_a), int(goals_b)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fork a match at a checkpoint into many continuations and report the outcomes")
+    parser.add_argument("--home", default="formation_433", help="Team A formation")
+    parser.add_argument("--away", default="formation_433", help="Team B formation")
+    parser.add_argument("--minute", type=float, default=70, help="Minute of the checkpoint")
+    parser.add_argument("--score", type=parse_score, metavar="A-B",
+                        help="Set the score at the checkpoint, e.g. 1-1")
+    parser.add_argument("--seed", type=int, help="Seed of the match leading up to the checkpoint")
+    parser.add_argument("--load", metavar="PATH", help="Start from a saved snapshot instead")
+    parser.add_argument("--save", metavar="PATH", help="Save the checkpoint snapshot")
+    parser.add_argument("-n", "--matches", type=int, default=1000, help="Number of continuations")
+    parser.add_argument("--fork-seed", type=int, help="Seed of the continuations")
+    args = parser.parse_args()
+
+    if args.load:
+        snapshot = MatchSnapshot.load(args.load)
+    else:
+        snapshot = checkpoint(formations.get(args.home), formations.get(args.away),
+                              args.minute, args.seed, args.score)
+    if args.save:
+        snapshot.save(args.save)
+        print(f"Snapshot written to {args.save}")
+
+    print(f"Checkpoint at {snapshot.game_time / 60000:.1f} min, "
+          f"A {snapshot.score[0]} - {snapshot.score[1]} B")
+    start = time.perf_counter()
+    results = continuations(snapshot, args.matches, seed=args.fork_seed)
+    elapsed = time.perf_counter() - start
+    print_summary(snapshot.home_formation, snapshot.away_formation, summarise(results))
+    print(f"{args.matches} continuations in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()